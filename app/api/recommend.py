@@ -0,0 +1,191 @@
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, List, Optional
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.types import Receive, Scope, Send
+from app.core import setting
+from app.core.exception import AppException, DeadlineExceededException, OverloadedException, handle_exception
+from app.core.logger import setup_logger
+from app.core.metrics import DEADLINE_EXCEEDED, HTTP_IN_FLIGHT, HTTP_REQUESTS, correlation_id_var, track_stage
+from app.service.listen.deadline import Deadline
+from app.service.llm.codec import decode_request, encode_response
+from app.service.recommend.recommend import RECIPES_KEY, recommend, stream_recommendation
+import asyncio
+import time
+import uuid
+
+logger = setup_logger(__name__)
+
+router = APIRouter()
+
+class AdmissionControl:
+    """HTTP 요청 동시 처리 수 제한
+
+    처리 슬롯이 없으면 최대 max_waiting 개 요청만 기다리게 하고 나머지는 바로 OverloadedException(503) 으로
+    거절한다. 기다리는 요청도 기한이 지나면 DeadlineExceededException(504) 으로 중단한다.
+    """
+    def __init__(
+        self,
+        max_concurrency: int = setting.HTTP_MAX_CONCURRENCY,
+        max_waiting: int = setting.HTTP_MAX_WAITING
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_waiting = max(max_waiting, 0)
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+
+    async def acquire(self, deadline: Deadline) -> Callable[[], None]:
+        """처리 슬롯을 얻고 한 번만 반납하는 함수를 반환"""
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            raise OverloadedException("처리 중인 요청이 많아 거절합니다")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=max(deadline.remaining(), 0))
+        except asyncio.TimeoutError:
+            DEADLINE_EXCEEDED.labels("admission").inc()
+            raise DeadlineExceededException("처리 슬롯을 기다리는 중 요청 시간이 지났습니다", stage="admission")
+        finally:
+            self.waiting -= 1
+        HTTP_IN_FLIGHT.inc()
+
+        released = False
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                HTTP_IN_FLIGHT.dec()
+                self._slots.release()
+        return release
+
+# 전역 HTTP 요청 제한 인스턴스
+admission = AdmissionControl()
+
+def _deadline(request: Request) -> Deadline:
+    """x-deadline 헤더(epoch 초/밀리초)와 HTTP_REQUEST_TIMEOUT 중 이른 시각"""
+    timeout = Deadline(time.time() + setting.HTTP_REQUEST_TIMEOUT)
+    requested = Deadline.from_message(request.headers, budget=0)
+    return requested if requested is not None and requested.expires_at < timeout.expires_at else timeout
+
+async def _prepare(request: Request, endpoint: str):
+    """correlation id 설정, 요청 검증, 처리 슬롯 확보 (거절되면 결과를 기록하고 예외)"""
+    correlation_id = request.headers.get("x-correlation-id") or str(uuid.uuid4())
+    correlation_id_var.set(correlation_id)
+    deadline = _deadline(request)
+    try:
+        ingredients_data = decode_request(await request.body(), request.headers.get("content-encoding"))
+        release = await admission.acquire(deadline)
+    except AppException as e:
+        HTTP_REQUESTS.labels(endpoint, _result(e)).inc()
+        raise
+    return correlation_id, deadline, ingredients_data, release
+
+def _result(e: AppException) -> str:
+    if isinstance(e, DeadlineExceededException):
+        return "expired"
+    if isinstance(e, OverloadedException):
+        return "rejected"
+    return "invalid" if e.status_code == 400 else "error"
+
+@router.post("/recommend")
+async def recommend_recipes(request: Request):
+    """재료 목록(큐 메시지와 같은 형식)으로 레시피를 추천하고 전체 응답을 반환"""
+    correlation_id, deadline, ingredients_data, release = await _prepare(request, "recommend")
+    try:
+        with track_stage("http"):
+            response = await asyncio.wait_for(
+                recommend(ingredients_data, deadline), timeout=max(deadline.remaining(), 0)
+            )
+    except asyncio.TimeoutError:
+        DEADLINE_EXCEEDED.labels("http").inc()
+        HTTP_REQUESTS.labels("recommend", "expired").inc()
+        raise DeadlineExceededException("요청 처리 시간이 지났습니다", stage="http")
+    except AppException as e:
+        HTTP_REQUESTS.labels("recommend", _result(e)).inc()
+        raise
+    except Exception as e:
+        logger.error(f"HTTP 추천 요청 처리 중 오류 발생: {e}")
+        HTTP_REQUESTS.labels("recommend", "error").inc()
+        raise AppException("Recommendation error", status_code=500)
+    finally:
+        release()
+
+    HTTP_REQUESTS.labels("recommend", "success" if response is not None else "empty").inc()
+    return Response(
+        content=encode_response(response if response is not None else {RECIPES_KEY: []}),
+        media_type="application/json",
+        headers={"x-correlation-id": correlation_id}
+    )
+
+@router.post("/recommend/stream")
+async def stream_recipes(request: Request):
+    """레시피가 완성될 때마다 server-sent event 로 보낸다
+
+    event: recipe (레시피 하나) → event: complete (전체 응답), 처리 중 오류는 event: error 로 보낸다.
+    """
+    correlation_id, deadline, ingredients_data, release = await _prepare(request, "recommend_stream")
+    events = _events(ingredients_data, deadline, correlation_id, release)
+
+    async def close():
+        # 이벤트 루프에서 생성기를 닫아 LLM 스트리밍을 중단하고 처리 슬롯을 반납
+        # (응답 본문을 시작하지 못했거나 클라이언트가 연결을 끊은 경우에도)
+        await events.aclose()
+        release()
+
+    return _ClosingStreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"x-correlation-id": correlation_id, "Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(close)
+    )
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """전송이 어떻게 끝나든 background 정리 작업을 실행하는 StreamingResponse
+
+    ASGI 2.4 서버에서 클라이언트가 연결을 끊으면 ClientDisconnect 로 빠져나가 background 를 건너뛴다.
+    정리 작업은 여러 번 실행해도 된다.
+    """
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.background()
+
+async def _events(
+    ingredients_data: List[Dict[str, str]],
+    deadline: Deadline,
+    correlation_id: str,
+    release: Callable[[], None]
+) -> AsyncIterator[bytes]:
+    correlation_id_var.set(correlation_id)
+    result = "cancelled"
+    try:
+        sequence = 0
+        completed = False
+        with track_stage("http"):
+            async with aclosing(stream_recommendation(ingredients_data, deadline)) as stream:
+                async for event, payload in stream:
+                    if event == "recipe":
+                        sequence += 1
+                        yield _sse("recipe", payload, sequence)
+                    else:
+                        completed = True
+                        yield _sse("complete", payload)
+        if not completed:
+            yield _sse("complete", {RECIPES_KEY: []})
+        result = "success" if completed else "empty"
+    except AppException as e:
+        result = _result(e)
+        yield _sse("error", handle_exception(e))
+    except Exception as e:
+        logger.error(f"HTTP 스트리밍 추천 처리 중 오류 발생: {e}")
+        result = "error"
+        yield _sse("error", handle_exception(AppException("Recommendation error", status_code=500)))
+    finally:
+        # 연결이 끊기면 응답의 정리 작업이 이 생성기를 닫고, aclosing 이 LLM 스트리밍까지 닫는다
+        HTTP_REQUESTS.labels("recommend_stream", result).inc()
+        release()
+
+def _sse(event: str, data: Dict, event_id: Optional[int] = None) -> bytes:
+    head = f"event: {event}\n" + (f"id: {event_id}\n" if event_id is not None else "")
+    return head.encode() + b"data: " + encode_response(data) + b"\n\n"
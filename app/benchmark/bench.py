@@ -0,0 +1,262 @@
+"""추천 파이프라인 오프라인 벤치마크
+
+RabbitMQ, Pinecone, OpenAI 대신 로컬 대체 구현(stubs.py)을 연결하고 합성 재료 쿼리로
+MessageProcessor 를 구동해 단계별 p50/p95/p99, 초당 처리량, 최대 RSS 를 보고한다.
+파이프라인 설정은 환경 변수 또는 --env 로 바꿔 비교한다.
+
+사용 예:
+    python -m app.benchmark.bench --messages 500 --concurrency 8
+    python -m app.benchmark.bench --skew 1.2 --env EMBEDDING_RESIDENCY=per_call --json result.json
+    python -m app.benchmark.bench --fake-embedding --llm-latency-ms 200
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import sys
+import time
+import uuid
+
+# 외부 서비스에 연결하지 않으므로 필수 설정은 더미 값으로 채운다
+_DUMMY_SETTINGS = {
+    "RECIPE_DB_API_KEY": "benchmark",
+    "PINECONE_API_KEY": "benchmark",
+    "PINECONE_HOST_URL": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+    "RABBITMQ_HOST": "benchmark",
+}
+
+def build_workload(
+    messages: int, unique_queries: int, skew: float, seed: int = 0
+) -> List[bytes]:
+    """합성 재료 쿼리 메시지 목록
+
+    unique_queries 개의 서로 다른 쿼리를 만들고 순위 r 의 쿼리를 1/r^skew 비율로 뽑는다
+    (skew=0 이면 균등, 클수록 인기 쿼리가 반복된다).
+    """
+    from app.benchmark.stubs import INGREDIENTS, QUANTITIES
+    rng = random.Random(seed)
+    pool = []
+    for _ in range(max(unique_queries, 1)):
+        names = rng.sample(INGREDIENTS, rng.randint(2, 6))
+        pool.append(json.dumps(
+            [{"ingredients": name, "quantities": rng.choice(QUANTITIES)} for name in names],
+            ensure_ascii=False
+        ).encode("utf-8"))
+    weights = [1 / (rank ** skew) for rank in range(1, len(pool) + 1)]
+    return rng.choices(pool, weights=weights, k=messages)
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """최근접 순위 방식 백분위"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(q / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+class StageRecorder:
+    """track_stage 에서 관찰한 단계별 소요 시간 원본을 모은다"""
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def __call__(self, stage: str, seconds: float):
+        self.samples[stage].append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for stage, values in sorted(self.samples.items()):
+            values = sorted(values)
+            result[stage] = {
+                "count": len(values),
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return result
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트 단위
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+def _wire_stand_ins(args):
+    """전역 서비스 인스턴스의 외부 연결 지점을 로컬 대체 구현으로 교체"""
+    from app.benchmark.stubs import FakeEmbeddings, FakeLLM, FakeVectorStore, InMemoryBroker
+    from app.core import setting
+    from app.service.listen import listen
+    from app.service.recommend import recommend
+    from app.service.search import search
+
+    store = FakeVectorStore(
+        size=args.recipes, dimension=setting.VECTOR_DIMENSION,
+        latency_ms=args.vector_latency_ms, seed=args.seed
+    )
+    broker = InMemoryBroker()
+    llm = FakeLLM(latency_ms=args.llm_latency_ms, jitter=args.llm_jitter, seed=args.seed)
+
+    search.get_vector_store = lambda: store
+    listen.publisher = broker
+    recommend.agenerate_response = llm.agenerate_response
+    recommend.astream_response = llm.astream_response
+    if args.fake_embedding:
+        search.search_service.embedding_service.model_factory = lambda: FakeEmbeddings(
+            dimension=setting.VECTOR_DIMENSION, latency_ms=args.embedding_latency_ms
+        )
+    return broker
+
+async def _drive(broker, workload: List[bytes], concurrency: int, rate: Optional[float]) -> Tuple[float, int, List[float]]:
+    """RabbitMQListener 처럼 동시 처리 슬롯만큼 메시지를 꺼내 처리 (rate 지정 시 일정 간격으로 도착)"""
+    from app.service.listen.listen import MessageProcessor
+
+    errors = 0
+    queue_waits: List[float] = []
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+
+    async def handle(body: bytes, correlation_id: str, enqueued_at: float):
+        nonlocal errors
+        try:
+            queue_waits.append(time.perf_counter() - enqueued_at)
+            await MessageProcessor.process_message(body, correlation_id)
+        except Exception:
+            errors += 1
+        finally:
+            slots.release()
+
+    async def produce():
+        for body in workload:
+            broker.send(body, str(uuid.uuid4()))
+            if rate:
+                await asyncio.sleep(1 / rate)
+
+    started = time.perf_counter()
+    producer = asyncio.create_task(produce())
+    for _ in range(len(workload)):
+        body, correlation_id, enqueued_at = await broker.requests.get()
+        await slots.acquire()
+        task = asyncio.create_task(handle(body, correlation_id, enqueued_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await producer
+    if tasks:
+        await asyncio.gather(*tasks)
+    return time.perf_counter() - started, errors, queue_waits
+
+async def run_benchmark(args) -> Dict:
+    from app.core import setting
+    from app.core.metrics import add_stage_observer, remove_stage_observer
+    from app.service.search.search import search_service
+
+    broker = _wire_stand_ins(args)
+    embedding_service = search_service.embedding_service
+    recorder = StageRecorder()
+    add_stage_observer(recorder)
+    try:
+        if args.warm_up:
+            await asyncio.to_thread(embedding_service.warm_up)
+        await asyncio.to_thread(search_service.prepare)
+
+        if args.warmup_messages:
+            warmup = build_workload(args.warmup_messages, args.unique_queries, args.skew, seed=args.seed + 1)
+            await _drive(broker, warmup, args.concurrency, None)
+        recorder.reset()
+        published_before = broker.published
+
+        workload = build_workload(args.messages, args.unique_queries, args.skew, seed=args.seed)
+        elapsed, errors, queue_waits = await _drive(broker, workload, args.concurrency, args.rate)
+        recorder.samples["queue_wait"] = queue_waits
+    finally:
+        remove_stage_observer(recorder)
+        embedding_service.shutdown()
+
+    return {
+        "config": {
+            "messages": args.messages,
+            "concurrency": args.concurrency,
+            "rate": args.rate,
+            "unique_queries": args.unique_queries,
+            "skew": args.skew,
+            "recipes": args.recipes,
+            "fake_embedding": args.fake_embedding,
+            "llm_latency_ms": args.llm_latency_ms,
+            "vector_latency_ms": args.vector_latency_ms,
+            "embedding_residency": setting.EMBEDDING_RESIDENCY,
+            "embedding_batch": setting.EMBEDDING_BATCH_ENABLED,
+            "embedding_cache": setting.EMBEDDING_CACHE_ENABLED,
+            "response_cache": setting.RESPONSE_CACHE_ENABLED,
+            "search_mode": setting.SEARCH_MODE,
+            "llm_streaming": setting.LLM_STREAMING,
+        },
+        "elapsed_s": elapsed,
+        "messages_per_s": args.messages / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "published": broker.published - published_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": recorder.summary(),
+    }
+
+def format_report(result: Dict) -> str:
+    lines = [
+        "설정: " + ", ".join(f"{k}={v}" for k, v in result["config"].items()),
+        f"처리량: {result['messages_per_s']:.2f} msg/s ({result['config']['messages']}건, {result['elapsed_s']:.2f}초, 오류 {result['errors']}건)",
+        f"최대 RSS: {result['peak_rss_mb']:.1f} MB",
+        "",
+        f"{'stage':<18}{'count':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'p99(ms)':>12}{'max(ms)':>12}",
+    ]
+    for stage, s in result["stages"].items():
+        lines.append(
+            f"{stage:<18}{s['count']:>8}{s['p50_ms']:>12.2f}{s['p95_ms']:>12.2f}{s['p99_ms']:>12.2f}{s['max_ms']:>12.2f}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="로컬 대체 구현으로 추천 파이프라인 지연시간/처리량을 측정합니다.")
+    parser.add_argument("--messages", type=int, default=200, help="측정할 메시지 수")
+    parser.add_argument("--warmup-messages", type=int, default=20, help="측정 전에 처리할 메시지 수")
+    parser.add_argument("--concurrency", type=int, default=None, help="동시 처리 수 (기본: LISTENER_CONCURRENCY)")
+    parser.add_argument("--rate", type=float, default=None, help="초당 도착 메시지 수 (없으면 한꺼번에 투입)")
+    parser.add_argument("--unique-queries", type=int, default=100, help="서로 다른 쿼리 수")
+    parser.add_argument("--skew", type=float, default=1.0, help="쿼리 반복 편중도 (0=균등)")
+    parser.add_argument("--recipes", type=int, default=10000, help="가짜 벡터 저장소의 레시피 수")
+    parser.add_argument("--vector-latency-ms", type=float, default=30.0, help="벡터 저장소 왕복 지연")
+    parser.add_argument("--llm-latency-ms", type=float, default=1500.0, help="LLM 응답 지연")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="LLM 지연 변동 비율")
+    parser.add_argument("--fake-embedding", action="store_true", help="실제 임베딩 모델 대신 가짜 모델 사용")
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0, help="가짜 임베딩 모델 지연")
+    parser.add_argument("--no-warm-up", dest="warm_up", action="store_false", help="임베딩 모델 워밍업 생략")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="설정 덮어쓰기 (여러 번 지정 가능)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args(argv)
+
+    # 설정과 전역 인스턴스는 import 시점에 만들어지므로 app 모듈을 불러오기 전에 환경 변수를 적용한다
+    for key, value in _DUMMY_SETTINGS.items():
+        os.environ.setdefault(key, value)
+    for item in args.env:
+        key, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--env 는 KEY=VALUE 형식이어야 합니다: {item}")
+        os.environ[key] = value
+
+    from app.core import setting
+    if args.concurrency is None:
+        args.concurrency = setting.LISTENER_CONCURRENCY
+    args.concurrency = max(args.concurrency, 1)
+
+    result = asyncio.run(run_benchmark(args))
+    print(format_report(result))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 1 if result["errors"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+"""벤치마크용 로컬 대체 구현 (브로커, 벡터 저장소, LLM, 임베딩 모델)
+
+외부 서비스 없이 MessageProcessor 파이프라인을 그대로 돌리기 위한 것으로, 서비스 코드에서는 사용하지 않는다.
+"""
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+from app.core.metrics import track_stage
+from app.repositorie.local_store import _match_filter
+from app.repositorie.vector_store import VectorStore, VectorRecord
+from app.service.llm.codec import compress, encode_response
+import asyncio
+import hashlib
+import random
+import time
+import numpy as np
+
+# 합성 레시피와 쿼리에 쓰는 재료 목록
+INGREDIENTS = [
+    "대파", "양파", "마늘", "생강", "감자", "고구마", "당근", "애호박", "오이", "가지",
+    "배추", "무", "양배추", "시금치", "콩나물", "숙주", "버섯", "표고버섯", "팽이버섯", "브로콜리",
+    "파프리카", "고추", "청양고추", "깻잎", "부추", "두부", "달걀", "우유", "치즈", "버터",
+    "돼지고기", "소고기", "닭고기", "베이컨", "햄", "소시지", "참치", "연어", "새우", "오징어",
+    "조개", "멸치", "김치", "밥", "국수", "라면", "떡", "밀가루", "빵가루", "식빵",
+    "간장", "고추장", "된장", "고춧가루", "설탕", "소금", "후추", "참기름", "식용유", "토마토",
+]
+QUANTITIES = ["1개", "2개", "100g", "200g", "300g", "1/2개", "1큰술", "2큰술", "한 줌", "약간"]
+
+class FakeEmbeddings:
+    """텍스트 해시로 정해지는 무작위 단위 벡터를 돌려주는 임베딩 모델 (latency_ms 만큼 지연)"""
+    def __init__(self, dimension: int = 1024, latency_ms: float = 20.0, per_text_ms: float = 2.0):
+        self.dimension = dimension
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep((self.latency_ms + self.per_text_ms * len(texts)) / 1000)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class FakeVectorStore(VectorStore):
+    """무작위 1024차원 벡터와 합성 레시피 메타데이터로 채운 메모리 벡터 저장소
+
+    Pinecone 왕복 시간을 흉내 내도록 query/fetch 마다 latency_ms 만큼 지연한다.
+    """
+    def __init__(self, size: int = 10000, dimension: int = 1024, latency_ms: float = 0.0, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        vectors = rng.standard_normal((size, dimension)).astype(np.float32)
+        self._vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._ids = [f"recipe-{i}" for i in range(size)]
+        self._rows = {recipe_id: row for row, recipe_id in enumerate(self._ids)}
+        self._metadata = [self._recipe(rng, i) for i in range(size)]
+        self.latency_ms = latency_ms
+
+    @staticmethod
+    def _recipe(rng: np.random.Generator, index: int) -> Dict[str, Any]:
+        names = [str(name) for name in rng.choice(INGREDIENTS, size=int(rng.integers(3, 10)), replace=False)]
+        return {
+            "title": f"{names[0]} {names[1]} 요리 {index}",
+            "raw_ingredients": [f"{name} {rng.choice(QUANTITIES)}" for name in names],
+            "ingredients": names,
+            "steps": [f"{name}을(를) 손질하고 조리한다." for name in names[:5]],
+        }
+
+    def _wait(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def query(self, vector, top_k, include_metadata=True, filter=None):
+        with track_stage("vector_query"):
+            self._wait()
+            scores = self._vectors @ np.asarray(vector, dtype=np.float32)
+            if filter:
+                allowed = np.array([_match_filter(m, filter) for m in self._metadata], dtype=bool)
+                scores = np.where(allowed, scores, -np.inf)
+            top_k = min(top_k, len(self._ids))
+            rows = np.argpartition(-scores, top_k - 1)[:top_k]
+            rows = rows[np.argsort(-scores[rows])]
+            matches = []
+            for row in rows:
+                if scores[row] == -np.inf:
+                    break
+                match = {"id": self._ids[row], "score": float(scores[row])}
+                if include_metadata:
+                    match["metadata"] = self._metadata[row]
+                matches.append(match)
+            return {"matches": matches}
+
+    def fetch(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        with track_stage("metadata_fetch"):
+            self._wait()
+            return {i: self._metadata[self._rows[i]] for i in ids if i in self._rows}
+
+    def items(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        return zip(self._ids, self._metadata)
+
+    def upsert(self, vectors: Iterable[VectorRecord]):
+        raise NotImplementedError("벤치마크 저장소는 읽기 전용입니다")
+
+class FakeLLM:
+    """검색 결과 상위 레시피로 응답을 만드는 LLM 대체 구현 (latency_ms ± jitter 만큼 지연)"""
+    def __init__(self, latency_ms: float = 1500.0, jitter: float = 0.2, recipes: int = 3, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.recipes = recipes
+        self._random = random.Random(seed)
+
+    def _delay(self, share: float = 1.0) -> float:
+        spread = 1 + self._random.uniform(-self.jitter, self.jitter)
+        return self.latency_ms * share * spread / 1000
+
+    def _recipes(self, search_response: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "레시피 id": str(doc["id"]),
+                "레시피 이름": doc["title"],
+                "재료": [{"재료명": ing, "양": ""} for ing in doc["ingredients"]],
+                "조리 방법": doc["steps"],
+            }
+            for doc in search_response[:self.recipes]
+        ]
+
+    async def agenerate_response(self, user_ingredients: List[Dict], search_response: List[Dict]) -> Dict:
+        with track_stage("llm"):
+            await asyncio.sleep(self._delay())
+        return {"레시피 목록": self._recipes(search_response)}
+
+    async def astream_response(self, user_ingredients: List[Dict], search_response: List[Dict]) -> AsyncIterator[Dict]:
+        recipes = self._recipes(search_response)
+        with track_stage("llm"):
+            for recipe in recipes:
+                await asyncio.sleep(self._delay(1 / max(len(recipes), 1)))
+                yield recipe
+
+class InMemoryBroker:
+    """요청 큐와 응답 발행을 메모리에서 처리하는 브로커 (RabbitMQPublisher 와 같은 발행 인터페이스)"""
+    def __init__(self):
+        self.requests: "asyncio.Queue[Tuple[bytes, str, float]]" = asyncio.Queue()
+        self.published = 0
+        self.published_bytes = 0
+
+    def send(self, body: bytes, correlation_id: str):
+        self.requests.put_nowait((body, correlation_id, time.perf_counter()))
+
+    async def publish_message(
+            self,
+            message: Any,
+            correlation_id: Optional[str] = None,
+            headers: Optional[Dict[str, Any]] = None,
+            wait_for_confirm: bool = True
+        ) -> None:
+        with track_stage("publish"):
+            body, _ = compress(encode_response(message))
+        self.published += 1
+        self.published_bytes += len(body)
+        return None
+
+    async def wait_for_confirms(self, confirms):
+        return None
+
+    async def flush(self):
+        return None
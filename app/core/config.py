@@ -1,16 +1,17 @@
 from functools import lru_cache
 from pydantic_settings import BaseSettings
 import os
-from typing import Final,Dict
+from typing import Dict,Optional
 
 class Setting(BaseSettings):
-    RECIPE_DB_API_KEY: Final[str]
-    PINECONE_API_KEY: Final[str]
-    PINECONE_HOST_URL: Final[str]
-    OPENAI_API_KEY: Final[str]
+    # 접속 정보는 사용하는 시점에 require 로 확인 (설정만 필요한 도구는 키 없이도 import 가능)
+    RECIPE_DB_API_KEY: str = ""
+    PINECONE_API_KEY: str = ""
+    PINECONE_HOST_URL: str = ""
+    OPENAI_API_KEY: str = ""
     
     #추가설정
-    RABBITMQ_HOST : Final[str]
+    RABBITMQ_HOST : str = ""
     RABBITMQ_QUEUE : str = "recommendation.queue"
     RABBITMQ_RESPONSE_QUEUE : str = "response.queue"
     RABBITMQ_EXCHANGE: str = "recommendation.exchange"
@@ -22,13 +23,124 @@ class Setting(BaseSettings):
     'x-dead-letter-routing-key': 'dlq.rc.zipbob',
     'x-queue-type': 'classic'
     }
+    # 동시 처리 설정 (1이면 기존처럼 한 번에 하나씩 처리)
+    LISTENER_CONCURRENCY: int = 4
+    RABBITMQ_PREFETCH_COUNT: int = 4
+    LISTENER_DRAIN_TIMEOUT: float = 60.0  # 종료 시 처리 중인 메시지를 기다리는 최대 시간(초)
+    # 처리 기한: x-deadline 헤더(epoch 초/밀리초) 또는 발행 시각 + DEADLINE_BUDGET 이 지나면 DLX 로 보낸다
+    DEADLINE_ENABLED: bool = True
+    DEADLINE_BUDGET: float = 60.0  # 발행 시각 기준 처리 기한(초), 큐의 x-message-ttl 과 맞춤
+    DEADLINE_MIN_SEARCH_BUDGET: float = 1.0  # 검색을 시작하려면 남아 있어야 하는 시간(초)
+    DEADLINE_MIN_LLM_BUDGET: float = 8.0  # LLM 호출을 시작하려면 남아 있어야 하는 시간(초)
+    # 우선순위 레인: bulk 큐를 지정하면 함께 소비하고, 처리 슬롯이 부족할 때 기본(interactive) 큐를 먼저 처리
+    RABBITMQ_BULK_QUEUE: Optional[str] = None  # 예: recommendation.bulk.queue
+    RABBITMQ_BULK_ROUTING_KEY: str = "recommendation.zipbob.bulk"
+    LISTENER_BULK_CONCURRENCY: int = 1  # bulk 요청이 동시에 쓸 수 있는 최대 처리 슬롯 (prefetch 도 같은 값)
+    # HTTP 추천 API (POST /recommend, /recommend/stream): 브로커를 거치지 않고 같은 파이프라인을 프로세스 안에서 실행
+    HTTP_MAX_CONCURRENCY: int = 8  # 동시에 처리할 HTTP 요청 수 (LLM 호출 수는 LLM_MAX_CONCURRENCY 를 큐 처리와 함께 사용)
+    HTTP_MAX_WAITING: int = 16  # 처리 슬롯을 기다릴 수 있는 요청 수 (넘으면 바로 503)
+    HTTP_REQUEST_TIMEOUT: float = 30.0  # 요청 처리 제한 시간(초), x-deadline 헤더가 더 이르면 그 값을 사용
+    # 응답 발행 설정
+    PUBLISHER_CHANNEL_POOL_SIZE: int = 4  # 발행 확인 모드 채널 수
+    PUBLISHER_MAX_OUTSTANDING_CONFIRMS: int = 256  # 확인 대기 메시지가 이보다 많으면 발행 대기
+    PUBLISHER_BATCH_CONFIRMS: bool = True  # 스트리밍 메시지의 확인을 모아서 기다림
+    PUBLISHER_CONFIRM_TIMEOUT: float = 10.0  # 초
+    # 메시지 직렬화: 요청 본문 크기 제한과 응답 압축 (content_encoding 으로 표시, 받는 쪽에서 해제 필요)
+    MESSAGE_MAX_BYTES: int = 1024 * 1024  # 압축 해제 후 요청 본문 최대 크기 (0이면 제한 없음)
+    MESSAGE_COMPRESSION: str = "none"  # none | gzip | deflate
+    MESSAGE_COMPRESSION_MIN_BYTES: int = 8192  # 이보다 큰 응답만 압축
+    # 멀티 프로세스 워커 모드 (python -m app.worker)
+    WORKER_PROCESSES: int = 0  # 워커 프로세스 수 (0이면 CPU 코어 수)
+    WORKER_PRELOAD_MODEL: bool = True  # 부모 프로세스에서 모델을 로드해 워커들이 copy-on-write 로 공유
+    WORKER_HEARTBEAT_INTERVAL: float = 5.0  # 초
+    WORKER_HEARTBEAT_TIMEOUT: float = 60.0  # 이 시간 동안 heartbeat 가 없으면 워커를 재시작
+    WORKER_STARTUP_TIMEOUT: float = 300.0  # 워커 시작(워밍업, 연결)을 기다리는 최대 시간(초)
+    WORKER_RESTART_MAX_DELAY: float = 60.0  # 연속 실패 시 재시작 간격 상한(초)
+    WORKER_HEALTH_PORT: int = 8001  # 워커 상태 확인 HTTP 포트 (0이면 사용 안 함)
     MODEL_NAME: str = "intfloat/multilingual-e5-large-instruct"
+    # 임베딩 모델 상주 정책: resident | idle_timeout | per_call
+    EMBEDDING_RESIDENCY: str = "resident"
+    EMBEDDING_IDLE_TIMEOUT: float = 300.0  # idle_timeout 정책에서 언로드까지 대기 시간(초)
+    EMBEDDING_MAX_WORKERS: int = 2  # 임베딩 전용 스레드 풀 크기
+    # 임베딩 추론 백엔드: torch | torch_int8 | onnx | onnx_int8
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_NUM_THREADS: int = 0  # 추론 스레드 수 (0이면 라이브러리 기본값)
+    EMBEDDING_ONNX_PATH: Optional[str] = None  # ONNX 변환 모델 저장 위치 (기본: data/onnx/<모델명>)
+    EMBEDDING_ONNX_QUANTIZATION: str = "avx2"  # onnx_int8 양자화 설정: avx2 | avx512 | avx512_vnni | arm64
+    LLM_MAX_CONCURRENCY: int = 8  # 동시에 진행할 수 있는 LLM 호출 수
+    LLM_STREAMING: bool = False  # 완성된 레시피를 하나씩 응답 큐로 발행
+    # OpenAI 호출 한도 (0이면 제한 없음)와 재시도
+    LLM_REQUESTS_PER_MINUTE: int = 500
+    LLM_TOKENS_PER_MINUTE: int = 200000  # 프롬프트 토큰 + max_tokens 로 계산 (OpenAI 한도 계산 방식)
+    LLM_MAX_RETRIES: int = 4  # 429/5xx/타임아웃 재시도 횟수
+    LLM_RETRY_BASE_DELAY: float = 1.0  # 초
+    LLM_RETRY_MAX_DELAY: float = 30.0  # 초
+    LLM_COALESCE_REQUESTS: bool = True  # 같은 재료 조합의 동시 요청은 LLM 호출 하나를 공유
+    # 쿼리 임베딩 마이크로 배칭 (동시에 들어온 요청을 모아 한 번에 임베딩)
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_SIZE: int = 16
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    # 쿼리 임베딩 캐시
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 메모리 상한 (1024차원 기준 약 16,000개)
+    EMBEDDING_CACHE_PATH: Optional[str] = None  # 지정 시 sqlite 디스크 캐시 사용
+    # 추천 응답 캐시
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: float = 3600.0  # 초
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_SEMANTIC: bool = False  # 임베딩 유사도 기반 재사용 여부
+    RESPONSE_CACHE_SEMANTIC_THRESHOLD: float = 0.97  # 코사인 유사도 임계값
+    # LLM 컨텍스트 예산
+    CONTEXT_MAX_DOCUMENTS: int = 20  # 프롬프트에 넣을 최대 레시피 수
+    CONTEXT_MAX_TOKENS: int = 4000  # 관련 문서에 쓸 최대 토큰 수
+    CONTEXT_MAX_STEPS: int = 6  # 레시피당 최대 조리 단계 수
+    CONTEXT_MAX_STEP_CHARS: int = 120  # 조리 단계당 최대 글자 수
+    CONTEXT_TOKEN_ENCODING: str = "o200k_base"  # gpt-4o 계열 토크나이저
     VECTOR_DB_NAME : str = "recipes"
     VECTOR_DIMENSION: int = 1024
     DEFAULT_TOP_K: int = 500
+    # 검색 모드: vector(벡터 유사도만) | hybrid(재료 역색인 + 벡터 유사도 RRF 결합)
+    SEARCH_MODE: str = "vector"
+    # 사용자 재료를 하나 이상 포함한 레시피만 검색 (ingredient_names 필드가 필요하므로 기존 인덱스는 다시 적재)
+    SEARCH_METADATA_FILTER: bool = False
+    HYBRID_VECTOR_TOP_K: int = 100  # hybrid 모드의 벡터 후보 수
+    HYBRID_LEXICAL_TOP_K: int = 100  # hybrid 모드의 재료 역색인 후보 수
+    HYBRID_RRF_K: int = 60
+    HYBRID_METADATA_PATH: Optional[str] = None  # 역색인을 만들 메타데이터 JSONL (없으면 로컬 저장소 사용)
+    # 2단계 검색: id/점수만 조회 후 최종 후보의 메타데이터만 캐시/저장소에서 채움
+    SEARCH_TWO_PHASE: bool = False
+    METADATA_CACHE_MAX_ENTRIES: int = 20000
+    METADATA_CACHE_PATH: Optional[str] = None  # 지정 시 sqlite 디스크 캐시 사용
+    METADATA_FETCH_BATCH_SIZE: int = 100  # 저장소 fetch 한 번에 조회할 id 수
+    PINECONE_POOL_THREADS: int = 8  # 데이터 플레인 HTTP 연결 풀/스레드 수
+    # 벡터 저장소: pinecone | local
+    VECTOR_STORE_BACKEND: str = "pinecone"
+    LOCAL_VECTOR_STORE_PATH: str = "data/vector_store"
+    LOCAL_VECTOR_STORE_ANN: str = "none"  # none(정확 검색) | hnsw (hnswlib 필요)
+    LOCAL_VECTOR_STORE_HNSW_M: int = 16
+    LOCAL_VECTOR_STORE_HNSW_EF_CONSTRUCTION: int = 200
+    LOCAL_VECTOR_STORE_HNSW_EF: int = 128
+    # 로컬 저장소 벡터 압축 (정확 검색 경로): 압축 코드로 후보를 고른 뒤 원본 벡터로 re-rank
+    LOCAL_VECTOR_STORE_REDUCTION: str = "none"  # none | truncate(Matryoshka) | pca
+    LOCAL_VECTOR_STORE_REDUCED_DIMENSION: int = 256
+    LOCAL_VECTOR_STORE_QUANTIZATION: str = "none"  # none | int8 | binary
+    LOCAL_VECTOR_STORE_RERANK_FACTOR: int = 4  # top_k 의 몇 배를 원본 벡터로 다시 점수 매길지 (0이면 re-rank 생략)
+    # 레시피 적재 파이프라인
+    INGEST_STATE_PATH: str = "data/ingest_state.db"  # 적재 완료 레시피의 내용 해시 (재개용)
+    INGEST_EMBED_BATCH_SIZE: int = 256
+    INGEST_UPSERT_BATCH_SIZE: int = 100
+    INGEST_WORKERS: int = 4  # 병렬 upsert 스레드 수
+    INGEST_CHECKPOINT_SIZE: int = 5000  # 이만큼 upsert 할 때마다 저장소를 flush 하고 체크포인트에 기록
     LOG_LEVEL: str = "INFO"
+    TRACING_ENABLED: bool = False  # opentelemetry 설치 시 단계별 span 기록
 
 
+    def require(self, *names: str):
+        """필요한 설정이 비어 있으면 오류"""
+        missing = [name for name in names if not getattr(self, name)]
+        if missing:
+            raise ValueError(f"환경 변수가 설정되지 않았습니다: {', '.join(missing)}")
+
     class Config:
         env_file = os.getenv("ENV_FILE", ".env")
         frozen = True  # 불변 객체로 만들기
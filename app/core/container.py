@@ -0,0 +1,92 @@
+from threading import RLock
+from typing import Any, Callable, Dict, Optional
+from app.core.logger import setup_logger
+import time
+
+logger = setup_logger(__name__)
+
+class Container:
+    """서비스 인스턴스를 처음 사용할 때 만드는 의존성 컨테이너
+
+    모듈을 import 하는 것만으로는 LLM 클라이언트, 토크나이저, 캐시 파일 등을 만들지 않는다.
+    이름마다 한 번만 생성하며 생성에 걸린 시간은 시작 시간 보고에 사용한다.
+    """
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = RLock()
+        self.init_times: Dict[str, float] = {}  # 이름별 생성 시간(초), 생성 순서대로
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        with self._lock:
+            self._factories[name] = factory
+
+    def lazy(self, name: str, factory: Callable[[], Any]) -> "LazyService":
+        """factory 를 등록하고 모듈 전역 변수로 쓸 지연 생성 프록시를 반환"""
+        self.register(name, factory)
+        return LazyService(self, name)
+
+    def resolve(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"등록되지 않은 서비스입니다: {name}")
+                started = time.perf_counter()
+                instance = factory()
+                self.init_times[name] = time.perf_counter() - started
+                self._instances[name] = instance
+                logger.debug(f"{name} 생성 ({self.init_times[name] * 1000:.0f}ms)")
+            return instance
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    def override(self, name: str, instance: Any):
+        """등록된 서비스 대신 사용할 인스턴스 지정 (벤치마크, 대체 구현용)"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def reset(self, name: Optional[str] = None):
+        """생성된 인스턴스를 버려 다음 사용 시 다시 만들게 한다 (name 이 없으면 전체)"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+                self.init_times.clear()
+            else:
+                self._instances.pop(name, None)
+                self.init_times.pop(name, None)
+
+    @property
+    def names(self):
+        return list(self._factories)
+
+class LazyService:
+    """컨테이너의 서비스를 가리키는 프록시
+
+    `from ... import search_service` 처럼 모듈 전역 이름으로 가져와도 실제 인스턴스는
+    속성에 처음 접근할 때 만든다.
+    """
+    __slots__ = ("_container", "_name")
+
+    def __init__(self, container: Container, name: str):
+        object.__setattr__(self, "_container", container)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._container.resolve(self._name), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(self._container.resolve(self._name), attr, value)
+
+    def __repr__(self) -> str:
+        if self._container.is_initialized(self._name):
+            return repr(self._container.resolve(self._name))
+        return f"<lazy {self._name}>"
+
+# 전역 서비스 컨테이너
+container = Container()
@@ -15,6 +15,19 @@ class EmbeddingException(AppException):
     def __init__(self,message:str="Embedding Error"):
         super().__init__(message,status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class InvalidMessageException(AppException):
+    def __init__(self,message:str="Invalid Message"):
+        super().__init__(message,status.HTTP_400_BAD_REQUEST)
+
+class OverloadedException(AppException):
+    def __init__(self,message:str="Service Overloaded"):
+        super().__init__(message,status.HTTP_503_SERVICE_UNAVAILABLE)
+
+class DeadlineExceededException(AppException):
+    def __init__(self,message:str="Deadline Exceeded",stage:str=""):
+        super().__init__(message,status.HTTP_504_GATEWAY_TIMEOUT)
+        self.stage = stage
+
 def handle_exception(e:AppException):
     return {
         "error":e.message,
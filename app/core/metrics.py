@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from app.core import setting
+from app.core.logger import setup_logger
+import sys
+import time
+
+logger = setup_logger(__name__)
+
+# 요청 단위 correlation id (트레이스 span 속성과 로그에 사용)
+correlation_id_var: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+STAGE_LATENCY = Histogram(
+    "recommendation_stage_seconds",
+    "추천 파이프라인 단계별 소요 시간",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60),
+)
+STAGE_ERRORS = Counter(
+    "recommendation_stage_errors_total",
+    "추천 파이프라인 단계별 오류 수",
+    ["stage"],
+)
+CACHE_REQUESTS = Counter(
+    "recommendation_cache_requests_total",
+    "캐시 조회 결과 수",
+    ["cache", "result"],
+)
+MESSAGES_IN_FLIGHT = Gauge(
+    "recommendation_messages_in_flight",
+    "처리 중인 추천 요청 수",
+)
+MESSAGES_PROCESSED = Counter(
+    "recommendation_messages_total",
+    "처리한 추천 요청 수",
+    ["result"],
+)
+DEADLINE_EXCEEDED = Counter(
+    "recommendation_deadline_exceeded_total",
+    "처리 기한이 지나 중단한 요청 수 (중단한 단계별)",
+    ["stage"],
+)
+HTTP_REQUESTS = Counter(
+    "recommendation_http_requests_total",
+    "HTTP 추천 API 요청 수",
+    ["endpoint", "result"],
+)
+HTTP_IN_FLIGHT = Gauge(
+    "recommendation_http_in_flight",
+    "처리 중인 HTTP 추천 요청 수 (처리 슬롯을 기다리는 요청 제외)",
+)
+EMBEDDING_MODEL_RESIDENT = Gauge(
+    "embedding_model_resident",
+    "임베딩 모델이 메모리에 올라와 있으면 1",
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM 토큰 사용량",
+    ["type"],
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total",
+    "LLM 호출 재시도 수",
+    ["error"],
+)
+
+def _load_tracer():
+    """TRACING_ENABLED 이고 opentelemetry 가 설치되어 있을 때만 tracer 사용"""
+    if not setting.TRACING_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace
+        return trace.get_tracer("vectorragllm")
+    except ImportError:
+        logger.warning("opentelemetry 가 설치되지 않아 트레이싱을 사용하지 않습니다")
+        return None
+
+_tracer = _load_tracer()
+
+# 단계 소요 시간을 원본 값 그대로 받아 갈 콜백 (벤치마크의 정확한 백분위 계산용)
+_stage_observers: List[Callable[[str, float], None]] = []
+
+def add_stage_observer(observer: Callable[[str, float], None]):
+    _stage_observers.append(observer)
+
+def remove_stage_observer(observer: Callable[[str, float], None]):
+    if observer in _stage_observers:
+        _stage_observers.remove(observer)
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+    for observer in _stage_observers:
+        observer(stage, seconds)
+
+@contextmanager
+def track_stage(stage: str):
+    """단계 소요 시간을 기록하고 오류를 세며, 트레이싱이 켜져 있으면 span 을 남긴다"""
+    span_context = None
+    if _tracer is not None:
+        span_context = _tracer.start_as_current_span(
+            stage, attributes={"correlation_id": correlation_id_var.get() or ""}
+        )
+        span_context.__enter__()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+        if span_context is not None:
+            span_context.__exit__(*sys.exc_info())
+
+def record_cache(cache: str, hit: bool, count: int = 1):
+    if count:
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc(count)
@@ -0,0 +1,114 @@
+"""시작 시간 보고
+
+새 인터프리터에서 대상 모듈을 import 하면서 `-X importtime` 으로 모듈별 import 시간을 재고,
+이어서 컨테이너에 등록된 서비스를 하나씩 만들어 초기화 시간을 잰다.
+
+사용 예:
+    python -m app.core.startup_report
+    python -m app.core.startup_report --module app.worker --init --warm-up --top 20
+"""
+from typing import Dict, List, Optional, Tuple
+import argparse
+import importlib
+import json
+import re
+import subprocess
+import sys
+import time
+
+# "import time:       412 |       1203 |   langchain_core.prompts" 형식 (단위: 마이크로초)
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+def measure_imports(module: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """새 인터프리터에서 module 을 import 하고 (전체 초, [(모듈, self 초, cumulative 초)]) 반환"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    records = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        name, self_s, cumulative_s = match.group(3), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6
+        records.append((name, self_s, cumulative_s))
+        if name == module:
+            total = cumulative_s
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr.strip().splitlines()[-1]}")
+    return total, records
+
+def group_imports(records: List[Tuple[str, float, float]]) -> Dict[str, float]:
+    """self 시간을 패키지별로 합산 (app 내부 모듈은 app.service.llm 처럼 세 단계까지 구분)"""
+    groups: Dict[str, float] = {}
+    for name, self_s, _ in records:
+        parts = name.split(".")
+        key = ".".join(parts[:3]) if parts[0] == "app" else parts[0]
+        groups[key] = groups.get(key, 0.0) + self_s
+    return dict(sorted(groups.items(), key=lambda item: item[1], reverse=True))
+
+def measure_inits(module: str, warm_up: bool = False) -> Dict[str, object]:
+    """module 을 import 한 뒤 컨테이너의 서비스를 하나씩 만들어 초기화 시간(초)을 잰다 (실패하면 오류 메시지)"""
+    importlib.import_module(module)
+    from app.core.container import container
+    results: Dict[str, object] = {}
+    for name in container.names:
+        try:
+            container.resolve(name)
+            results[name] = container.init_times[name]
+        except Exception as e:
+            results[name] = f"오류: {e}"
+    if warm_up:
+        from app.service.preprocess.data_embedding import EmbeddingService
+        started = time.perf_counter()
+        try:
+            EmbeddingService().warm_up()
+            results["embedding_warm_up"] = time.perf_counter() - started
+        except Exception as e:
+            results["embedding_warm_up"] = f"오류: {e}"
+    return results
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="모듈 import 시간과 서비스 초기화 시간을 보고합니다.")
+    parser.add_argument("--module", default="app.main", help="import 할 시작 모듈")
+    parser.add_argument("--top", type=int, default=15, help="표시할 패키지/모듈 수")
+    parser.add_argument("--init", action="store_true", help="컨테이너에 등록된 서비스 초기화 시간도 측정")
+    parser.add_argument("--warm-up", action="store_true", help="임베딩 모델 로드와 워밍업 시간도 측정 (--init 과 함께)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    try:
+        total, records = measure_imports(args.module)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    groups = group_imports(records)
+    slowest = sorted(records, key=lambda record: record[1], reverse=True)[:args.top]
+    inits = measure_inits(args.module, args.warm_up) if args.init else {}
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "import_s": total,
+            "packages": dict(list(groups.items())[:args.top]),
+            "modules": {name: self_s for name, self_s, _ in slowest},
+            "init_s": inits,
+        }, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{args.module} import: {total:.2f}s (모듈 {len(records)}개)")
+    print(f"\n{'package':<40}{'self_s':>10}{'share':>8}")
+    for name, seconds in list(groups.items())[:args.top]:
+        print(f"{name:<40}{seconds:>10.3f}{seconds / total if total else 0:>8.1%}")
+    print(f"\n{'module':<40}{'self_s':>10}{'cum_s':>10}")
+    for name, self_s, cumulative_s in slowest:
+        print(f"{name:<40}{self_s:>10.3f}{cumulative_s:>10.3f}")
+    if inits:
+        print(f"\n{'service':<40}{'init_s':>10}")
+        for name, value in inits.items():
+            print(f"{name:<40}{value:>10.3f}" if isinstance(value, float) else f"{name:<40}  {value}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,10 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from app.service.listen.listen import listener
-from app.service.publish.publish import publisher
-import asyncio
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.api.recommend import router as recommend_router
+from app.core.exception import AppException, OverloadedException, handle_exception
+from app.pipeline import start_pipeline, stop_pipeline
 import os
 
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
@@ -12,27 +14,25 @@ _listener_task = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global _listener_task
-    
     try:
-        # 리스너와 발행자 설정
-        await listener.setup()
-        await publisher.setup()
-        
-        # 백그라운드 태스크로 리스너 실행
         if _listener_task is None:
-            _listener_task = asyncio.create_task(listener.consume())
-            
+            _listener_task = await start_pipeline()
         yield
-        
     finally:
         # 종료 시 리소스 정리
-        if _listener_task:
-            await listener.cleanup()
-            await publisher.cleanup()
-            _listener_task.cancel()
-            try:
-                await _listener_task
-            except asyncio.CancelledError:
-                pass
+        await stop_pipeline(_listener_task)
+        _listener_task = None
 
 app = FastAPI(lifespan=lifespan)
+# 큐를 거치지 않는 추천 API (같은 검색/생성 파이프라인을 프로세스 안에서 실행)
+app.include_router(recommend_router)
+
+@app.exception_handler(AppException)
+async def app_exception_handler(request: Request, e: AppException):
+    headers = {"Retry-After": "1"} if isinstance(e, OverloadedException) else None
+    return JSONResponse(handle_exception(e), status_code=e.status_code, headers=headers)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 메트릭 (단계별 지연시간, 캐시 적중률, 처리 중 요청 수, 토큰 사용량)"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,69 @@
+from typing import Dict
+from app.core import setting
+from app.core.container import container
+from app.core.logger import setup_logger
+from app.service.listen.listen import listener
+from app.service.publish.publish import publisher
+from app.service.search.search import search_service
+from app.service.preprocess.data_embedding import EmbeddingService
+from app.repositorie.vector_store import get_vector_store
+import asyncio
+import time
+
+logger = setup_logger(__name__)
+
+async def _timed(timings: Dict[str, float], name: str, coroutine):
+    started = time.perf_counter()
+    result = await coroutine
+    timings[name] = time.perf_counter() - started
+    return result
+
+async def _prepare_store():
+    # 벡터 저장소 연결과 인덱스 확인은 시작 시 한 번만 수행
+    await asyncio.to_thread(get_vector_store().connect)
+    await asyncio.to_thread(search_service.prepare)
+
+async def _setup_rabbitmq():
+    await listener.setup()
+    await publisher.setup()
+
+async def start_pipeline() -> asyncio.Task:
+    """임베딩 모델 워밍업, 저장소 연결, RabbitMQ 설정 후 리스너 태스크를 시작
+
+    서로 의존하지 않는 준비 작업은 동시에 진행하고 단계별 소요 시간을 기록한다.
+    """
+    # 접속 정보는 import 가 아니라 처리를 시작할 때 확인
+    setting.require("RABBITMQ_HOST", "OPENAI_API_KEY")
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    await asyncio.gather(
+        # 첫 메시지가 느려지지 않도록 임베딩 모델 워밍업과 LLM 클라이언트 생성을 미리 수행
+        _timed(timings, "embedding_warm_up", asyncio.to_thread(EmbeddingService().warm_up)),
+        _timed(timings, "llm_client", asyncio.to_thread(container.resolve, "recipe_generator")),
+        _timed(timings, "vector_store", _prepare_store()),
+        _timed(timings, "rabbitmq", _setup_rabbitmq()),
+    )
+    logger.info(
+        f"메시지 처리 준비 완료 ({time.perf_counter() - started:.1f}초: "
+        + ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items()) + ")"
+    )
+
+    # 백그라운드 태스크로 리스너 실행
+    return asyncio.create_task(listener.consume())
+
+async def stop_pipeline(listener_task: asyncio.Task = None):
+    """처리 중인 메시지를 마무리하고 연결, 실행기, 모델을 정리"""
+    try:
+        if listener_task is not None:
+            await listener.cleanup()
+            await publisher.cleanup()
+            listener_task.cancel()
+            try:
+                await listener_task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"리스너 종료 중 오류 발생: {e}")
+    finally:
+        EmbeddingService().shutdown()
+        get_vector_store().close()
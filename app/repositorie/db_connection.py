@@ -1,16 +1,16 @@
-from pinecone import Pinecone, ServerlessSpec
 from app.core import setting
 from typing import List, Dict
 from threading import Lock
 from app.core.exception import DatabaseException
 from app.core.logger import setup_logger
-from app.core import setting
-import re
+from app.core.metrics import track_stage
+from app.repositorie.vector_store import VectorStore
+from app.service.preprocess.ingredient import ingredient_normalizer
 import gc
 
 logger = setup_logger(__name__)
 
-class DatabaseConnection:
+class DatabaseConnection(VectorStore):
     _instance = None
     _lock = Lock()
     
@@ -26,89 +26,131 @@ class DatabaseConnection:
             return cls._instance
 
     def _load_connection(self):
+        """Pinecone 클라이언트와 인덱스를 한 번만 열고 이후 요청에서 재사용"""
+        if self._index is not None:
+            return
         with self._connection_lock:
+            if self._index is not None:
+                return
             try :
-                if self._pc is None:
-                    logger.info("Pinecone Connection Loading...")
-                    self._pc = Pinecone(api_key=setting.PINECONE_API_KEY)
-                
-                    # 인덱스 존재 여부 확인
-                    if self.index_name not in self._pc.list_indexes().names():
-                        self._pc.create_index(
-                            name=self.index_name,
-                            dimension=self.dimension,
-                            metric='cosine',
-                            spec=ServerlessSpec(cloud='aws',region='us-east-1')
+                logger.info("Pinecone Connection Loading...")
+                setting.require("PINECONE_API_KEY")
+                from pinecone import Pinecone, ServerlessSpec
+                self._pc = Pinecone(
+                    api_key=setting.PINECONE_API_KEY,
+                    pool_threads=setting.PINECONE_POOL_THREADS
+                )
+
+                # 인덱스 존재 여부 확인 (시작 시 한 번만 수행)
+                if self.index_name not in self._pc.list_indexes().names():
+                    self._pc.create_index(
+                        name=self.index_name,
+                        dimension=self.dimension,
+                        metric='cosine',
+                        spec=ServerlessSpec(cloud='aws',region='us-east-1')
                     )
                     logger.info(f"index '{self.index_name}'create.")
+
+                # 호스트를 직접 지정해 describe_index 호출 없이 데이터 플레인에 연결하고
+                # 연결 풀을 유지해 동시 요청이 소켓을 재사용하도록 한다
+                if setting.PINECONE_HOST_URL:
+                    self._index = self._pc.Index(
+                        host=setting.PINECONE_HOST_URL,
+                        pool_threads=setting.PINECONE_POOL_THREADS
+                    )
                 else:
-                    logger.info("Pinecone '{self.index_name}'Connection Loaded.")
-                # 인덱스 불러오기
-                self._index = self._pc.Index(self.index_name)
+                    self._index = self._pc.Index(
+                        self.index_name,
+                        pool_threads=setting.PINECONE_POOL_THREADS
+                    )
+                logger.info(f"Pinecone '{self.index_name}' Connection Loaded.")
             except Exception as e: 
                 logger.error(f"Connection Error: {e}")
+                self._index = None
+                self._pc = None
                 raise DatabaseException("Pinecone Connection Error")
 
+    def connect(self):
+        """서버 시작 시 연결을 미리 열어 둔다"""
+        self._load_connection()
+
     def _unload_connection(self):
-        try:
-            if self._index is not None:
-                # Index 객체 참조 제거
-                del self._index
-                self._index = None
-                
-            if self._pc is not None:
-                # Pinecone 클라이언트 정리
-                del self._pc
-                self._pc = None
-                
-            # 강제로 가비지 컬렉션 실행
-            gc.collect()
-            logger.info("Connection Unloaded.")
-        except Exception as e:
-            logger.error(f"Connection Unload Error: {e}")
-            raise DatabaseException("Pinecone Connection Unload Error")
+        with self._connection_lock:
+            try:
+                if self._index is not None:
+                    # Index 객체 참조 제거
+                    del self._index
+                    self._index = None
+
+                if self._pc is not None:
+                    # Pinecone 클라이언트 정리
+                    del self._pc
+                    self._pc = None
+
+                # 강제로 가비지 컬렉션 실행
+                gc.collect()
+                logger.info("Connection Unloaded.")
+            except Exception as e:
+                logger.error(f"Connection Unload Error: {e}")
+                raise DatabaseException("Pinecone Connection Unload Error")
 
-    def query(self, vector, top_k, include_metadata=True):
+    def close(self):
+        """서버 종료 시 연결 정리"""
+        self._unload_connection()
+
+    def query(self, vector, top_k, include_metadata=True, filter=None):
         try:
             self._load_connection()
-            result = self._index.query(
-                vector=vector,
-                top_k=top_k,
-                include_metadata=include_metadata
-            )
+            with track_stage("vector_query"):
+                result = self._index.query(
+                    vector=vector,
+                    top_k=top_k,
+                    include_metadata=include_metadata,
+                    filter=filter
+                )
             return result
         except Exception as e: 
             logger.error(f"Query Error: {e}")
             raise DatabaseException("Pinecone Query Error")
-        finally:
-            self._unload_connection()
 
+    def upsert(self, vectors):
+        try:
+            self._load_connection()
+            return self._index.upsert(vectors=list(vectors))
+        except Exception as e:
+            logger.error(f"Upsert Error: {e}")
+            raise DatabaseException("Pinecone Upsert Error")
+
+    def fetch(self, ids):
+        try:
+            self._load_connection()
+            with track_stage("metadata_fetch"):
+                response = self._index.fetch(ids=list(ids))
+            return {vector_id: vector.metadata or {} for vector_id, vector in response.vectors.items()}
+        except Exception as e:
+            logger.error(f"Fetch Error: {e}")
+            raise DatabaseException("Pinecone Fetch Error")
+
+    def fetch_vectors(self, ids):
+        try:
+            self._load_connection()
+            response = self._index.fetch(ids=list(ids))
+            return {vector_id: list(vector.values) for vector_id, vector in response.vectors.items()}
+        except Exception as e:
+            logger.error(f"Fetch Error: {e}")
+            raise DatabaseException("Pinecone Fetch Error")
+
+    # 재료 문자열 정규화는 IngredientNormalizer 로 일원화 (기존 호출부 호환용)
     @staticmethod
-    # 재료 이름에서 양과 단위를 제거하는 함수
-    def strip_quantities(self, ingredients: List[str]) -> List[str]:
-        cleaned_ingredients = []
-        for ingredient in ingredients:
-            # 숫자와 단위 제거를 위한 더 포괄적인 패턴
-            ingredient = re.sub(r'\d+\.?\d*[a-zA-Z가-힣]*', '', ingredient)
-            # 분수 형태 제거
-            ingredient = re.sub(r'\d+\/\d+', '', ingredient)
-            # 측정 단위 제거
-            ingredient = re.sub(r'(약간|T|t|컵|큰술|은술|숟가락|스푼|g|kg|ml|L)', '', ingredient)
-            # 남은 숫자들 제거
-            ingredient = re.sub(r'\d+', '', ingredient)
-            # 특수문자 제거 (슬래시, 물결표 등)
-            ingredient = re.sub(r'[/~]+', '', ingredient)
-            # 양쪽 공백 제거하고 결과 추가
-            cleaned = ingredient.strip()
-            if cleaned:  # 빈 문자열이 아닌 경우만 추가
-                cleaned_ingredients.append(cleaned)
-        return cleaned_ingredients
-    
+    def strip_quantities(ingredients: List[str]) -> List[str]:
+        """재료 이름에서 양과 단위를 제거한 대표 재료명 목록"""
+        names = (ingredient_normalizer.normalize(ingredient) for ingredient in ingredients)
+        return [name for name in names if name]
+
     @staticmethod
-    def extract_ingredient_name(self, ingredient:str) -> str:
-        # 괄호와 슬래시, 물결표 등 불필요한 문자 제거
-        return re.match(r'([^(/~]+)', ingredient).group(1).strip()
-    
+    def extract_ingredient_name(ingredient: str) -> str:
+        return ingredient_normalizer.parse(ingredient).raw_name
+
     @staticmethod
-    def process_ingredients(self, recipe_metadata: Dict) -> List[str]:
-        return [self.extract_ingredient_name(ing) for ing in recipe_metadata['ingredients']]
\ No newline at end of file
+    def process_ingredients(recipe_metadata: Dict) -> List[str]:
+        return [DatabaseConnection.extract_ingredient_name(ing) for ing in recipe_metadata['ingredients']]
@@ -0,0 +1,359 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+from threading import Lock, RLock
+from app.core import setting
+from app.core.exception import DatabaseException
+from app.core.logger import setup_logger
+from app.core.metrics import track_stage
+from app.repositorie.vector_store import VectorStore, VectorRecord
+from app.repositorie.vector_compression import VectorCompressor
+import numpy as np
+import json
+import os
+
+logger = setup_logger(__name__)
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    """Pinecone 메타데이터 필터 조건 하나를 평가 (리스트 값은 원소 중 하나라도 맞으면 참)"""
+    values = value if isinstance(value, list) else [value]
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    for operator, operand in condition.items():
+        if operator == "$eq" and operand not in values:
+            return False
+        if operator == "$ne" and operand in values:
+            return False
+        if operator == "$in" and not any(v in operand for v in values):
+            return False
+        if operator == "$nin" and any(v in operand for v in values):
+            return False
+    return True
+
+def _match_filter(metadata: Dict[str, Any], filter: Dict[str, Any]) -> bool:
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(_match_filter(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(_match_filter(metadata, sub) for sub in condition):
+                return False
+        elif key not in metadata or not _match_condition(metadata[key], condition):
+            return False
+    return True
+
+class LocalVectorStore(VectorStore):
+    """프로세스 내 벡터 저장소
+
+    정규화된 float32 행렬(vectors.npy)을 메모리 매핑으로 열고 메타데이터(metadata.jsonl)는
+    같은 행 순서로 메모리에 둔다. 기본은 NumPy 내적으로 정확한 top-k 를 구하고,
+    LOCAL_VECTOR_STORE_ANN=hnsw 이면 hnswlib 근사 검색을 사용한다.
+    압축 설정(LOCAL_VECTOR_STORE_REDUCTION/QUANTIZATION)이 있으면 정확 검색 대신 압축 코드로
+    후보를 고르고 원본 벡터로 re-rank 한다.
+    """
+    _instance = None
+    _lock = Lock()
+
+    VECTORS_FILE = "vectors.npy"
+    METADATA_FILE = "metadata.jsonl"
+    HNSW_FILE = "hnsw.bin"
+    COMPRESSED_FILE = "compressed.npz"
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super().__new__(cls)
+                cls._instance.path = setting.LOCAL_VECTOR_STORE_PATH
+                cls._instance.dimension = setting.VECTOR_DIMENSION
+                cls._instance.ann = setting.LOCAL_VECTOR_STORE_ANN
+                cls._instance._store_lock = RLock()
+                cls._instance._vectors = None
+                cls._instance._ids = []
+                cls._instance._metadata = []
+                cls._instance._rows = {}
+                cls._instance._ann_index = None
+                cls._instance._dirty = False
+                cls._instance._appended = []  # 아직 행렬에 합치지 않은 새 벡터
+                compressor = VectorCompressor(
+                    setting.LOCAL_VECTOR_STORE_REDUCTION,
+                    setting.LOCAL_VECTOR_STORE_REDUCED_DIMENSION,
+                    setting.LOCAL_VECTOR_STORE_QUANTIZATION
+                )
+                cls._instance.compressor = compressor if compressor.enabled else None
+                cls._instance._codes = None
+            return cls._instance
+
+    def _load(self):
+        if self._vectors is not None:
+            return
+        with self._store_lock:
+            if self._vectors is not None:
+                return
+            try:
+                vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+                metadata_path = os.path.join(self.path, self.METADATA_FILE)
+                if os.path.exists(vectors_path):
+                    logger.info(f"로컬 벡터 저장소 로딩: {self.path}")
+                    vectors = np.load(vectors_path, mmap_mode="r")
+                    ids, metadata = [], []
+                    with open(metadata_path, encoding="utf-8") as f:
+                        for line in f:
+                            record = json.loads(line)
+                            ids.append(record["id"])
+                            metadata.append(record.get("metadata", {}))
+                    if len(ids) != vectors.shape[0]:
+                        raise ValueError("벡터 수와 메타데이터 수가 다릅니다")
+                else:
+                    logger.warning(f"로컬 벡터 저장소가 비어 있습니다: {self.path}")
+                    vectors = np.empty((0, self.dimension), dtype=np.float32)
+                    ids, metadata = [], []
+                self._ids = ids
+                self._metadata = metadata
+                self._rows = {vector_id: row for row, vector_id in enumerate(ids)}
+                self._vectors = vectors
+                logger.info(f"로컬 벡터 저장소 로딩 완료 ({len(ids)}개)")
+            except Exception as e:
+                logger.error(f"로컬 벡터 저장소 로딩 오류: {e}")
+                raise DatabaseException("Local vector store load error")
+
+    def connect(self):
+        self._load()
+        if self.ann == "hnsw":
+            self._get_ann_index()
+        elif self.compressor is not None:
+            self._get_codes()
+
+    def close(self):
+        self.flush()
+
+    def flush(self):
+        if self._dirty:
+            self.save()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def query(self, vector, top_k, include_metadata=True, filter=None):
+        with track_stage("vector_query"):
+            return self._query(vector, top_k, include_metadata, filter)
+
+    def _query(self, vector, top_k, include_metadata, filter):
+        try:
+            self._load()
+            query = self._normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+            with self._store_lock:
+                self._merge_appended()
+                total = len(self._ids)
+                if total == 0:
+                    return {"matches": []}
+                top_k = min(top_k, total)
+
+                ann_index = self._get_ann_index() if self.ann == "hnsw" and not filter else None
+                if filter:
+                    # 필터에 맞는 행만 정확 검색
+                    candidates = np.array(
+                        [row for row, metadata in enumerate(self._metadata) if _match_filter(metadata, filter)],
+                        dtype=np.int64
+                    )
+                    if len(candidates) == 0:
+                        return {"matches": []}
+                    top_k = min(top_k, len(candidates))
+                    candidate_scores = self._vectors[candidates] @ query
+                    order = np.argpartition(-candidate_scores, top_k - 1)[:top_k]
+                    order = order[np.argsort(-candidate_scores[order])]
+                    rows = candidates[order]
+                    scores = candidate_scores[order]
+                elif ann_index is not None:
+                    # ef 는 top_k 이상이어야 top_k 개를 돌려준다
+                    ann_index.set_ef(max(setting.LOCAL_VECTOR_STORE_HNSW_EF, top_k))
+                    labels, distances = ann_index.knn_query(query, k=top_k)
+                    rows = labels[0]
+                    scores = 1.0 - distances[0]
+                elif self.compressor is not None:
+                    rows, scores = self.compressor.search(
+                        self._get_codes(), self._vectors, query, top_k,
+                        setting.LOCAL_VECTOR_STORE_RERANK_FACTOR
+                    )
+                else:
+                    all_scores = self._vectors @ query
+                    rows = np.argpartition(-all_scores, top_k - 1)[:top_k]
+                    rows = rows[np.argsort(-all_scores[rows])]
+                    scores = all_scores[rows]
+
+                return {
+                    "matches": [
+                        {
+                            "id": self._ids[row],
+                            "score": float(score),
+                            "metadata": self._metadata[row] if include_metadata else {},
+                        }
+                        for row, score in zip(rows.tolist(), scores.tolist())
+                    ]
+                }
+        except DatabaseException:
+            raise
+        except Exception as e:
+            logger.error(f"Query Error: {e}")
+            raise DatabaseException("Local vector store query error")
+
+    def fetch(self, ids):
+        self._load()
+        with self._store_lock:
+            return {
+                vector_id: self._metadata[self._rows[vector_id]]
+                for vector_id in ids if vector_id in self._rows
+            }
+
+    def fetch_vectors(self, ids):
+        """저장된 벡터 조회 (저장 시 정규화했으므로 단위 벡터)"""
+        self._load()
+        with self._store_lock:
+            self._merge_appended()
+            return {
+                vector_id: self._vectors[self._rows[vector_id]].tolist()
+                for vector_id in ids if vector_id in self._rows
+            }
+
+    def items(self) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """저장된 (id, 메타데이터) 전체"""
+        self._load()
+        with self._store_lock:
+            return list(zip(self._ids, self._metadata))
+
+    def upsert(self, vectors: Iterable[VectorRecord]):
+        self._load()
+        with self._store_lock:
+            upserted = 0
+            for vector_id, values, metadata in vectors:
+                normalized = self._normalize(np.asarray(values, dtype=np.float32)[None, :])[0]
+                row = self._rows.get(vector_id)
+                if row is None:
+                    self._rows[vector_id] = len(self._ids)
+                    self._ids.append(vector_id)
+                    self._metadata.append(metadata)
+                    self._appended.append(normalized)
+                    upserted += 1
+                elif row >= len(self._vectors):
+                    self._appended[row - len(self._vectors)] = normalized
+                    self._metadata[row] = metadata
+                else:
+                    if not self._vectors.flags.writeable:
+                        # 메모리 매핑을 쓰기 가능한 복사본으로
+                        self._vectors = np.array(self._vectors, dtype=np.float32)
+                    self._vectors[row] = normalized
+                    self._metadata[row] = metadata
+            self._ann_index = None
+            self._codes = None
+            self._dirty = True
+            return {"upserted_count": upserted}
+
+    def _merge_appended(self):
+        """대량 적재 중 매번 행렬을 복사하지 않도록 새 벡터는 모아 두었다가 한 번에 합친다"""
+        if self._appended:
+            self._vectors = np.vstack([self._vectors, np.stack(self._appended)])
+            self._appended = []
+
+    def save(self):
+        """벡터와 메타데이터를 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._store_lock:
+            self._merge_appended()
+            os.makedirs(self.path, exist_ok=True)
+            vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+            metadata_path = os.path.join(self.path, self.METADATA_FILE)
+            with open(vectors_path + ".tmp", "wb") as f:
+                np.save(f, np.asarray(self._vectors, dtype=np.float32))
+            with open(metadata_path + ".tmp", "w", encoding="utf-8") as f:
+                for vector_id, metadata in zip(self._ids, self._metadata):
+                    f.write(json.dumps({"id": vector_id, "metadata": metadata}, ensure_ascii=False) + "\n")
+            os.replace(vectors_path + ".tmp", vectors_path)
+            os.replace(metadata_path + ".tmp", metadata_path)
+            hnsw_path = os.path.join(self.path, self.HNSW_FILE)
+            if self._ann_index is not None:
+                self._ann_index.save_index(hnsw_path)
+            elif os.path.exists(hnsw_path):
+                os.remove(hnsw_path)  # 변경 전 벡터로 만든 인덱스는 버린다
+            compressed_path = os.path.join(self.path, self.COMPRESSED_FILE)
+            if self._codes is not None:
+                self._save_codes()
+            elif os.path.exists(compressed_path):
+                os.remove(compressed_path)
+            self._dirty = False
+            logger.info(f"로컬 벡터 저장소 저장 완료 ({len(self._ids)}개)")
+
+    def _get_ann_index(self) -> Optional[Any]:
+        """HNSW 인덱스 (hnswlib 가 없으면 정확 검색으로 대체)"""
+        if self._ann_index is not None:
+            return self._ann_index
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("hnswlib 가 설치되지 않아 정확 검색을 사용합니다")
+            self.ann = "none"
+            return None
+
+        with self._store_lock:
+            self._merge_appended()
+            total = len(self._ids)
+            index_path = os.path.join(self.path, self.HNSW_FILE)
+            index = None
+            if not self._dirty and os.path.exists(index_path):
+                index = hnswlib.Index(space="ip", dim=self.dimension)
+                index.load_index(index_path, max_elements=total)
+                if index.get_current_count() != total:
+                    index = None
+            if index is None:
+                logger.info(f"HNSW 인덱스 생성 중 ({total}개)")
+                index = hnswlib.Index(space="ip", dim=self.dimension)
+                index.init_index(
+                    max_elements=max(total, 1),
+                    ef_construction=setting.LOCAL_VECTOR_STORE_HNSW_EF_CONSTRUCTION,
+                    M=setting.LOCAL_VECTOR_STORE_HNSW_M
+                )
+                if total:
+                    index.add_items(np.asarray(self._vectors), np.arange(total))
+            self._ann_index = index
+            return index
+
+    def _get_codes(self) -> Optional[np.ndarray]:
+        """압축 코드 (저장된 파일이 현재 벡터/설정과 맞으면 불러오고, 아니면 새로 학습)
+
+        저장소가 비어 있으면 학습하지 않고 None 을 반환한다 (벡터가 추가된 뒤 처음 검색할 때 학습).
+        """
+        if self._codes is not None:
+            return self._codes
+        with self._store_lock:
+            self._merge_appended()
+            total = len(self._ids)
+            if total == 0:
+                logger.info("저장된 벡터가 없어 압축 코드 생성을 미룹니다")
+                return None
+            try:
+                compressed_path = os.path.join(self.path, self.COMPRESSED_FILE)
+                if not self._dirty and os.path.exists(compressed_path):
+                    with np.load(compressed_path) as state:
+                        if len(state["codes"]) == total and self.compressor.load_state(state):
+                            self._codes = state["codes"]
+                if self._codes is None:
+                    logger.info(f"벡터 압축 코드 생성 중 ({total}개, {self.compressor.params})")
+                    self.compressor.fit(self._vectors)
+                    self._codes = self.compressor.encode(self._vectors)
+                    if not self._dirty:
+                        # 디스크의 벡터와 같은 상태이므로 바로 저장해 재시작 시 다시 학습하지 않는다
+                        os.makedirs(self.path, exist_ok=True)
+                        self._save_codes()
+            except Exception as e:
+                logger.error(f"벡터 압축 코드 생성 오류: {e}")
+                self._codes = None
+                raise DatabaseException("Local vector store compression error")
+            logger.info(
+                f"벡터 압축 사용: 벡터당 {self.compressor.bytes_per_vector(self.dimension):.0f}바이트 "
+                f"(원본 {self.dimension * 4}바이트, 압축 차원 {self.compressor.output_dimension(self.dimension)})"
+            )
+            return self._codes
+
+    def _save_codes(self):
+        compressed_path = os.path.join(self.path, self.COMPRESSED_FILE)
+        with open(compressed_path + ".tmp", "wb") as f:
+            np.savez(f, codes=self._codes, **self.compressor.state())
+        os.replace(compressed_path + ".tmp", compressed_path)
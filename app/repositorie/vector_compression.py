@@ -0,0 +1,185 @@
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+
+# 바이트 값별 1 비트 수 (binary 코드의 해밍 거리 계산용, NumPy 2 에서는 bitwise_count 사용)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_popcount = getattr(np, "bitwise_count", _POPCOUNT.__getitem__)
+
+REDUCTIONS = ("none", "truncate", "pca")
+QUANTIZATIONS = ("none", "int8", "binary")
+
+class VectorCompressor:
+    """벡터 압축 (차원 축소 + 양자화)
+
+    - truncate: 앞쪽 dimension 개 성분만 사용 (Matryoshka 방식으로 학습된 모델에 적합)
+    - pca: 저장된 벡터로 학습한 주성분으로 투영
+    - int8: 차원별 스케일로 8비트 정수화, binary: 부호만 1비트로 저장
+
+    압축 코드로 후보를 넉넉히 고른 뒤 원본 float32 벡터로 다시 점수를 매겨(re-rank) 정확도를 보완한다.
+    """
+    CHUNK_ROWS = 65536  # int8/binary 점수를 계산할 때 한 번에 float 로 바꾸는 행 수
+
+    def __init__(self, reduction: str = "none", dimension: int = 256, quantization: str = "none"):
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"지원하지 않는 차원 축소 방식입니다: {reduction}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"지원하지 않는 양자화 방식입니다: {quantization}")
+        self.reduction = reduction
+        self.dimension = dimension
+        self.quantization = quantization
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.reduction != "none" or self.quantization != "none"
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return {"reduction": self.reduction, "dimension": self.dimension, "quantization": self.quantization}
+
+    @property
+    def fitted(self) -> bool:
+        """pca/int8 에 필요한 학습 결과가 있는지 (빈 벡터로는 학습하지 않는다)"""
+        if self.reduction == "pca" and self.components is None:
+            return False
+        return self.quantization != "int8" or self.scale is not None
+
+    def output_dimension(self, full_dimension: int) -> int:
+        """압축 코드의 차원 (pca 주성분 수는 학습한 행 수보다 많을 수 없다)"""
+        if self.reduction == "truncate":
+            return min(self.dimension, full_dimension)
+        if self.reduction == "pca":
+            return len(self.components) if self.components is not None else min(self.dimension, full_dimension)
+        return full_dimension
+
+    def bytes_per_vector(self, full_dimension: int) -> float:
+        dimension = self.output_dimension(full_dimension)
+        if self.quantization == "int8":
+            return float(dimension)
+        if self.quantization == "binary":
+            return float((dimension + 7) // 8)
+        return float(dimension * 4)
+
+    def fit(self, vectors: np.ndarray, sample: int = 50000, seed: int = 0) -> "VectorCompressor":
+        """PCA 주성분과 int8 스케일 학습 (최대 sample 개 행 사용, 빈 벡터면 학습하지 않는다)
+
+        행 수가 dimension 보다 적으면 SVD 가 돌려주는 주성분 수(min(행 수, 원본 차원))만큼만 사용한다.
+        """
+        if len(vectors) == 0:
+            return self
+        if len(vectors) > sample:
+            rows = np.sort(np.random.default_rng(seed).choice(len(vectors), sample, replace=False))
+            vectors = vectors[rows]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.reduction == "pca":
+            self.mean = vectors.mean(axis=0)
+            _, _, vt = np.linalg.svd(vectors - self.mean, full_matrices=False)
+            self.components = vt[:self.dimension].astype(np.float32)
+        if self.quantization == "int8":
+            reduced = self.transform(vectors)
+            self.scale = (np.abs(reduced).max(axis=0) / 127.0).astype(np.float32)
+            self.scale[self.scale == 0] = 1.0
+        return self
+
+    def transform(self, vectors: np.ndarray) -> np.ndarray:
+        """차원 축소 후 다시 정규화한 float32 벡터"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.reduction == "truncate":
+            vectors = vectors[:, :self.dimension]
+        elif self.reduction == "pca":
+            vectors = (vectors - self.mean) @ self.components.T
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """저장용 압축 코드 (메모리 매핑 행렬도 CHUNK_ROWS 단위로 처리)"""
+        if not self.fitted:
+            raise ValueError(f"학습되지 않은 압축 설정입니다: {self.params}")
+        chunks = [
+            self._quantize(self.transform(vectors[i:i + self.CHUNK_ROWS]))
+            for i in range(0, len(vectors), self.CHUNK_ROWS)
+        ]
+        if chunks:
+            return np.concatenate(chunks)
+        return self._quantize(self.transform(np.empty((0, vectors.shape[1]), dtype=np.float32)))
+
+    def _quantize(self, reduced: np.ndarray) -> np.ndarray:
+        if self.quantization == "int8":
+            return np.clip(np.round(reduced / self.scale), -127, 127).astype(np.int8)
+        if self.quantization == "binary":
+            return np.packbits(reduced > 0, axis=1)
+        return reduced.astype(np.float32)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """압축 코드로 계산한 근사 점수 (클수록 가까움)"""
+        reduced = self.transform(query[None, :])[0]
+        if self.quantization == "none":
+            return codes @ reduced
+        result = np.empty(len(codes), dtype=np.float32)
+        if self.quantization == "int8":
+            weights = reduced * self.scale
+            for i in range(0, len(codes), self.CHUNK_ROWS):
+                result[i:i + self.CHUNK_ROWS] = codes[i:i + self.CHUNK_ROWS].astype(np.float32) @ weights
+        else:
+            bits = np.packbits(reduced > 0)
+            for i in range(0, len(codes), self.CHUNK_ROWS):
+                hamming = _popcount(codes[i:i + self.CHUNK_ROWS] ^ bits).sum(axis=1, dtype=np.int32)
+                result[i:i + self.CHUNK_ROWS] = -hamming
+        return result
+
+    def search(
+        self,
+        codes: np.ndarray,
+        vectors: Optional[np.ndarray],
+        query: np.ndarray,
+        top_k: int,
+        rerank_factor: int = 4
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """압축 코드로 top_k * rerank_factor 개 후보를 고르고 원본 벡터로 다시 점수를 매겨 (행, 점수) 반환
+
+        rerank_factor 가 0 이거나 원본 벡터가 없으면 근사 점수를 그대로 쓴다.
+        """
+        approximate = self.scores(codes, query)
+        total = len(approximate)
+        top_k = min(top_k, total)
+        if top_k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if rerank_factor <= 0 or vectors is None:
+            rows = np.argpartition(-approximate, top_k - 1)[:top_k]
+            rows = rows[np.argsort(-approximate[rows])]
+            return rows, approximate[rows]
+
+        candidates = min(top_k * rerank_factor, total)
+        # 메모리 매핑된 원본 벡터를 순서대로 읽도록 후보 행을 정렬
+        rows = np.sort(np.argpartition(-approximate, candidates - 1)[:candidates])
+        exact = np.asarray(vectors[rows], dtype=np.float32) @ query
+        order = np.argsort(-exact)[:top_k]
+        return rows[order], exact[order]
+
+    def state(self) -> Dict[str, np.ndarray]:
+        state = {
+            "reduction": np.array(self.reduction),
+            "dimension": np.array(self.dimension),
+            "quantization": np.array(self.quantization),
+        }
+        for name in ("mean", "components", "scale"):
+            value = getattr(self, name)
+            if value is not None:
+                state[name] = value
+        return state
+
+    def load_state(self, state) -> bool:
+        """저장된 학습 결과를 불러온다 (설정이 다르면 False)"""
+        saved = {
+            "reduction": str(state["reduction"]),
+            "dimension": int(state["dimension"]),
+            "quantization": str(state["quantization"]),
+        }
+        if saved != self.params:
+            return False
+        for name in ("mean", "components", "scale"):
+            setattr(self, name, state[name] if name in state else None)
+        return True
@@ -0,0 +1,101 @@
+"""벡터 압축 설정별 recall 평가
+
+저장된 벡터 중 일부를 쿼리로 사용해 원본 float32 정확 검색 결과와 압축 검색 결과를 비교한다
+(쿼리 자신은 양쪽 결과에서 제외). 압축 설정은 축소방식:차원:양자화 형식으로 여러 개 지정할 수 있다.
+
+사용 예:
+    python -m app.repositorie.vector_recall --config pca:256:int8 --config truncate:512:none --config none:0:binary
+    python -m app.repositorie.vector_recall --vectors data/vector_store/vectors.npy --rerank-factor 0 4 10 --top-k 20
+"""
+from typing import Dict, List, Optional
+from app.core import setting
+from app.repositorie.local_store import LocalVectorStore
+from app.repositorie.vector_compression import VectorCompressor
+import argparse
+import os
+import time
+import numpy as np
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, top_k: int, exclude: int) -> np.ndarray:
+    scores = vectors @ query
+    scores[exclude] = -np.inf
+    rows = np.argpartition(-scores, top_k - 1)[:top_k]
+    return rows[np.argsort(-scores[rows])]
+
+def evaluate(
+    vectors: np.ndarray,
+    compressor: VectorCompressor,
+    query_rows: np.ndarray,
+    top_k: int,
+    rerank_factors: List[int]
+) -> List[Dict]:
+    """rerank_factor 별 recall@top_k 와 쿼리당 평균 검색 시간"""
+    started = time.perf_counter()
+    compressor.fit(vectors)
+    codes = compressor.encode(vectors)
+    build_s = time.perf_counter() - started
+
+    truth = [set(exact_top_k(vectors, vectors[row], top_k, row).tolist()) for row in query_rows]
+    results = []
+    for factor in rerank_factors:
+        hits = 0
+        elapsed = 0.0
+        for row, expected in zip(query_rows, truth):
+            started = time.perf_counter()
+            found, _ = compressor.search(codes, vectors, vectors[row], top_k + 1, factor)
+            elapsed += time.perf_counter() - started
+            found = [r for r in found.tolist() if r != row][:top_k]
+            hits += len(expected & set(found))
+        results.append({
+            **compressor.params,
+            "rerank_factor": factor,
+            "recall": hits / (len(query_rows) * top_k),
+            "query_ms": elapsed * 1000 / len(query_rows),
+            "bytes_per_vector": compressor.bytes_per_vector(vectors.shape[1]),
+            "codes_mb": codes.nbytes / (1024 * 1024),
+            "build_s": build_s,
+        })
+    return results
+
+def parse_config(value: str) -> VectorCompressor:
+    reduction, dimension, quantization = (value.split(":") + ["", ""])[:3]
+    return VectorCompressor(reduction or "none", int(dimension or 0), quantization or "none")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="벡터 압축 설정별 recall 과 검색 시간을 원본 정확 검색과 비교합니다.")
+    parser.add_argument("--vectors", default=os.path.join(setting.LOCAL_VECTOR_STORE_PATH, LocalVectorStore.VECTORS_FILE),
+                        help="정규화된 float32 벡터 .npy 파일")
+    parser.add_argument("--config", action="append", metavar="REDUCTION:DIM:QUANT",
+                        help="압축 설정 (예: pca:256:int8, truncate:512:none, none:0:binary)")
+    parser.add_argument("--rerank-factor", type=int, nargs="+", default=[0, setting.LOCAL_VECTOR_STORE_RERANK_FACTOR])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.vectors):
+        parser.error(f"벡터 파일이 없습니다: {args.vectors}")
+    configs = args.config or [
+        f"{setting.LOCAL_VECTOR_STORE_REDUCTION}:{setting.LOCAL_VECTOR_STORE_REDUCED_DIMENSION}:"
+        f"{setting.LOCAL_VECTOR_STORE_QUANTIZATION}"
+    ]
+
+    vectors = np.asarray(np.load(args.vectors, mmap_mode="r"), dtype=np.float32)
+    if len(vectors) <= args.top_k:
+        parser.error("벡터 수가 top-k 보다 많아야 합니다")
+    rng = np.random.default_rng(args.seed)
+    query_rows = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+
+    print(f"벡터 {len(vectors)}개 ({vectors.shape[1]}차원, {vectors.nbytes / (1024 * 1024):.1f}MB), 쿼리 {len(query_rows)}개, top-{args.top_k}")
+    print(f"{'config':<24}{'rerank':>8}{'recall':>10}{'query_ms':>10}{'bytes/vec':>11}{'codes_mb':>10}{'build_s':>9}")
+    for config in configs:
+        compressor = parse_config(config)
+        for r in evaluate(vectors, compressor, query_rows, args.top_k, args.rerank_factor):
+            print(
+                f"{config:<24}{r['rerank_factor']:>8}{r['recall']:>10.4f}{r['query_ms']:>10.2f}"
+                f"{r['bytes_per_vector']:>11.0f}{r['codes_mb']:>10.1f}{r['build_s']:>9.1f}"
+            )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core import setting
+
+# (id, 벡터, 메타데이터) - Pinecone upsert 와 같은 형식
+VectorRecord = Tuple[str, List[float], Dict[str, Any]]
+
+class VectorStore(ABC):
+    """벡터 저장소 공통 인터페이스
+
+    query 결과는 Pinecone 응답과 같은 형태({"matches": [{"id", "score", "metadata"}]})로 반환한다.
+    """
+
+    def connect(self):
+        """서버 시작 시 연결/인덱스를 미리 준비"""
+
+    def close(self):
+        """서버 종료 시 자원 정리"""
+
+    def flush(self):
+        """upsert 한 벡터를 영구 저장 (upsert 가 바로 반영되는 저장소는 할 일 없음)"""
+
+    @abstractmethod
+    def query(
+        self, vector, top_k: int, include_metadata: bool = True, filter: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """벡터와 가장 가까운 top_k 개 검색 (filter 는 Pinecone 메타데이터 필터 형식)"""
+
+    @abstractmethod
+    def fetch(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """id 별 메타데이터 조회"""
+
+    def fetch_vectors(self, ids: Iterable[str]) -> Dict[str, List[float]]:
+        """id 별 저장된 벡터 조회 (임베딩 백엔드 일치도 확인용)"""
+        raise NotImplementedError(f"{type(self).__name__} 는 벡터 조회를 지원하지 않습니다")
+
+    @abstractmethod
+    def upsert(self, vectors: Iterable[VectorRecord]):
+        """벡터와 메타데이터 저장 (같은 id 는 덮어씀)"""
+
+def get_vector_store() -> VectorStore:
+    """설정(VECTOR_STORE_BACKEND)에 맞는 벡터 저장소 반환"""
+    backend = setting.VECTOR_STORE_BACKEND
+    if backend == "local":
+        from app.repositorie.local_store import LocalVectorStore
+        return LocalVectorStore()
+    if backend == "pinecone":
+        from app.repositorie.db_connection import DatabaseConnection
+        return DatabaseConnection()
+    raise ValueError(f"지원하지 않는 벡터 저장소입니다: {backend}")
@@ -0,0 +1,253 @@
+"""레시피 코퍼스 벡터 저장소 적재 파이프라인
+
+사용 예:
+    python -m app.service.ingest.ingest recipes.jsonl
+    python -m app.service.ingest.ingest recipes.csv --embed-batch-size 512 --workers 8
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from app.core import setting
+from app.core.logger import setup_logger
+from app.repositorie.vector_store import VectorStore, get_vector_store
+from app.service.preprocess.data_embedding import EmbeddingService
+from app.service.preprocess.ingredient import ingredient_normalizer
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+logger = setup_logger(__name__)
+
+@dataclass
+class RecipeRecord:
+    """적재할 레시피 한 건"""
+    id: str
+    title: str
+    raw_ingredients: List[str]
+    ingredients: List[str]
+    steps: List[str]
+    content_hash: str = ""
+
+    @property
+    def text(self) -> str:
+        # 검색 쿼리와 같은 형식(정규화된 재료명을 공백으로 연결)으로 임베딩
+        return " ".join(self.ingredients)
+
+    @property
+    def metadata(self) -> Dict:
+        return {
+            "title": self.title,
+            "raw_ingredients": self.raw_ingredients,
+            "ingredients": self.ingredients,
+            # 검색 메타데이터 필터용 대표 재료명 (이 필드가 없는 기존 인덱스는 필터가 맞지 않으므로 다시 적재)
+            "ingredient_names": self.ingredients,
+            "steps": self.steps,
+        }
+
+@dataclass
+class IngestStats:
+    read: int = 0
+    skipped: int = 0
+    embedded: int = 0
+    upserted: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        rate = self.embedded / elapsed if elapsed else 0.0
+        return (
+            f"읽음 {self.read}, 변경 없음 {self.skipped}, 임베딩 {self.embedded}, "
+            f"저장 {self.upserted}, 실패 {self.failed} ({elapsed:.1f}초, {rate:.1f}건/초)"
+        )
+
+def _split_field(value) -> List[str]:
+    """CSV 필드를 목록으로 변환 (JSON 배열 또는 '|' 구분 문자열)"""
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    if not value:
+        return []
+    value = value.strip()
+    if value.startswith("["):
+        return [str(v) for v in json.loads(value)]
+    return [v.strip() for v in value.split("|") if v.strip()]
+
+def read_recipes(path: str) -> Iterator[Dict]:
+    """JSONL 또는 CSV 파일에서 레시피를 한 건씩 읽는다"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def normalize_ingredients(raw_ingredients: List[str]) -> List[str]:
+    """수량/단위를 제거하고 별칭을 대표 재료명으로 바꾼 목록 (검색 쿼리와 같은 규칙)"""
+    return ingredient_normalizer.normalize_many(raw_ingredients)
+
+def to_record(raw: Dict) -> RecipeRecord:
+    raw_ingredients = _split_field(raw.get("raw_ingredients") or raw.get("ingredients"))
+    record = RecipeRecord(
+        id=str(raw["id"]),
+        title=(raw.get("title") or "").strip(),
+        raw_ingredients=raw_ingredients,
+        ingredients=normalize_ingredients(raw_ingredients),
+        steps=_split_field(raw.get("steps")),
+    )
+    payload = json.dumps([record.text, record.metadata], ensure_ascii=False, sort_keys=True)
+    record.content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return record
+
+class IngestState:
+    """적재 완료된 레시피의 내용 해시 (체크포인트/재개 및 변경 없는 레코드 건너뛰기용)"""
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS recipes (id TEXT PRIMARY KEY, hash TEXT)")
+        self._hashes = dict(self._db.execute("SELECT id, hash FROM recipes"))
+
+    def is_unchanged(self, record: RecipeRecord) -> bool:
+        return self._hashes.get(record.id) == record.content_hash
+
+    def mark_done(self, records: Iterable[RecipeRecord]):
+        rows = [(r.id, r.content_hash) for r in records]
+        self._db.executemany("INSERT OR REPLACE INTO recipes (id, hash) VALUES (?, ?)", rows)
+        self._db.commit()
+        self._hashes.update(rows)
+
+    def close(self):
+        self._db.close()
+
+def _batched(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class RecipeIngestor:
+    """레시피를 정규화 → 배치 임베딩 → 병렬 upsert 로 벡터 저장소에 적재"""
+    def __init__(
+        self,
+        store: Optional[VectorStore] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        state_path: str = setting.INGEST_STATE_PATH,
+        embed_batch_size: int = setting.INGEST_EMBED_BATCH_SIZE,
+        upsert_batch_size: int = setting.INGEST_UPSERT_BATCH_SIZE,
+        workers: int = setting.INGEST_WORKERS,
+        checkpoint_size: int = setting.INGEST_CHECKPOINT_SIZE,
+        force: bool = False
+    ):
+        self.store = store or get_vector_store()
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.state = IngestState(state_path)
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.workers = max(workers, 1)
+        self.checkpoint_size = max(checkpoint_size, 1)
+        self.force = force
+        self.stats = IngestStats()
+        # upsert 는 끝났지만 저장소가 아직 영구 저장하지 않아 체크포인트에 기록하지 않은 레시피
+        self._unsaved: List[RecipeRecord] = []
+
+    def _changed_records(self, path: str) -> Iterator[RecipeRecord]:
+        for raw in read_recipes(path):
+            self.stats.read += 1
+            try:
+                record = to_record(raw)
+            except Exception as e:
+                self.stats.failed += 1
+                logger.error(f"레시피 변환 실패 ({raw.get('id')}): {e}")
+                continue
+            if not self.force and self.state.is_unchanged(record):
+                self.stats.skipped += 1
+                continue
+            yield record
+
+    def _upsert(self, chunk: List[Tuple[RecipeRecord, List[float]]]) -> List[RecipeRecord]:
+        self.store.upsert([(r.id, vector, r.metadata) for r, vector in chunk])
+        return [r for r, _ in chunk]
+
+    def _collect(self, pending: Set[Future], limit: int) -> Set[Future]:
+        """진행 중인 upsert 가 limit 개 이하가 될 때까지 완료된 것을 모은다"""
+        while len(pending) > limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    records = future.result()
+                    self._unsaved.extend(records)
+                    self.stats.upserted += len(records)
+                except Exception as e:
+                    self.stats.failed += 1
+                    logger.error(f"upsert 실패: {e}")
+        return pending
+
+    def _checkpoint(self, force: bool = False):
+        """저장소를 flush 한 뒤에만 체크포인트에 기록 (중단 후 재개 시 저장되지 않은 레시피를 건너뛰지 않도록)"""
+        if not self._unsaved or (not force and len(self._unsaved) < self.checkpoint_size):
+            return
+        self.store.flush()
+        self.state.mark_done(self._unsaved)
+        self._unsaved = []
+
+    def run(self, path: str) -> IngestStats:
+        logger.info(f"레시피 적재 시작: {path}")
+        pending: Set[Future] = set()
+        try:
+            # 적재하는 동안 모델을 계속 올려 두고, 다음 배치를 임베딩하는 동안 이전 배치를 upsert 한다
+            with self.embedding_service.resident(), ThreadPoolExecutor(self.workers) as pool:
+                for batch in _batched(self._changed_records(path), self.embed_batch_size):
+                    vectors = self.embedding_service.embed_text([r.text for r in batch])
+                    self.stats.embedded += len(batch)
+                    for chunk in _batched(zip(batch, vectors), self.upsert_batch_size):
+                        pending.add(pool.submit(self._upsert, chunk))
+                    pending = self._collect(pending, limit=self.workers * 2)
+                    self._checkpoint()
+                    logger.info(self.stats.summary())
+                self._collect(pending, limit=0)
+                self._checkpoint(force=True)
+        finally:
+            self.store.close()
+            self.state.close()
+        logger.info(f"레시피 적재 완료: {self.stats.summary()}")
+        return self.stats
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="레시피 코퍼스를 벡터 저장소에 적재합니다.")
+    parser.add_argument("path", help="레시피 JSONL 또는 CSV 파일 (id, title, ingredients, steps)")
+    parser.add_argument("--state", default=setting.INGEST_STATE_PATH, help="체크포인트 sqlite 파일 경로")
+    parser.add_argument("--embed-batch-size", type=int, default=setting.INGEST_EMBED_BATCH_SIZE)
+    parser.add_argument("--upsert-batch-size", type=int, default=setting.INGEST_UPSERT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=setting.INGEST_WORKERS, help="병렬 upsert 스레드 수")
+    parser.add_argument(
+        "--checkpoint-size", type=int, default=setting.INGEST_CHECKPOINT_SIZE,
+        help="저장소를 flush 하고 체크포인트에 기록하는 레시피 수 간격"
+    )
+    parser.add_argument("--force", action="store_true", help="내용 해시와 관계없이 모두 다시 적재")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        parser.error(f"파일이 없습니다: {args.path}")
+
+    ingestor = RecipeIngestor(
+        state_path=args.state,
+        embed_batch_size=args.embed_batch_size,
+        upsert_batch_size=args.upsert_batch_size,
+        workers=args.workers,
+        checkpoint_size=args.checkpoint_size,
+        force=args.force,
+    )
+    stats = ingestor.run(args.path)
+    return 1 if stats.failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Mapping, Optional
+from app.core import setting
+from app.core.exception import DeadlineExceededException
+from app.core.metrics import DEADLINE_EXCEEDED
+import time
+
+@dataclass(frozen=True)
+class Deadline:
+    """요청 처리 기한 (epoch 초)
+
+    요청자의 대기 시간이 지난 뒤에 나온 응답은 쓰이지 않으므로, 비싼 단계를 시작하기 전에
+    남은 시간을 확인하고 부족하면 DeadlineExceededException 으로 중단한다.
+    """
+    expires_at: float
+
+    @classmethod
+    def from_message(
+        cls,
+        headers: Optional[Mapping[str, Any]],
+        timestamp: Optional[datetime] = None,
+        budget: float = setting.DEADLINE_BUDGET
+    ) -> Optional["Deadline"]:
+        """x-deadline 헤더, 없으면 발행 시각(timestamp 속성 또는 timestamp_in_ms 헤더) + budget
+
+        epoch 값은 초와 밀리초를 모두 받는다. 기한을 알 수 없으면 None.
+        """
+        headers = headers or {}
+        deadline = _epoch_seconds(headers.get("x-deadline"))
+        if deadline is not None:
+            return cls(deadline)
+        published = _epoch_seconds(headers.get("timestamp_in_ms"))
+        if published is None and timestamp is not None:
+            published = timestamp.timestamp()
+        if published is not None and budget > 0:
+            return cls(published + budget)
+        return None
+
+    def remaining(self) -> float:
+        return self.expires_at - time.time()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str, required: float = 0.0):
+        """남은 시간이 required 초보다 적으면 stage 를 시작하지 않고 중단"""
+        remaining = self.remaining()
+        if remaining < max(required, 0.0) or remaining <= 0:
+            DEADLINE_EXCEEDED.labels(stage).inc()
+            raise DeadlineExceededException(
+                f"처리 기한이 지나 {stage} 단계를 건너뜁니다 (남은 시간 {remaining:.1f}초, 필요 {required:.1f}초)",
+                stage=stage
+            )
+
+def _epoch_seconds(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        value = float(value.decode() if isinstance(value, bytes) else value)
+    except (TypeError, ValueError):
+        return None
+    # 초 단위 epoch 는 1e11 을 넘지 않으므로 그보다 크면 밀리초
+    return value / 1000 if value > 1e11 else value
@@ -1,54 +1,199 @@
-from typing import Dict, Optional
+from contextlib import aclosing
+from typing import Dict, List, Optional, Tuple
 from app.core import setting
+from app.core.container import container
 from app.core.logger import setup_logger
-from app.core.exception import AppException
-from app.service.search.search import search_service 
-from app.service.llm import generate_response
+from app.core.exception import AppException, DeadlineExceededException, InvalidMessageException, handle_exception
+from app.core.metrics import (
+    DEADLINE_EXCEEDED, MESSAGES_IN_FLIGHT, MESSAGES_PROCESSED, correlation_id_var, track_stage
+)
+from app.service.listen.deadline import Deadline
+from app.service.llm.codec import decode_request
+from app.service.recommend.recommend import RECIPES_KEY, recommend, stream_recommendation
 from app.service.publish.publish import publisher
 
 import aio_pika
 from aio_pika import ExchangeType
-import json
+from aio_pika.abc import AbstractIncomingMessage
+import asyncio
+import functools
+import heapq
+import itertools
+import uuid
 
 logger = setup_logger(__name__)
 
 class MessageProcessor:
     @staticmethod
-    async def process_message(body: bytes) -> Optional[Dict]:
+    async def process_message(
+            body: bytes,
+            correlation_id: Optional[str] = None,
+            deadline: Optional[Deadline] = None,
+            content_encoding: Optional[str] = None
+        ) -> Optional[Dict]:
+        correlation_id = correlation_id or str(uuid.uuid4())
+        token = correlation_id_var.set(correlation_id)
+        MESSAGES_IN_FLIGHT.inc()
         try:
-            ingredients_data = json.loads(body.decode())
-            query = ",".join(item["ingredients"] for item in ingredients_data)
-            logger.info(f"검색할 재료: {query}")
-    
-            search_results = await search_service.search_recipes_by_text(query)
-            if not search_results:
-                logger.warning("검색 결과가 없습니다.")
-                return None
-            
-            logger.debug(f"ingredients_data: {ingredients_data}")
-            llm_response = generate_response(ingredients_data, search_results)
-            logger.info(f"응답 생성 완료 (검색된 레��피: {len(search_results)}개)")
-            
-            await publisher.publish_message(llm_response)
+            with track_stage("total"):
+                result = await MessageProcessor._process(body, correlation_id, deadline, content_encoding)
+            MESSAGES_PROCESSED.labels("success" if result is not None else "empty").inc()
+            return result
+        except DeadlineExceededException:
+            MESSAGES_PROCESSED.labels("expired").inc()
+            raise
+        except InvalidMessageException:
+            MESSAGES_PROCESSED.labels("invalid").inc()
+            raise
+        except Exception:
+            MESSAGES_PROCESSED.labels("error").inc()
+            raise
+        finally:
+            MESSAGES_IN_FLIGHT.dec()
+            correlation_id_var.reset(token)
+
+    @staticmethod
+    async def _process(
+            body: bytes,
+            correlation_id: str,
+            deadline: Optional[Deadline] = None,
+            content_encoding: Optional[str] = None
+        ) -> Optional[Dict]:
+        try:
+            if deadline is not None:
+                deadline.check("start")
+            # 형식이 잘못된 요청은 캐시 조회/검색/LLM 전에 거절
+            ingredients_data = decode_request(body, content_encoding)
+            if setting.LLM_STREAMING:
+                return await MessageProcessor._stream_response(ingredients_data, correlation_id, deadline)
+
+            # 캐시 응답이나 생성한 응답을 발행 (검색 결과가 없으면 발행하지 않는다)
+            llm_response = await recommend(ingredients_data, deadline)
+            if llm_response is not None:
+                await publisher.publish_message(llm_response, correlation_id=correlation_id)
             return llm_response
             
+        except (DeadlineExceededException, InvalidMessageException):
+            raise
         except Exception as e:
             logger.error(f"메시지 처리 중 오류 발생: {e}")
             raise AppException("Message processing error", status_code=500)
 
+    @staticmethod
+    async def _stream_response(
+            ingredients_data: List[Dict], 
+            correlation_id: str,
+            deadline: Optional[Deadline] = None
+        ) -> Optional[Dict]:
+        """완성된 레시피를 하나씩 발행하고 마지막에 전체 응답을 완료 표시와 함께 발행
+
+        도중에 실패하면 오류 표시 메시지를 발행해 받는 쪽이 완료 표시를 기다리지 않게 한 뒤 예외를 다시 던진다.
+        """
+        response = None
+        confirms = []
+        sequence = 0
+        batch_confirms = setting.PUBLISHER_BATCH_CONFIRMS
+        try:
+            async with aclosing(stream_recommendation(ingredients_data, deadline)) as stream:
+                async for event, payload in stream:
+                    if event == "recipe":
+                        sequence += 1
+                        # 확인을 모아서 기다리면 다음 레시피 생성이 발행 확인에 막히지 않는다
+                        confirm = await publisher.publish_message(
+                            payload,
+                            correlation_id=correlation_id,
+                            headers={"x-stream-event": "recipe", "x-stream-seq": sequence},
+                            wait_for_confirm=not batch_confirms
+                        )
+                        if confirm is not None:
+                            confirms.append(confirm)
+                        logger.info(f"레시피 {sequence} 발행")
+                    else:
+                        # 레시피가 모두 브로커에 저장된 뒤에 완료 표시를 발행 (하나라도 실패하면 오류 표시 발행)
+                        await publisher.wait_for_confirms(confirms)
+                        confirms = []
+                        # 캐시된 응답도 레시피 메시지 없이 완료 표시와 함께 발행
+                        response = payload
+                        await publisher.publish_message(
+                            response,
+                            correlation_id=correlation_id,
+                            headers={"x-stream-event": "complete", "x-stream-count": len(response[RECIPES_KEY])}
+                        )
+            await publisher.wait_for_confirms(confirms)
+        except Exception as e:
+            await MessageProcessor._publish_stream_error(e, correlation_id, sequence)
+            raise
+        return response
+
+    @staticmethod
+    async def _publish_stream_error(error: Exception, correlation_id: str, sequence: int):
+        """스트리밍 도중 실패를 알리는 메시지 발행 (발행에 실패해도 원래 예외를 유지)"""
+        if not isinstance(error, AppException):
+            error = AppException("Message processing error", status_code=500)
+        try:
+            await publisher.publish_message(
+                handle_exception(error),
+                correlation_id=correlation_id,
+                headers={"x-stream-event": "error", "x-stream-count": sequence}
+            )
+        except Exception as e:
+            logger.error(f"스트리밍 오류 메시지 발행 실패: {e}")
+
+class _Lane:
+    """우선순위 레인: 큐 하나와 그 큐에서 받아 두고 아직 시작하지 않은 메시지"""
+    def __init__(self, name: str, queue: str, routing_key: str, concurrency: int, prefetch_count: int):
+        self.name = name
+        self.queue = queue
+        self.routing_key = routing_key
+        self.concurrency = concurrency  # 이 레인이 동시에 쓸 수 있는 최대 처리 슬롯
+        self.prefetch_count = prefetch_count
+        self.channel = None
+        self.iterator = None
+        self.running = 0
+        # (기한, 도착 순번, 메시지, Deadline) 힙: 기한이 이른 메시지부터 처리
+        self._waiting: List[Tuple[float, int, AbstractIncomingMessage, Optional[Deadline]]] = []
+
+    def push(self, message: AbstractIncomingMessage, deadline: Optional[Deadline], sequence: int):
+        expires_at = deadline.expires_at if deadline is not None else float("inf")
+        heapq.heappush(self._waiting, (expires_at, sequence, message, deadline))
+
+    def pop(self) -> Tuple[AbstractIncomingMessage, Optional[Deadline]]:
+        _, _, message, deadline = heapq.heappop(self._waiting)
+        return message, deadline
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
 class RabbitMQListener:
     def __init__(
             self, 
             host: str = setting.RABBITMQ_HOST, 
-            queue: str = setting.RABBITMQ_QUEUE
+            queue: str = setting.RABBITMQ_QUEUE,
+            concurrency: int = setting.LISTENER_CONCURRENCY,
+            prefetch_count: int = setting.RABBITMQ_PREFETCH_COUNT,
+            bulk_queue: Optional[str] = setting.RABBITMQ_BULK_QUEUE,
+            bulk_concurrency: int = setting.LISTENER_BULK_CONCURRENCY
         ):
         self.host = host
         self.queue = queue
         self.exchange_name = setting.RABBITMQ_EXCHANGE
         self.routing_key = setting.RABBITMQ_ROUTING_KEY
+        self.concurrency = max(concurrency, 1)
+        # 처리 슬롯보다 적게 prefetch 하면 워커가 놀게 되므로 최소 concurrency 만큼 받는다
+        self.prefetch_count = max(prefetch_count, self.concurrency)
+        # 앞선 레인일수록 먼저 처리하며, bulk 레인은 최대 bulk_concurrency 개 슬롯만 써서
+        # 부하 중에도 interactive 요청이 bulk 요청 뒤에서 오래 기다리지 않게 한다
+        self.lanes = [_Lane("interactive", queue, self.routing_key, self.concurrency, self.prefetch_count)]
+        if bulk_queue:
+            bulk_slots = min(max(bulk_concurrency, 1), self.concurrency)
+            self.lanes.append(_Lane("bulk", bulk_queue, setting.RABBITMQ_BULK_ROUTING_KEY, bulk_slots, bulk_slots))
         self.connection = None
         self.channel = None
         self._running = False
+        self._wakeup = None
+        self._sequence = itertools.count()
+        self._in_flight = set()
 
     async def setup(self):
         """RabbitMQ 연결 설정"""
@@ -73,23 +218,31 @@ class RabbitMQListener:
                     durable=True
                 )
                 
-                # Queue 선언
-                queue = await self.channel.declare_queue(
-                    self.queue,
-                    durable=True,
-                    arguments=setting.RABBITMQ_QUEUE_ARGUMENTS
-                )
-                
-                # Queue를 Exchange에 바인딩
-                await queue.bind(
-                    exchange=exchange,
-                    routing_key=self.routing_key
-                )
-                
-                await self.channel.set_qos(prefetch_count=1)
+                # 레인마다 채널을 따로 열어 prefetch 를 레인별로 적용
+                for lane in self.lanes:
+                    lane.channel = self.channel if lane is self.lanes[0] else await self.connection.channel()
+
+                    # Queue 선언
+                    queue = await lane.channel.declare_queue(
+                        lane.queue,
+                        durable=True,
+                        arguments=setting.RABBITMQ_QUEUE_ARGUMENTS
+                    )
+                    
+                    # Queue를 Exchange에 바인딩
+                    await queue.bind(
+                        exchange=self.exchange_name,
+                        routing_key=lane.routing_key
+                    )
+                    
+                    await lane.channel.set_qos(prefetch_count=lane.prefetch_count)
                 
                 self._running = True
-                logger.info(f"'{self.queue}' 큐에서 메시지 대기 중...")
+                logger.info(
+                    f"{', '.join(repr(lane.queue) for lane in self.lanes)} 큐에서 메시지 대기 중... "
+                    f"(동시 처리: {self.concurrency}, prefetch: {self.prefetch_count}"
+                    + "".join(f", {lane.name} 최대 {lane.concurrency}" for lane in self.lanes[1:]) + ")"
+                )
             
         except Exception as e:
             logger.error(f"RabbitMQ 연결 실패: {e}")
@@ -100,10 +253,14 @@ class RabbitMQListener:
         try:
             if not self._running:
                 await self.setup()
-            queue = await self.channel.get_queue(self.queue)
-            async for message in queue:
-                async with message.process():
-                    await MessageProcessor.process_message(message.body)
+            self._wakeup = asyncio.Event()
+            feeders = [asyncio.create_task(self._feed(lane)) for lane in self.lanes]
+            try:
+                await self._dispatch(feeders)
+            finally:
+                for feeder in feeders:
+                    feeder.cancel()
+                await asyncio.gather(*feeders, return_exceptions=True)
                     
         except Exception as e:
             logger.error(f"메시지 소비 중 오류 발생: {e}")
@@ -111,8 +268,114 @@ class RabbitMQListener:
         finally:
             self._running = False
 
+    async def _feed(self, lane: _Lane):
+        """레인의 큐에서 받은 메시지를 기한과 함께 대기열에 넣는다 (받아 두는 수는 prefetch 로 제한)"""
+        try:
+            queue = await lane.channel.get_queue(lane.queue)
+            async with queue.iterator() as queue_iterator:
+                lane.iterator = queue_iterator
+                async for message in queue_iterator:
+                    deadline = (
+                        Deadline.from_message(message.headers, message.timestamp)
+                        if setting.DEADLINE_ENABLED else None
+                    )
+                    lane.push(message, deadline, next(self._sequence))
+                    self._wakeup.set()
+        finally:
+            lane.iterator = None
+            self._wakeup.set()
+
+    def _next_lane(self) -> Optional[_Lane]:
+        """빈 처리 슬롯이 있으면 대기 메시지가 있는 가장 앞선 레인"""
+        if sum(lane.running for lane in self.lanes) >= self.concurrency:
+            return None
+        for lane in self.lanes:
+            if lane.waiting and lane.running < lane.concurrency:
+                return lane
+        return None
+
+    async def _dispatch(self, feeders: List[asyncio.Task]):
+        """처리 슬롯이 빌 때마다 우선순위가 가장 높은 메시지를 시작 (모든 큐 소비가 끝나면 반환)"""
+        while True:
+            lane = self._next_lane()
+            if lane is None:
+                if all(feeder.done() for feeder in feeders):
+                    for feeder in feeders:
+                        if not feeder.cancelled() and feeder.exception() is not None:
+                            raise feeder.exception()
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            message, deadline = lane.pop()
+            if deadline is not None and deadline.expired:
+                # 받아 둔 동안 기한이 지난 메시지는 처리 슬롯을 쓰지 않고 바로 DLX 로 보낸다
+                task = asyncio.create_task(self._expire(message, lane))
+                task.add_done_callback(functools.partial(self._on_task_done, None))
+            else:
+                lane.running += 1
+                task = asyncio.create_task(self._handle_message(message, deadline))
+                task.add_done_callback(functools.partial(self._on_task_done, lane))
+            self._in_flight.add(task)
+
+    async def _handle_message(self, message: AbstractIncomingMessage, deadline: Optional[Deadline] = None):
+        """메시지 한 건 처리 (성공 시 ack, 실패/기한 초과 시 DLX로 reject)"""
+        try:
+            async with message.process(requeue=False):
+                await MessageProcessor.process_message(
+                    message.body, message.correlation_id, deadline, message.content_encoding
+                )
+        except (DeadlineExceededException, InvalidMessageException) as e:
+            logger.warning(f"{e.message} (delivery_tag={message.delivery_tag}), DLX 로 보냅니다")
+        except Exception as e:
+            logger.error(f"메시지 처리 실패 (delivery_tag={message.delivery_tag}): {e}")
+
+    async def _expire(self, message: AbstractIncomingMessage, lane: _Lane):
+        DEADLINE_EXCEEDED.labels("queue").inc()
+        MESSAGES_PROCESSED.labels("expired").inc()
+        logger.warning(f"{lane.name} 대기 중 처리 기한이 지나 DLX 로 보냅니다 (delivery_tag={message.delivery_tag})")
+        try:
+            await message.reject(requeue=False)
+        except Exception as e:
+            logger.error(f"메시지 reject 실패 (delivery_tag={message.delivery_tag}): {e}")
+
+    def _on_task_done(self, lane: Optional[_Lane], task: asyncio.Task):
+        self._in_flight.discard(task)
+        if lane is not None:
+            lane.running -= 1
+        self._wakeup.set()
+
+    async def _drain(self, timeout: float = setting.LISTENER_DRAIN_TIMEOUT):
+        """처리 중인 메시지가 끝날 때까지 대기"""
+        if not self._in_flight:
+            return
+        logger.info(f"처리 중인 메시지 {len(self._in_flight)}개 완료 대기...")
+        _, pending = await asyncio.wait(set(self._in_flight), timeout=timeout)
+        if pending:
+            logger.warning(f"종료 대기 시간 초과로 {len(pending)}개 메시지 처리를 취소합니다")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _release_waiting(self):
+        """받아 두고 시작하지 않은 메시지를 큐로 되돌려 다른 소비자가 처리하게 한다"""
+        for lane in self.lanes:
+            while lane.waiting:
+                message, _ = lane.pop()
+                try:
+                    await message.nack(requeue=True)
+                except Exception as e:
+                    logger.error(f"메시지 반환 실패 (delivery_tag={message.delivery_tag}): {e}")
+
     async def cleanup(self):
         """리소스 정리"""
+        # 새 메시지 수신을 멈추고 처리 중인 메시지를 마무리한 뒤 연결 종료
+        for lane in self.lanes:
+            if lane.iterator is not None:
+                await lane.iterator.close()
+        await self._release_waiting()
+        await self._drain()
         if self.connection:
             await self.connection.close()
             self._running = False
@@ -120,5 +383,5 @@ class RabbitMQListener:
             self.channel = None
             logger.info("RabbitMQ connection closed.")
 
-# 전역 리스너 인스턴스
-listener = RabbitMQListener()
\ No newline at end of file
+# 전역 리스너 인스턴스 (처음 사용할 때 생성)
+listener = container.lazy("listener", RabbitMQListener)
\ No newline at end of file
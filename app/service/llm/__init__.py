@@ -1 +1,6 @@
-from .llm import generate_response
\ No newline at end of file
+def __getattr__(name):
+    # 패키지(예: llm.models)를 import 하는 것만으로 langchain 을 불러오지 않도록 처음 사용할 때 가져온다
+    if name in ("generate_response", "agenerate_response", "astream_response"):
+        from . import llm
+        return getattr(llm, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
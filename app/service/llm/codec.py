@@ -0,0 +1,80 @@
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from app.core import setting
+from app.core.exception import InvalidMessageException
+from app.service.llm.models import UserIngredient
+import pydantic_core
+import zlib
+
+try:
+    import orjson
+except ImportError:  # 없으면 pydantic-core 의 JSON 직렬화 사용 (출력 형식은 같다)
+    orjson = None
+
+# 요청 본문: [{"ingredients": ..., "quantities": ...}, ...] (재료가 하나 이상)
+_REQUEST = TypeAdapter(Annotated[List[UserIngredient], Field(min_length=1)])
+
+# 압축하지 않은 본문으로 취급하는 content_encoding (기존 발행자는 문자셋을 적는다)
+_IDENTITY = {"", "identity", "utf-8", "utf8"}
+# zlib wbits: gzip 헤더 / zlib 헤더
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+def decode_request(
+    body: bytes,
+    content_encoding: Optional[str] = None,
+    max_bytes: int = setting.MESSAGE_MAX_BYTES
+) -> List[Dict[str, str]]:
+    """요청 본문을 UserIngredient 목록으로 검증하고 dict 목록으로 반환
+
+    json.loads 로 만든 dict 를 다시 검사하지 않고 bytes 를 바로 검증하므로,
+    형식이 잘못된 요청은 검색/LLM 단계 전에 InvalidMessageException 으로 거절된다.
+    """
+    body = _decompress(body, content_encoding, max_bytes)
+    try:
+        return _REQUEST.dump_python(_REQUEST.validate_json(body))
+    except ValidationError as e:
+        error = e.errors(include_url=False)[0]
+        location = ".".join(str(part) for part in error["loc"]) or "body"
+        raise InvalidMessageException(
+            f"잘못된 요청 형식 ({e.error_count()}건, {location}: {error['msg']})"
+        )
+
+def encode_response(message: Any) -> bytes:
+    """응답(dict 또는 pydantic 모델)을 UTF-8 JSON bytes 로 직렬화 (한글은 이스케이프하지 않는다)"""
+    if isinstance(message, BaseModel):
+        return message.__pydantic_serializer__.to_json(message, by_alias=True)
+    if orjson is not None:
+        return orjson.dumps(message)
+    return pydantic_core.to_json(message)
+
+def compress(
+    body: bytes,
+    encoding: str = setting.MESSAGE_COMPRESSION,
+    min_bytes: int = setting.MESSAGE_COMPRESSION_MIN_BYTES
+) -> Tuple[bytes, Optional[str]]:
+    """min_bytes 이상인 본문을 압축하고 (본문, content_encoding) 반환 (압축하지 않으면 encoding 은 None)"""
+    encoding = (encoding or "none").lower()
+    if encoding == "none" or len(body) < min_bytes:
+        return body, None
+    if encoding not in _WBITS:
+        raise ValueError(f"지원하지 않는 압축 방식입니다: {encoding} (none, gzip, deflate)")
+    compressor = zlib.compressobj(6, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(body) + compressor.flush(), encoding
+
+def _decompress(body: bytes, content_encoding: Optional[str], max_bytes: int) -> bytes:
+    encoding = (content_encoding or "").lower()
+    if encoding in _IDENTITY:
+        if max_bytes and len(body) > max_bytes:
+            raise InvalidMessageException(f"요청 본문이 너무 큽니다 ({len(body)} bytes)")
+        return body
+    if encoding not in _WBITS:
+        raise InvalidMessageException(f"지원하지 않는 content_encoding 입니다: {content_encoding}")
+    # 압축 해제 후 크기를 제한해 작은 압축 본문으로 메모리를 채우지 못하게 한다
+    decompressor = zlib.decompressobj(_WBITS[encoding])
+    try:
+        data = decompressor.decompress(body, max_bytes) if max_bytes else decompressor.decompress(body)
+    except zlib.error as e:
+        raise InvalidMessageException(f"요청 본문 압축 해제 실패: {e}")
+    if decompressor.unconsumed_tail:
+        raise InvalidMessageException(f"압축 해제한 요청 본문이 {max_bytes} bytes 를 넘습니다")
+    return data
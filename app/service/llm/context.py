@@ -0,0 +1,112 @@
+from typing import Callable, Dict, List, Optional, Set
+from app.core import setting
+from app.core.logger import setup_logger
+from app.service.preprocess.ingredient import ingredient_normalizer
+import re
+
+logger = setup_logger(__name__)
+
+def _load_token_counter() -> Callable[[str], int]:
+    """tiktoken 으로 토큰 수를 세고, 인코딩을 불러올 수 없으면 글자 수 기반으로 추정"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(setting.CONTEXT_TOKEN_ENCODING)
+        return lambda text: len(encoding.encode(text))
+    except Exception as e:
+        logger.warning(f"tiktoken 인코딩을 불러올 수 없어 토큰 수를 추정합니다: {e}")
+        # 한글은 대략 한 글자당 한 토큰
+        return lambda text: len(text)
+
+class ContextBuilder:
+    """검색된 레시피를 토큰 예산 안에서 LLM 프롬프트용 문서로 압축
+
+    사용자 재료와의 겹침으로 재정렬하고, 거의 같은 레시피를 제거하고, 조리 단계를 줄인 뒤
+    한 줄에 한 레시피씩 간결하게 직렬화한다.
+    """
+    def __init__(
+        self,
+        max_documents: int = setting.CONTEXT_MAX_DOCUMENTS,
+        max_tokens: int = setting.CONTEXT_MAX_TOKENS,
+        max_steps: int = setting.CONTEXT_MAX_STEPS,
+        max_step_chars: int = setting.CONTEXT_MAX_STEP_CHARS,
+        token_counter: Optional[Callable[[str], int]] = None
+    ):
+        self.max_documents = max_documents
+        self.max_tokens = max_tokens
+        self.max_steps = max_steps
+        self.max_step_chars = max_step_chars
+        self._count_tokens = token_counter
+
+    def count_tokens(self, text: str) -> int:
+        if self._count_tokens is None:
+            self._count_tokens = _load_token_counter()
+        return self._count_tokens(text)
+
+    def build(self, user_ingredients: List[Dict[str, str]], documents: List[Dict]) -> str:
+        """토큰 예산에 맞춘 문서 문자열 생성"""
+        names = set(ingredient_normalizer.normalize_many(item["ingredients"] for item in user_ingredients))
+        ranked = self._rerank(names, self._deduplicate(documents))
+
+        lines: List[str] = []
+        used_tokens = 0
+        for document in ranked:
+            if len(lines) >= self.max_documents:
+                break
+            line = self._serialize(document, with_steps=True)
+            tokens = self.count_tokens(line)
+            if used_tokens + tokens > self.max_tokens:
+                # 조리 단계를 빼면 들어갈 수 있는지 확인
+                line = self._serialize(document, with_steps=False)
+                tokens = self.count_tokens(line)
+                if used_tokens + tokens > self.max_tokens:
+                    break
+            lines.append(line)
+            used_tokens += tokens + 1
+
+        logger.info(
+            f"LLM 컨텍스트: 검색 {len(documents)}개 중 {len(lines)}개 레시피, 약 {used_tokens} 토큰"
+        )
+        return "\n".join(lines)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return re.sub(r"[\s\W_]+", "", text).lower()
+
+    def _deduplicate(self, documents: List[Dict]) -> List[Dict]:
+        """제목이나 재료 구성이 같은 레시피는 먼저 나온 것만 유지"""
+        seen_titles = set()
+        seen_ingredients = set()
+        unique = []
+        for document in documents:
+            title = self._normalize(document.get("title", ""))
+            ingredients = frozenset(self._normalize(i) for i in document.get("ingredients", []))
+            if (title and title in seen_titles) or (ingredients and ingredients in seen_ingredients):
+                continue
+            seen_titles.add(title)
+            seen_ingredients.add(ingredients)
+            unique.append(document)
+        return unique
+
+    @staticmethod
+    def _rerank(names: Set[str], documents: List[Dict]) -> List[Dict]:
+        """사용자 재료를 많이 포함한 레시피를 앞으로 (같으면 벡터 검색 순서 유지)"""
+        def overlap(document: Dict) -> int:
+            return len(names.intersection(ingredient_normalizer.normalize_many(document.get("ingredients", []))))
+        return sorted(documents, key=overlap, reverse=True)
+
+    def _serialize(self, document: Dict, with_steps: bool) -> str:
+        parts = [
+            f"[{document.get('id', '')}] {document.get('title', '')}",
+            "재료: " + ", ".join(document.get("ingredients", []))
+        ]
+        if with_steps and self.max_steps > 0:
+            steps = [
+                step.strip()[:self.max_step_chars]
+                for step in document.get("steps", [])[:self.max_steps]
+            ]
+            if steps:
+                parts.append("조리: " + " ".join(f"{i}) {step}" for i, step in enumerate(steps, 1)))
+        return " | ".join(parts)
+
+# 전역 컨텍스트 빌더 인스턴스
+context_builder = ContextBuilder()
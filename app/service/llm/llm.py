@@ -1,13 +1,34 @@
-from typing import List, Optional, Dict
-from langchain_openai import ChatOpenAI
+from typing import AsyncIterator, List, Optional, Dict
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from pydantic import ValidationError
 from app.core import setting
+from app.core.container import container
 from app.core.exception import AppException
 from app.core.logger import setup_logger
-from app.service.llm.models import RecipeResponse
+from app.core.metrics import LLM_RETRIES, LLM_TOKENS, observe_stage, record_cache, track_stage
+from app.service.llm.models import Recipe, RecipeResponse
 from app.service.llm.prompts import prompt
+from app.service.llm.context import context_builder
+from app.service.llm.rate_limit import (
+    SingleFlight, TokenBucketLimiter, is_rate_limited, is_retryable, retry_delay
+)
+from app.service.llm.response_cache import ResponseCache
+import asyncio
+import time
 
 logger = setup_logger(__name__)
 
+class TokenUsageCallback(BaseCallbackHandler):
+    """LLM 응답의 usage_metadata 로 토큰 사용량 지표 기록 (스트리밍 포함)"""
+    def on_llm_end(self, response: LLMResult, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    LLM_TOKENS.labels("prompt").inc(usage.get("input_tokens", 0))
+                    LLM_TOKENS.labels("completion").inc(usage.get("output_tokens", 0))
+
 class RecipeGenerator: 
     """레시피 생성을 위한 LLM 기반 생성기 클래스""" 
     def __init__(
@@ -15,18 +36,35 @@ class RecipeGenerator:
         model: str = "gpt-4o-mini",
         temperature: float = 0.3,
         max_tokens: int = 5000,
+        max_concurrency: int = setting.LLM_MAX_CONCURRENCY,
     ):
         try :
             if not (api_key := setting.OPENAI_API_KEY):
                 raise ValueError("OPENAI_API_KEY 환경 변수가 설정되지 않았습니다.")
+            # langchain_openai(openai, tiktoken 포함)는 생성기를 처음 만들 때 불러온다
+            from langchain_openai import ChatOpenAI
 
             # LLM 모델 설정
-            self.llm = ChatOpenAI(
+            chat = ChatOpenAI(
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
-                api_key=api_key
-            ).with_structured_output(RecipeResponse)
+                api_key=api_key,
+                stream_usage=True,  # 스트리밍에서도 토큰 사용량을 받는다
+                callbacks=[TokenUsageCallback()],
+                max_retries=0  # 재시도는 호출 한도와 함께 _should_retry/_backoff 에서 처리
+            )
+            self.max_tokens = max_tokens
+            self.llm = chat.with_structured_output(RecipeResponse)
+            # 스트리밍용: JSON 스키마로 지정하면 생성 중인 부분 결과를 dict 로 받을 수 있다
+            self.stream_llm = chat.with_structured_output(
+                RecipeResponse.model_json_schema(by_alias=True)
+            )
+            # 동시에 진행되는 LLM 호출 수 제한
+            self._slots = asyncio.Semaphore(max_concurrency)
+            # 분당 요청/토큰 한도와 같은 요청의 동시 호출 합치기
+            self.limiter = TokenBucketLimiter(setting.LLM_REQUESTS_PER_MINUTE, setting.LLM_TOKENS_PER_MINUTE)
+            self._inflight = SingleFlight()
 
             logger.info("LLM Generate Initialized.")  # 초기화 완료 로그
         except Exception as e:
@@ -42,29 +80,159 @@ class RecipeGenerator:
             f"{item['ingredients']}: {item['quantities']}" 
             for item in ingredients
         )
+
+    def build_messages(
+        self, 
+        user_ingredients: List[Dict[str, str]], 
+        search_response: List[Dict]
+    ):
+        """검색 결과를 토큰 예산에 맞게 압축해 프롬프트 메시지 생성"""
+        return prompt.format_messages(
+            ingredients=self.format_ingredients(user_ingredients),
+            documents=context_builder.build(user_ingredients, search_response)
+        )
+
+    def _estimate_tokens(self, messages) -> int:
+        """호출 한도 계산용 토큰 수 (OpenAI 처럼 프롬프트 토큰에 max_tokens 를 더한다)"""
+        return sum(context_builder.count_tokens(str(message.content)) for message in messages) + self.max_tokens
+
+    async def _acquire(self, estimated_tokens: int):
+        waited = await self.limiter.acquire(estimated_tokens)
+        if waited > 0:
+            observe_stage("llm_rate_limit_wait", waited)
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        return attempt < setting.LLM_MAX_RETRIES and is_retryable(error)
+
+    async def _backoff(self, error: Exception, attempt: int):
+        delay = retry_delay(error, attempt, setting.LLM_RETRY_BASE_DELAY, setting.LLM_RETRY_MAX_DELAY)
+        LLM_RETRIES.labels(type(error).__name__).inc()
+        if is_rate_limited(error):
+            # 한도 초과는 다른 요청도 같이 기다리도록 limiter 를 잠시 멈춘다
+            self.limiter.pause(delay)
+        logger.warning(
+            "LLM 호출 실패로 %.1f초 후 재시도 (%d/%d): %s",
+            delay, attempt + 1, setting.LLM_MAX_RETRIES, str(error)
+        )
+        await asyncio.sleep(delay)
+
     def generate_recipes(
         self, 
         user_ingredients: List[Dict[str, str]], 
-        search_response: str
+        search_response: List[Dict]
     ) -> Optional[RecipeResponse]:
         """레시피 추천 응답을 생성하는 함수"""
         try:
             logger.info("Recipe Generation Start.")
             # 메시지 포맷팅 및 LLM 호출
-            return self.llm.invoke(
-                prompt.format_messages(
-                    ingredients=self.format_ingredients(user_ingredients),
-                    documents=search_response
-                )
+            messages = self.build_messages(user_ingredients, search_response)
+            with track_stage("llm"):
+                return self.llm.invoke(messages)
+        except Exception as e:
+            logger.error("LLM generate Error: %s", str(e))
+            raise AppException("LLM Generate Error", status_code=503) from e
+
+    async def agenerate_recipes(
+        self, 
+        user_ingredients: List[Dict[str, str]], 
+        search_response: List[Dict]
+    ) -> Optional[RecipeResponse]:
+        """레시피 추천 응답을 비동기로 생성하는 함수 (이벤트 루프를 막지 않음)
+
+        같은 재료 조합의 요청이 이미 생성 중이면 새로 호출하지 않고 그 결과를 공유한다.
+        """
+        try:
+            messages = self.build_messages(user_ingredients, search_response)
+            if not setting.LLM_COALESCE_REQUESTS:
+                return await self._generate(messages)
+            response, shared = await self._inflight.do(
+                ResponseCache.make_key(user_ingredients), lambda: self._generate(messages)
             )
+            record_cache("llm_inflight", shared)
+            if shared:
+                logger.info("진행 중인 같은 요청의 생성 결과를 공유합니다")
+            return response
+        except Exception as e:
+            logger.error("LLM generate Error: %s", str(e))
+            raise AppException("LLM Generate Error", status_code=503) from e
+
+    async def _generate(self, messages) -> Optional[RecipeResponse]:
+        estimated_tokens = self._estimate_tokens(messages)
+        async with self._slots:
+            logger.info("Recipe Generation Start.")
+            with track_stage("llm"):
+                attempt = 0
+                while True:
+                    await self._acquire(estimated_tokens)
+                    try:
+                        return await self.llm.ainvoke(messages)
+                    except Exception as e:
+                        if not self._should_retry(e, attempt):
+                            raise
+                        await self._backoff(e, attempt)
+                        attempt += 1
+        
+    async def astream_recipes(
+        self, 
+        user_ingredients: List[Dict[str, str]], 
+        search_response: List[Dict]
+    ) -> AsyncIterator[Recipe]:
+        """레시피가 하나씩 완성될 때마다 반환하는 스트리밍 생성 함수"""
+        recipes_key = RecipeResponse.model_fields["recipes"].alias
+        emitted = 0
+        partial_recipes: List[Dict] = []
+        try:
+            messages = self.build_messages(user_ingredients, search_response)
+            estimated_tokens = self._estimate_tokens(messages)
+            async with self._slots:
+                logger.info("Recipe Streaming Generation Start.")
+                started = time.perf_counter()
+                attempt = 0
+                while True:
+                    await self._acquire(estimated_tokens)
+                    received = False
+                    try:
+                        async for partial in self.stream_llm.astream(messages):
+                            received = True
+                            partial_recipes = (partial or {}).get(recipes_key) or []
+                            # 다음 레시피가 시작되면 이전 레시피는 완성된 것
+                            while emitted < len(partial_recipes) - 1:
+                                recipe = self._validate_recipe(partial_recipes[emitted])
+                                emitted += 1
+                                if recipe is not None:
+                                    if emitted == 1:
+                                        observe_stage("llm_first_recipe", time.perf_counter() - started)
+                                    yield recipe
+                        break
+                    except Exception as e:
+                        # 이미 일부를 받은 스트림은 중복 발행을 피하기 위해 재시도하지 않는다
+                        if received or not self._should_retry(e, attempt):
+                            raise
+                        await self._backoff(e, attempt)
+                        attempt += 1
+                observe_stage("llm", time.perf_counter() - started)
+            # 마지막 레시피는 스트림이 끝난 뒤 완성된다
+            while emitted < len(partial_recipes):
+                recipe = self._validate_recipe(partial_recipes[emitted])
+                emitted += 1
+                if recipe is not None:
+                    yield recipe
         except Exception as e:
             logger.error("LLM generate Error: %s", str(e))
             raise AppException("LLM Generate Error", status_code=503) from e
+
+    @staticmethod
+    def _validate_recipe(data: Dict) -> Optional[Recipe]:
+        try:
+            return Recipe.model_validate(data)
+        except ValidationError as e:
+            logger.warning("생성된 레시피 형식 오류로 건너뜁니다: %s", str(e))
+            return None
         
-# 전역 인스턴스 생성
-recipe_generator = RecipeGenerator()
+# 전역 인스턴스 (처음 사용할 때 생성)
+recipe_generator = container.lazy("recipe_generator", RecipeGenerator)
 
-def generate_response(user_ingredients: List[Dict[str, str]], search_response: str) -> Optional[Dict]:
+def generate_response(user_ingredients: List[Dict[str, str]], search_response: List[Dict]) -> Optional[Dict]:
     """레시피 추천 응답을 생성하는 함수"""
     try:
         response = recipe_generator.generate_recipes(user_ingredients, search_response)
@@ -72,3 +240,20 @@ def generate_response(user_ingredients: List[Dict[str, str]], search_response: s
     except Exception as e:
         logger.error("LLM generate Error: %s", str(e))
         raise AppException("LLM Generate Error", status_code=503) from e
+
+async def agenerate_response(user_ingredients: List[Dict[str, str]], search_response: List[Dict]) -> Optional[Dict]:
+    """레시피 추천 응답을 비동기로 생성하는 함수"""
+    try:
+        response = await recipe_generator.agenerate_recipes(user_ingredients, search_response)
+        return response.model_dump(by_alias=True) if response else None
+    except Exception as e:
+        logger.error("LLM generate Error: %s", str(e))
+        raise AppException("LLM Generate Error", status_code=503) from e
+
+async def astream_response(
+    user_ingredients: List[Dict[str, str]], 
+    search_response: List[Dict]
+) -> AsyncIterator[Dict]:
+    """완성된 레시피를 하나씩 dict 로 반환하는 스트리밍 함수"""
+    async for recipe in recipe_generator.astream_recipes(user_ingredients, search_response):
+        yield recipe.model_dump(by_alias=True)
@@ -0,0 +1,150 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.logger import setup_logger
+import asyncio
+import random
+import time
+
+logger = setup_logger(__name__)
+
+class TokenBucketLimiter:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 지키는 토큰 버킷
+
+    두 버킷은 1분에 한도만큼 연속적으로 채워지고, 요청은 두 버킷 모두에 여유가 생길 때까지 기다린다.
+    대기는 도착 순서대로 처리되며 한도가 0이면 해당 버킷은 제한하지 않는다.
+    """
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                float(self.requests_per_minute), self._requests + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                float(self.tokens_per_minute), self._tokens + elapsed * self.tokens_per_minute / 60
+            )
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        wait = max(self._paused_until - now, 0.0)
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """요청 1건과 tokens 만큼의 한도를 확보하고 기다린 시간(초)을 반환"""
+        if not self.enabled:
+            return 0.0
+        if self.tokens_per_minute:
+            # 버킷보다 큰 요청이 영원히 기다리지 않도록 상한을 둔다
+            tokens = min(tokens, self.tokens_per_minute)
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(tokens, now)
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return now - started
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """서버가 한도 초과를 알리면 그동안 새 요청을 내보내지 않는다"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나의 실행으로 합친다
+
+    먼저 온 호출이 실행을 시작하고, 그 실행이 끝나기 전에 들어온 같은 키의 호출은 결과(또는 예외)를 공유한다.
+    호출자 하나가 취소되어도 다른 호출자가 기다리는 동안에는 공유 중인 실행이 계속되고,
+    기다리는 호출자가 모두 취소되면 실행도 취소해 LLM 호출과 처리 슬롯/토큰 대기를 바로 놓는다.
+    """
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(결과, 다른 호출의 실행을 공유했는지) 반환"""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._on_done(key, done))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self._waiters[task] -= 1
+            if self._waiters[task] == 0:
+                del self._waiters[task]
+                if not task.done():
+                    # 마지막 호출자가 취소됨: 새로 들어오는 호출은 취소 중인 실행을 공유하지 않는다
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+                    task.cancel()
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 기다리던 호출자가 모두 취소된 경우에도 예외 미확인 경고가 나지 않도록 확인해 둔다
+        if not task.cancelled():
+            task.exception()
+
+def is_rate_limited(error: BaseException) -> bool:
+    # openai 는 LLM 클라이언트를 만들 때 불러오므로 오류를 판별하는 시점에는 이미 import 되어 있다
+    import openai
+    return isinstance(error, openai.RateLimitError)
+
+def is_retryable(error: BaseException) -> bool:
+    import openai
+    if is_rate_limited(error) and getattr(error, "code", None) == "insufficient_quota":
+        return False  # 사용 한도 소진은 기다려도 해결되지 않는다
+    # 잠시 후 다시 시도하면 성공할 수 있는 OpenAI 오류
+    return isinstance(error, (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    ))
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+def retry_delay(error: BaseException, attempt: int, base_delay: float, max_delay: float) -> float:
+    """지수 백오프에 full jitter 를 적용한 대기 시간 (서버가 Retry-After 를 주면 그보다 짧게 기다리지 않음)"""
+    delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, max_delay))
+    return delay
@@ -0,0 +1,155 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+from app.core import setting
+from app.core.container import container
+from app.core.logger import setup_logger
+from app.service.preprocess.ingredient import ingredient_normalizer
+import numpy as np
+import time
+
+logger = setup_logger(__name__)
+
+class _CacheEntry:
+    __slots__ = ("response", "expires_at", "vector")
+
+    def __init__(self, response: Dict, expires_at: float, vector: Optional[np.ndarray]):
+        self.response = response
+        self.expires_at = expires_at
+        self.vector = vector
+
+class ResponseCache:
+    """재료/수량 조합별 추천 응답 캐시
+
+    정규화한 ingredients_data 로 정확히 일치하는 응답을 찾고, semantic 모드에서는
+    쿼리 임베딩의 코사인 유사도가 임계값 이상인 캐시 응답도 재사용한다.
+    """
+    def __init__(
+        self,
+        max_entries: int = setting.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: float = setting.RESPONSE_CACHE_TTL,
+        semantic: bool = setting.RESPONSE_CACHE_SEMANTIC,
+        semantic_threshold: float = setting.RESPONSE_CACHE_SEMANTIC_THRESHOLD
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._lock = Lock()
+        # semantic 검색용 정규화 벡터 행렬 (캐시가 바뀌면 다시 만든다)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(ingredients_data: List[Dict[str, str]]) -> str:
+        """재료명/수량 표기를 정규화하고 순서와 중복을 무시한 캐시 키 생성"""
+        return ingredient_normalizer.pair_key(ingredients_data)
+
+    @staticmethod
+    def semantic_text(ingredients_data: List[Dict[str, str]]) -> str:
+        """semantic 비교에 쓸 텍스트 (정규화한 재료명과 수량, 순서 무관)
+
+        재료명만 비교하면 수량이 다른 요청도 유사도 1.0 이 되어 다른 분량으로 만든 응답을 재사용하게 된다.
+        """
+        return ", ".join(pair.replace(":", " ") for pair in ingredient_normalizer.pair_key(ingredients_data).split("|"))
+
+    def get(self, key: str) -> Optional[Dict]:
+        """정확히 일치하는 키의 캐시 응답 조회"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.response
+            if entry is not None:
+                self._remove(key)
+            if not self.semantic:
+                self.misses += 1
+            return None
+
+    def find_similar(self, vector) -> Optional[Dict]:
+        """쿼리 임베딩과 코사인 유사도가 임계값 이상인 캐시 응답 조회"""
+        if not self.semantic:
+            return None
+        query = self._normalize(vector)
+        with self._lock:
+            if self._entries and self._matrix is None:
+                self._rebuild_matrix()
+            if self._matrix is None or not len(self._matrix_keys):
+                self.misses += 1
+                return None
+
+            scores = self._matrix @ query
+            best = int(np.argmax(scores))
+            key = self._matrix_keys[best]
+            entry = self._entries.get(key)
+            if (
+                scores[best] >= self.semantic_threshold
+                and entry is not None
+                and entry.expires_at > time.monotonic()
+            ):
+                self._entries.move_to_end(key)
+                self.semantic_hits += 1
+                logger.debug(f"semantic 캐시 적중: {key} (유사도: {scores[best]:.4f})")
+                return entry.response
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: Dict, vector=None):
+        if response is None:
+            return
+        entry = _CacheEntry(
+            response=response,
+            expires_at=time.monotonic() + self.ttl,
+            vector=self._normalize(vector) if self.semantic and vector is not None else None
+        )
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            self._matrix = None
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        if self._entries.pop(key, None) is not None:
+            self._matrix = None
+
+    def _rebuild_matrix(self):
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[key]
+        keyed = [(k, e.vector) for k, e in self._entries.items() if e.vector is not None]
+        self._matrix_keys = [k for k, _ in keyed]
+        self._matrix = np.stack([v for _, v in keyed]) if keyed else np.empty((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def stats(self) -> Dict[str, int]:
+        """캐시 적중/미스 통계"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+# 전역 응답 캐시 인스턴스 (처음 사용할 때 생성)
+response_cache = container.lazy("response_cache", ResponseCache)
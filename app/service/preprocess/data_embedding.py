@@ -1,13 +1,26 @@
-from langchain_huggingface import HuggingFaceEmbeddings
-from threading import Lock
-from functools import lru_cache
+from threading import RLock, Lock, Timer
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from enum import Enum
 from app.core import setting
 from app.core.logger import setup_logger
 from app.core.exception import EmbeddingException
+from app.core.metrics import EMBEDDING_MODEL_RESIDENT, track_stage
+from app.service.preprocess.embedding_backend import EmbeddingBackend, create_embedding_model
+import contextvars
+import functools
+import asyncio
+import time
 import gc
 
 logger = setup_logger(__name__)
 
+class ModelResidency(str, Enum):
+    """임베딩 모델 상주 정책"""
+    RESIDENT = "resident"          # 한 번 로드 후 계속 메모리에 유지
+    IDLE_TIMEOUT = "idle_timeout"  # 마지막 사용 후 일정 시간 트래픽이 없으면 언로드
+    PER_CALL = "per_call"          # 호출마다 로드/언로드 (기존 동작)
+
 class EmbeddingService:
     _lock = Lock()
     _instance = None
@@ -17,23 +30,51 @@ class EmbeddingService:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
                 cls._instance.model_name = setting.MODEL_NAME
+                cls._instance.backend = EmbeddingBackend(setting.EMBEDDING_BACKEND)
+                cls._instance.num_threads = setting.EMBEDDING_NUM_THREADS
+                cls._instance.residency = ModelResidency(setting.EMBEDDING_RESIDENCY)
+                cls._instance.idle_timeout = setting.EMBEDDING_IDLE_TIMEOUT
                 cls._instance._embedding_model = None
-                cls._instance._model_lock = Lock()
+                cls._instance.model_factory = None  # 지정 시 설정된 백엔드 대신 사용 (벤치마크 등)
+                cls._instance._model_lock = RLock()
+                cls._instance._active_calls = 0
+                cls._instance._last_used = 0.0
+                cls._instance._idle_timer = None
+                cls._instance._executor = None
             return cls._instance
 
     def __init__(self):
         pass
 
+    @property
+    def is_loaded(self) -> bool:
+        return self._embedding_model is not None
+
     def _load_model(self):
         with self._model_lock:
+            if self._embedding_model is not None:
+                return
             try:
-                logger.info("임베딩 모델 로딩 시작...")
-                self._embedding_model = HuggingFaceEmbeddings(model_name=self.model_name)
+                logger.info(f"임베딩 모델 로딩 시작... (백엔드: {self.backend.value})")
+                with track_stage("model_load"):
+                    self._embedding_model = self._create_model()
+                EMBEDDING_MODEL_RESIDENT.set(1)
                 logger.info("임베딩 모델 로딩 완료")
             except Exception as e:
                 logger.error(f"모델 로드 중 오류 발생: {e}")
                 raise EmbeddingException(f"모델 로드 중 오류 발생: {e}")
 
+    def _create_model(self):
+        if self.model_factory is not None:
+            return self.model_factory()
+        return create_embedding_model(
+            self.model_name,
+            backend=self.backend,
+            num_threads=self.num_threads,
+            onnx_path=setting.EMBEDDING_ONNX_PATH,
+            quantization=setting.EMBEDDING_ONNX_QUANTIZATION
+        )
+
     def _unload_model(self):
         with self._model_lock:
             try:
@@ -41,34 +82,159 @@ class EmbeddingService:
                     logger.info('모델 언로드 시작')
                     self._embedding_model = None
                     gc.collect()  # 메모리 정리
+                    EMBEDDING_MODEL_RESIDENT.set(0)
                     logger.info('모델 언로드 완료')
             except Exception as e:
                 logger.error(f"모델 언로드 중 오류 발생: {e}")
 
-    def embed_text(self, texts):
-        try:
+    def _acquire_model(self):
+        """모델 사용 시작: 필요하면 로드하고 사용 중인 호출 수를 늘린다"""
+        with self._model_lock:
+            self._cancel_idle_timer()
             self._load_model()
             if self._embedding_model is None:
                 raise EmbeddingException("임베딩 모델이 로드되지 않았습니다")
-            logger.info('텍스트 임베딩 시작')
-            result = self._embedding_model.embed_documents(texts)
-            logger.info('텍스트 임베딩 완료')
-            return result
-        except Exception as e:
-            raise EmbeddingException(f"텍스트 임베딩 중 오류 발생: {e}")
+            self._active_calls += 1
+            return self._embedding_model
+
+    def _release_model(self):
+        """모델 사용 종료: 상주 정책에 따라 언로드 여부를 결정한다"""
+        with self._model_lock:
+            self._active_calls = max(self._active_calls - 1, 0)
+            self._last_used = time.monotonic()
+            if self._active_calls > 0:
+                return
+            if self.residency == ModelResidency.PER_CALL:
+                self._unload_model()
+            elif self.residency == ModelResidency.IDLE_TIMEOUT:
+                self._schedule_idle_unload()
+
+    def _schedule_idle_unload(self):
+        self._cancel_idle_timer()
+        self._idle_timer = Timer(self.idle_timeout, self._unload_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _unload_if_idle(self):
+        with self._model_lock:
+            idle = time.monotonic() - self._last_used
+            if self._active_calls == 0 and idle >= self.idle_timeout:
+                logger.info(f"{idle:.0f}초 동안 요청이 없어 임베딩 모델을 언로드합니다")
+                self._idle_timer = None
+                self._unload_model()
+
+    @contextmanager
+    def resident(self):
+        """블록 안에서는 상주 정책과 관계없이 모델을 메모리에 유지 (대량 임베딩용)"""
+        self._acquire_model()
+        try:
+            yield self
         finally:
+            self._release_model()
+
+    def load(self):
+        """추론 없이 모델만 로드 (워커 프로세스를 fork 하기 전에 부모 프로세스에서 사용)"""
+        self._load_model()
+
+    def warm_up(self):
+        """서버 시작 시 모델을 미리 로드하고 더미 쿼리로 추론 경로를 초기화"""
+        try:
+            logger.info(f"임베딩 모델 워밍업 시작 (정책: {self.residency.value})")
+            model = self._acquire_model()
+            try:
+                model.embed_query("warm up")
+            finally:
+                self._release_model()
+            logger.info("임베딩 모델 워밍업 완료")
+        except Exception as e:
+            raise EmbeddingException(f"임베딩 모델 워밍업 중 오류 발생: {e}")
+
+    def shutdown(self):
+        """타이머와 실행기를 정리하고 모델을 언로드"""
+        with self._model_lock:
+            executor, self._executor = self._executor, None
+        # 실행 중인 임베딩이 모델 락을 잡을 수 있도록 락 밖에서 종료를 기다린다
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._model_lock:
+            self._cancel_idle_timer()
             self._unload_model()
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """이벤트 루프를 막지 않도록 임베딩 연산을 실행할 전용 스레드 풀"""
+        with self._model_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=setting.EMBEDDING_MAX_WORKERS,
+                    thread_name_prefix="embedding"
+                )
+            return self._executor
+
+    async def _run_in_executor(self, func, *args):
+        loop = asyncio.get_running_loop()
+        # 요청 context(correlation id 등)를 실행기 스레드로 전달
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(context.run, func, *args)
+        )
+
+    def embed_text(self, texts):
+        try:
+            model = self._acquire_model()
+            try:
+                logger.info('텍스트 임베딩 시작')
+                with track_stage("embedding"):
+                    result = model.embed_documents(texts)
+                logger.info('텍스트 임베딩 완료')
+                return result
+            finally:
+                self._release_model()
+        except Exception as e:
+            raise EmbeddingException(f"텍스트 임베딩 중 오류 발생: {e}")
+
     def embed_query(self, query):
         try:
-            self._load_model()
-            if self._embedding_model is None:
-                raise EmbeddingException("임베딩 모델이 로드되지 않았습니다")
-            logger.info('쿼리 임베딩 시작')
-            result = self._embedding_model.embed_query(query)
-            logger.info('쿼리 임베딩 완료')
-            return result
+            model = self._acquire_model()
+            try:
+                logger.info('쿼리 임베딩 시작')
+                with track_stage("embedding"):
+                    result = model.embed_query(query)
+                logger.info('쿼리 임베딩 완료')
+                return result
+            finally:
+                self._release_model()
         except Exception as e:
             raise EmbeddingException(f"쿼리 임베딩 중 오류 발생: {e}")
-        finally:
-            self._unload_model()
\ No newline at end of file
+
+    def embed_queries(self, queries):
+        """여러 쿼리를 한 번의 배치 추론으로 임베딩"""
+        try:
+            model = self._acquire_model()
+            try:
+                logger.info(f'배치 쿼리 임베딩 시작 ({len(queries)}개)')
+                # 별도 query_encode_kwargs 를 쓰지 않으므로 embed_documents 는 embed_query 를 배치로 수행한 것과 같다
+                with track_stage("embedding"):
+                    result = model.embed_documents(queries)
+                logger.info('배치 쿼리 임베딩 완료')
+                return result
+            finally:
+                self._release_model()
+        except Exception as e:
+            raise EmbeddingException(f"배치 쿼리 임베딩 중 오류 발생: {e}")
+
+    async def aembed_text(self, texts):
+        """embed_text 의 비동기 버전 (전용 스레드 풀에서 실행)"""
+        return await self._run_in_executor(self.embed_text, texts)
+
+    async def aembed_query(self, query):
+        """embed_query 의 비동기 버전 (전용 스레드 풀에서 실행)"""
+        return await self._run_in_executor(self.embed_query, query)
+
+    async def aembed_queries(self, queries):
+        """embed_queries 의 비동기 버전 (전용 스레드 풀에서 실행)"""
+        return await self._run_in_executor(self.embed_queries, queries)
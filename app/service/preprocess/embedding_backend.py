@@ -0,0 +1,107 @@
+from enum import Enum
+from typing import TYPE_CHECKING, Optional
+from app.core.exception import EmbeddingException
+from app.core.logger import setup_logger
+import os
+
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+logger = setup_logger(__name__)
+
+class EmbeddingBackend(str, Enum):
+    """임베딩 추론 백엔드"""
+    TORCH = "torch"            # 기본 fp32 torch (기존 동작)
+    TORCH_INT8 = "torch_int8"  # torch 동적 int8 양자화 (Linear 레이어)
+    ONNX = "onnx"              # ONNX Runtime fp32
+    ONNX_INT8 = "onnx_int8"    # ONNX Runtime 동적 int8 양자화
+
+def configure_threads(num_threads: int):
+    """torch 추론 스레드 수 설정 (0이면 라이브러리 기본값 유지, torch 가 없으면 무시)"""
+    if num_threads > 0:
+        try:
+            import torch
+        except ImportError:
+            return
+        torch.set_num_threads(num_threads)
+
+def _onnx_session_options(num_threads: int):
+    import onnxruntime
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads > 0:
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+    return options
+
+def _export_onnx(model_name: str, export_path: str, quantization: Optional[str]) -> str:
+    """ONNX 모델(필요하면 int8 양자화 모델까지)을 export_path 에 한 번만 만들고 파일 이름을 반환"""
+    from sentence_transformers import SentenceTransformer
+    file_name = "onnx/model.onnx" if quantization is None else f"onnx/model_qint8_{quantization}.onnx"
+    if os.path.exists(os.path.join(export_path, file_name)):
+        return file_name
+
+    logger.info(f"ONNX 모델 변환 시작: {model_name} → {export_path}")
+    if not os.path.exists(os.path.join(export_path, "onnx/model.onnx")):
+        # 저장된 ONNX 파일이 없으면 sentence-transformers 가 변환해서 불러온다
+        model = SentenceTransformer(model_name, backend="onnx", device="cpu")
+        model.save_pretrained(export_path)
+    if quantization is not None:
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+        model = SentenceTransformer(export_path, backend="onnx", device="cpu")
+        export_dynamic_quantized_onnx_model(model, quantization, export_path)
+    logger.info(f"ONNX 모델 변환 완료: {file_name}")
+    return file_name
+
+def create_embedding_model(
+    model_name: str,
+    backend: EmbeddingBackend = EmbeddingBackend.TORCH,
+    num_threads: int = 0,
+    onnx_path: Optional[str] = None,
+    quantization: str = "avx2"
+) -> "HuggingFaceEmbeddings":
+    """백엔드에 맞는 임베딩 모델 생성
+
+    모든 백엔드가 같은 sentence-transformers 파이프라인(pooling, 정규화)을 쓰므로 출력 형식은 같다.
+    num_threads 가 0 이면 라이브러리 기본값(코어 수)을 사용한다.
+    """
+    backend = EmbeddingBackend(backend)
+    try:
+        # torch/sentence-transformers 는 모델을 처음 만들 때 불러온다
+        from langchain_huggingface import HuggingFaceEmbeddings
+        if backend in (EmbeddingBackend.TORCH, EmbeddingBackend.TORCH_INT8):
+            configure_threads(num_threads)
+            if backend == EmbeddingBackend.TORCH:
+                # 기존 동작과 같이 장치 선택은 sentence-transformers 에 맡긴다 (GPU 가 있으면 GPU)
+                return HuggingFaceEmbeddings(model_name=model_name)
+            # 동적 int8 양자화는 CPU 에서만 동작하므로 CPU 에 고정
+            model = HuggingFaceEmbeddings(model_name=model_name, model_kwargs={"device": "cpu"})
+            import torch
+            client = getattr(model, "_client", None)
+            if client is None:
+                raise EmbeddingException("torch_int8 백엔드는 langchain-huggingface 의 SentenceTransformer 클라이언트가 필요합니다")
+            # Linear 가중치만 int8 로 바꾸고 활성값은 추론 시점에 양자화한다
+            torch.ao.quantization.quantize_dynamic(client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            return model
+
+        # ONNX 백엔드는 CPUExecutionProvider 로 실행
+        export_path = onnx_path or os.path.join("data", "onnx", model_name.replace("/", "__"))
+        file_name = _export_onnx(
+            model_name, export_path, quantization if backend == EmbeddingBackend.ONNX_INT8 else None
+        )
+        return HuggingFaceEmbeddings(
+            model_name=export_path,
+            model_kwargs={
+                "device": "cpu",
+                "backend": "onnx",
+                "model_kwargs": {
+                    "file_name": file_name,
+                    "provider": "CPUExecutionProvider",
+                    "session_options": _onnx_session_options(num_threads),
+                },
+            },
+        )
+    except EmbeddingException:
+        raise
+    except ImportError as e:
+        raise EmbeddingException(f"{backend.value} 백엔드에 필요한 패키지가 없습니다: {e}")
@@ -0,0 +1,63 @@
+from typing import List, Optional, Tuple
+from app.core import setting
+from app.core.logger import setup_logger
+from app.service.preprocess.data_embedding import EmbeddingService
+import asyncio
+
+logger = setup_logger(__name__)
+
+class EmbeddingBatcher:
+    """동시에 들어온 쿼리 임베딩 요청을 모아 한 번의 배치 추론으로 처리하는 마이크로 배처
+
+    요청은 max_wait_ms 동안 또는 max_batch_size 개가 모일 때까지 대기한 뒤
+    EmbeddingService.aembed_queries 로 한꺼번에 임베딩되고, 각 호출자는 자신의 벡터를 받는다.
+    """
+    def __init__(
+        self,
+        embedding_service: EmbeddingService = None,
+        max_batch_size: int = setting.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = setting.EMBEDDING_BATCH_MAX_WAIT_MS
+    ):
+        self.embedding_service = embedding_service or EmbeddingService()
+        self.max_batch_size = max(max_batch_size, 1)
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batches = set()
+
+    async def embed_query(self, query: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        # 같은 배치 안의 동일한 쿼리는 한 번만 임베딩
+        texts = list(dict.fromkeys(query for query, _ in batch))
+        try:
+            logger.debug(f"배치 임베딩: 요청 {len(batch)}개, 고유 쿼리 {len(texts)}개")
+            vectors = await self.embedding_service.aembed_queries(texts)
+            by_text = dict(zip(texts, vectors))
+            for query, future in batch:
+                if not future.done():
+                    future.set_result(by_text[query])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Optional
+from app.core import setting
+from app.core.logger import setup_logger
+from app.service.preprocess.ingredient import ingredient_normalizer
+import numpy as np
+import sqlite3
+
+logger = setup_logger(__name__)
+
+class EmbeddingCache:
+    """정규화된 재료 조합을 키로 쿼리 임베딩을 저장하는 LRU 캐시
+
+    벡터는 float32 배열로 저장하며 전체 크기가 max_bytes 를 넘으면 가장 오래 사용하지 않은
+    항목부터 제거한다. disk_path 를 지정하면 sqlite 파일에 함께 저장해 재시작 후에도 재사용한다.
+    """
+    def __init__(
+        self,
+        max_bytes: int = setting.EMBEDDING_CACHE_MAX_BYTES,
+        disk_path: Optional[str] = setting.EMBEDDING_CACHE_PATH
+    ):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.disk_path = disk_path
+        self._db = self._open_disk(disk_path) if disk_path else None
+
+    @staticmethod
+    def make_key(ingredients: Iterable[str]) -> str:
+        """표기/중복/순서를 무시한 재료 목록으로 캐시 키 생성"""
+        return ingredient_normalizer.cache_key(ingredients)
+
+    def _open_disk(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            db.commit()
+            logger.info(f"임베딩 디스크 캐시 사용: {path}")
+            return db
+        except sqlite3.Error as e:
+            logger.error(f"임베딩 디스크 캐시를 열 수 없습니다: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            vector = self._read_disk(key)
+            if vector is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self._insert(key, vector)
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._insert(key, array)
+            self._write_disk(key, array)
+        return array
+
+    def _insert(self, key: str, array: np.ndarray):
+        if array.nbytes > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= previous.nbytes
+        self._entries[key] = array
+        self._size += array.nbytes
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.nbytes
+
+    def _read_disk(self, key: str) -> Optional[np.ndarray]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"임베딩 디스크 캐시 조회 오류: {e}")
+            return None
+        return np.frombuffer(row[0], dtype=np.float32) if row else None
+
+    def _write_disk(self, key: str, array: np.ndarray):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                (key, array.tobytes())
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"임베딩 디스크 캐시 저장 오류: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """캐시 적중/미스 통계"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def reopen(self):
+        """디스크 캐시 연결을 새로 연다 (sqlite 연결은 fork 된 프로세스에서 이어 쓸 수 없음)"""
+        with self._lock:
+            self._db = self._open_disk(self.disk_path) if self.disk_path else None
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
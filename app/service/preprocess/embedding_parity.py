@@ -0,0 +1,111 @@
+"""임베딩 백엔드 일치도 확인
+
+양자화/ONNX 백엔드로 계산한 벡터가 인덱스에 저장된 fp32 벡터(또는 fp32 모델로 새로 계산한 벡터)와
+얼마나 같은지 코사인 유사도로 보고한다. 레시피 텍스트는 적재 파이프라인과 같은 형식으로 만든다.
+
+사용 예:
+    python -m app.service.preprocess.embedding_parity --backend onnx_int8 --recipes recipes.jsonl
+    python -m app.service.preprocess.embedding_parity --backend torch_int8 --reference fp32 --sample 500
+"""
+from typing import Dict, List, Optional, Tuple
+from app.core import setting
+from app.core.logger import setup_logger
+from app.repositorie.vector_store import get_vector_store
+from app.service.ingest.ingest import read_recipes, to_record
+from app.service.preprocess.embedding_backend import EmbeddingBackend, create_embedding_model
+import argparse
+import random
+import time
+import numpy as np
+
+logger = setup_logger(__name__)
+
+def load_samples(recipes_path: Optional[str], store, sample: int, seed: int = 0) -> List[Tuple[str, str]]:
+    """(레시피 id, 임베딩 텍스트) 표본 (레시피 파일이 없으면 전체 조회가 가능한 저장소에서 뽑는다)"""
+    if recipes_path:
+        pairs = [(record.id, record.text) for record in map(to_record, read_recipes(recipes_path))]
+    elif hasattr(store, "items"):
+        pairs = [
+            (recipe_id, " ".join(metadata.get("ingredients", [])))
+            for recipe_id, metadata in store.items()
+        ]
+    else:
+        raise ValueError("--recipes 로 레시피 파일을 지정해야 합니다 (저장소에서 전체 목록을 읽을 수 없음)")
+    pairs = [pair for pair in pairs if pair[1]]
+    random.Random(seed).shuffle(pairs)
+    return pairs[:sample]
+
+def embed(model, texts: List[str], batch_size: int) -> Tuple[np.ndarray, float]:
+    """정규화된 벡터 행렬과 텍스트당 평균 소요 시간(ms)"""
+    started = time.perf_counter()
+    vectors = []
+    for i in range(0, len(texts), batch_size):
+        vectors.extend(model.embed_documents(texts[i:i + batch_size]))
+    elapsed = time.perf_counter() - started
+    return normalize(np.asarray(vectors, dtype=np.float32)), elapsed * 1000 / max(len(texts), 1)
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def parity_report(candidate: np.ndarray, reference: np.ndarray, threshold: float) -> Dict[str, float]:
+    """같은 텍스트의 코사인 유사도 분포와, 후보 벡터로 검색했을 때 자기 자신이 1위인 비율"""
+    cosine = np.sum(candidate * reference, axis=1)
+    self_top1 = np.mean(np.argmax(candidate @ reference.T, axis=1) == np.arange(len(candidate)))
+    return {
+        "samples": int(len(cosine)),
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "cosine_p1": float(np.percentile(cosine, 1)),
+        "cosine_p5": float(np.percentile(cosine, 5)),
+        "below_threshold": float(np.mean(cosine < threshold)),
+        "self_top1": float(self_top1),
+    }
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="임베딩 백엔드가 fp32 벡터와 일치하는지 확인합니다.")
+    parser.add_argument("--backend", default=setting.EMBEDDING_BACKEND, choices=[b.value for b in EmbeddingBackend])
+    parser.add_argument("--reference", default="index", choices=["index", "fp32"],
+                        help="비교 기준: 인덱스에 저장된 벡터 또는 fp32 모델로 새로 계산한 벡터")
+    parser.add_argument("--recipes", help="표본을 뽑을 레시피 JSONL/CSV (적재에 사용한 파일)")
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=setting.EMBEDDING_NUM_THREADS)
+    parser.add_argument("--threshold", type=float, default=0.99, help="허용 최소 코사인 유사도 (평균이 이보다 낮으면 실패)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    store = get_vector_store()
+    samples = load_samples(args.recipes, store, args.sample, args.seed)
+    if args.reference == "index":
+        stored = store.fetch_vectors([recipe_id for recipe_id, _ in samples])
+        samples = [(recipe_id, text) for recipe_id, text in samples if recipe_id in stored]
+    if not samples:
+        parser.error("비교할 표본이 없습니다")
+    texts = [text for _, text in samples]
+
+    model = create_embedding_model(
+        setting.MODEL_NAME, backend=args.backend, num_threads=args.threads,
+        onnx_path=setting.EMBEDDING_ONNX_PATH, quantization=setting.EMBEDDING_ONNX_QUANTIZATION
+    )
+    candidate, candidate_ms = embed(model, texts, args.batch_size)
+    reference_ms = None
+    if args.reference == "index":
+        reference = normalize(np.asarray([stored[recipe_id] for recipe_id, _ in samples], dtype=np.float32))
+    else:
+        fp32 = create_embedding_model(setting.MODEL_NAME, EmbeddingBackend.TORCH, num_threads=args.threads)
+        reference, reference_ms = embed(fp32, texts, args.batch_size)
+
+    report = parity_report(candidate, reference, args.threshold)
+    print(f"백엔드: {args.backend} (기준: {args.reference}, 표본 {report['samples']}개)")
+    print(
+        f"코사인 유사도 평균 {report['cosine_mean']:.5f}, 최소 {report['cosine_min']:.5f}, "
+        f"p1 {report['cosine_p1']:.5f}, p5 {report['cosine_p5']:.5f}"
+    )
+    print(f"임계값 {args.threshold} 미만 비율 {report['below_threshold']:.2%}, 자기 자신 1위 비율 {report['self_top1']:.2%}")
+    print(f"텍스트당 임베딩 시간: {candidate_ms:.1f}ms" + (f" (fp32 {reference_ms:.1f}ms)" if reference_ms else ""))
+    return 0 if report["cosine_mean"] >= args.threshold else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+# 대표 재료명 → 같은 재료를 가리키는 다른 표기
+DEFAULT_SYNONYMS: Dict[str, List[str]] = {
+    "대파": ["파", "큰파"],
+    "쪽파": ["실파"],
+    "달걀": ["계란", "날계란", "날달걀"],
+    "마늘": ["다진마늘", "간마늘", "통마늘", "마늘다진것"],
+    "생강": ["다진생강", "생강다진것"],
+    "소고기": ["쇠고기", "우육"],
+    "돼지고기": ["돈육"],
+    "닭고기": ["닭", "생닭"],
+    "고춧가루": ["고추가루"],
+    "간장": ["진간장", "양조간장", "왜간장"],
+    "국간장": ["조선간장", "집간장"],
+    "설탕": ["백설탕", "흰설탕"],
+    "식용유": ["콩기름", "식물성기름"],
+    "후추": ["후춧가루", "후추가루", "통후추"],
+    "소금": ["천일염", "꽃소금", "굵은소금"],
+    "맛술": ["미림", "미향"],
+    "김치": ["배추김치", "신김치", "묵은지"],
+    "밥": ["쌀밥", "흰밥", "공기밥"],
+    "케첩": ["케찹", "토마토케첩", "토마토케찹"],
+    "마요네즈": ["마요"],
+    "청양고추": ["청량고추"],
+    "홍고추": ["빨간고추"],
+    "부추": ["정구지"],
+    "양파": [],
+    "파프리카": [],
+    "양배추": [],
+}
+
+# 단위 표기 → 대표 단위
+UNIT_ALIASES: Dict[str, str] = {
+    "kg": "kg", "g": "g", "mg": "mg",
+    "ml": "ml", "mL": "ml", "ML": "ml", "cc": "ml", "L": "L", "l": "L",
+    "tbsp": "큰술", "Tbsp": "큰술", "tsp": "작은술", "cup": "컵", "cups": "컵",
+    "큰술": "큰술", "T": "큰술", "Ts": "큰술", "스푼": "큰술", "숟가락": "큰술", "밥숟가락": "큰술", "큰스푼": "큰술",
+    "작은술": "작은술", "t": "작은술", "ts": "작은술", "티스푼": "작은술", "작은스푼": "작은술", "찻숟가락": "작은술",
+    "컵": "컵", "개": "개", "알": "알", "쪽": "쪽", "톨": "톨", "장": "장", "줌": "줌", "모": "모",
+    "마리": "마리", "봉지": "봉지", "봉": "봉지", "팩": "팩", "캔": "캔", "통": "통", "대": "대",
+    "뿌리": "뿌리", "송이": "송이", "단": "단", "포기": "포기", "조각": "조각", "인분": "인분", "근": "근", "cm": "cm",
+}
+_WORD_NUMBERS = {"한": 1.0, "두": 2.0, "세": 3.0, "네": 4.0, "반": 0.5}
+# 수량 없이 쓰이는 분량 표현
+_VAGUE_AMOUNTS = ("약간", "적당량", "적당히", "조금", "소량", "넉넉히", "취향껏", "기호에따라", "기호에 따라")
+
+_units = "|".join(sorted((re.escape(u) for u in UNIT_ALIASES), key=len, reverse=True))
+_number = r"\d+(?:\.\d+)?(?:\s*/\s*\d+)?"
+# 숫자(분수, 범위 포함) + 선택적 단위, 또는 '한 줌'/'반 개' 같은 한글 수량, 또는 '약간' 같은 분량 표현
+# 한글 수량을 띄어 쓰지 않았으면('반모') 뒤에 다른 단어가 없을 때만 수량으로 본다 ('네모 어묵' 은 재료명)
+# 분량 표현 뒤의 조사 '의'('소량의 물')도 함께 뗀다
+_QUANTITY = re.compile(
+    rf"(?P<number>{_number}(?:\s*[~\-]\s*{_number})?)\s*(?P<unit>{_units})?(?![A-Za-z])"
+    rf"|(?<![가-힣])(?P<word>한|두|세|네|반)"
+    rf"(?:\s+(?P<word_unit>{_units})|(?P<glued_unit>{_units})(?!\s*[가-힣A-Za-z]))(?![가-힣])"
+    rf"|(?P<vague>{'|'.join(re.escape(v) for v in _VAGUE_AMOUNTS)})(?:의(?=\s|$))?"
+)
+_BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]|\{[^}]*\}")
+_SEPARATORS = re.compile(r"[/~·:;,*+=]+")
+_SPACES = re.compile(r"\s+")
+_QUERY_DELIMITERS = re.compile(r"[,\n;/]+")
+
+@dataclass(frozen=True)
+class ParsedIngredient:
+    """재료 문자열 하나를 나눈 결과"""
+    name: str                   # 대표 재료명 (사전에 없으면 정리한 원래 이름)
+    raw_name: str               # 수량/단위/괄호를 뗀 원래 이름
+    quantity: Optional[float]   # 범위는 최솟값, 분수는 소수로
+    unit: Optional[str]         # 대표 단위
+    amount: str                 # 정규화한 분량 표기 (예: "0.5개", "약간")
+
+class _Trie:
+    """별칭을 뒤집어 저장한 trie: 이름 끝에서부터 가장 긴 별칭을 찾는다 (한국어 재료명은 뒤쪽이 핵심 명사)"""
+    def __init__(self):
+        self._root: Dict = {}
+
+    def add(self, alias: str, canonical: str):
+        node = self._root
+        for char in reversed(alias):
+            node = node.setdefault(char, {})
+        node[""] = canonical
+
+    def longest_suffix(self, text: str) -> Tuple[Optional[str], int]:
+        """(대표 재료명, 일치한 길이)"""
+        node = self._root
+        found, length = None, 0
+        for depth, char in enumerate(reversed(text), 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if "" in node:
+                found, length = node[""], depth
+        return found, length
+
+class IngredientNormalizer:
+    """재료 문자열 정규화 (수량/단위 분리, 별칭 → 대표 재료명)
+
+    검색 쿼리, 레시피 적재, 캐시 키가 같은 규칙을 쓰도록 한 곳에서 처리한다.
+    결과는 문자열별로 메모이즈한다.
+    """
+    def __init__(self, synonyms: Dict[str, List[str]] = DEFAULT_SYNONYMS, cache_size: int = 65536):
+        self._aliases: Dict[str, str] = {}
+        self._trie = _Trie()
+        for canonical, aliases in synonyms.items():
+            for alias in [canonical, *aliases]:
+                key = _SPACES.sub("", alias)
+                self._aliases[key] = canonical
+                if alias != canonical:
+                    # 접미 일치는 사전에 적은 별칭만 사용 ('흑설탕'이 '설탕'으로 합쳐지지 않도록)
+                    self._trie.add(key, canonical)
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+        self.normalize_amount = lru_cache(maxsize=cache_size)(self._normalize_amount)
+
+    def _canonical(self, name: str) -> str:
+        compact = _SPACES.sub("", name)
+        if compact in self._aliases:
+            return self._aliases[compact]
+        canonical, length = self._trie.longest_suffix(compact)
+        # 한 글자 별칭(예: 파)은 '양파'처럼 다른 재료의 일부일 수 있으므로 전체가 일치할 때만 사용
+        if canonical is not None and length > 1:
+            return canonical
+        return compact
+
+    @staticmethod
+    def _to_number(text: str) -> Optional[float]:
+        text = _SPACES.sub("", text)
+        try:
+            if "/" in text:
+                numerator, denominator = text.split("/", 1)
+                return float(numerator) / float(denominator)
+            return float(text)
+        except (ValueError, ZeroDivisionError):
+            return None
+
+    def _quantity(self, match: "re.Match") -> Tuple[Optional[float], Optional[str], str]:
+        if match.group("vague"):
+            return None, None, _SPACES.sub("", match.group("vague"))
+        if match.group("word"):
+            word_unit = match.group("word_unit") or match.group("glued_unit")
+            quantity, unit = _WORD_NUMBERS[match.group("word")], UNIT_ALIASES[word_unit]
+        else:
+            # 범위(1~2개)는 최솟값 기준
+            quantity = self._to_number(re.split(r"[~\-]", match.group("number"))[0])
+            unit = UNIT_ALIASES.get(match.group("unit")) if match.group("unit") else None
+        amount = f"{quantity:g}{unit or ''}" if quantity is not None else ""
+        return quantity, unit, amount
+
+    def _parse(self, text: str) -> ParsedIngredient:
+        text = _BRACKETS.sub(" ", text or "")
+        quantity, unit, amount = None, None, ""
+        first = _QUANTITY.search(text)
+        if first is not None:
+            quantity, unit, amount = self._quantity(first)
+        name = _QUANTITY.sub(" ", text)
+        name = _SPACES.sub(" ", _SEPARATORS.sub(" ", name)).strip()
+        canonical = self._canonical(name) if name else ""
+        return ParsedIngredient(canonical, name, quantity, unit, amount)
+
+    def _normalize_amount(self, text: str) -> str:
+        """분량 문자열만 정규화 ('1/2 개' → '0.5개', '2T' → '2큰술')"""
+        match = _QUANTITY.search(text or "")
+        if match is None:
+            return _SPACES.sub("", text or "")
+        return self._quantity(match)[2]
+
+    def normalize(self, text: str) -> str:
+        """대표 재료명 (재료명이 없으면 빈 문자열)"""
+        return self.parse(text).name
+
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        """순서를 유지하고 빈 이름과 중복을 제거한 대표 재료명 목록"""
+        names: List[str] = []
+        seen = set()
+        for text in texts:
+            name = self.parse(text).name
+            if name and name not in seen:
+                seen.add(name)
+                names.append(name)
+        return names
+
+    def query_terms(self, query: str) -> List[str]:
+        """쉼표 등으로 구분된 검색 쿼리를 정렬된 대표 재료명 목록으로 (같은 재료 조합은 같은 결과)"""
+        return sorted(set(self.normalize_many(_QUERY_DELIMITERS.split(query or ""))))
+
+    def cache_key(self, ingredients: Iterable[str]) -> str:
+        """재료 목록의 순서/중복/표기 차이를 무시한 키"""
+        return ",".join(sorted(set(self.normalize_many(ingredients))))
+
+    def pair_key(self, ingredients_data: Iterable[Dict[str, str]]) -> str:
+        """재료/수량 쌍 목록의 키 (응답 캐시, LLM 호출 합치기용)"""
+        pairs = sorted({
+            (self.normalize(item["ingredients"]), self.normalize_amount(item["quantities"]))
+            for item in ingredients_data
+        })
+        return "|".join(f"{name}:{amount}" for name, amount in pairs if name)
+
+# 전역 재료 정규화 인스턴스
+ingredient_normalizer = IngredientNormalizer()
@@ -1,24 +1,38 @@
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional
 from app.core import setting
+from app.core.container import container
 from app.core.logger import setup_logger
 from app.core.exception import AppException
+from app.core.metrics import track_stage
+from app.service.llm.codec import compress, encode_response
 
 import aio_pika
-import json
+import asyncio
+import itertools
+import zlib
 
 logger = setup_logger(__name__)
 
 
 class RabbitMQPublisher:
     def __init__(
-            self, host: str = setting.RABBITMQ_HOST, exchange: str = '', 
-            routing_key: str = setting.RABBITMQ_RESPONSE_QUEUE
+            self, host: str = setting.RABBITMQ_HOST, exchange: str = '',
+            routing_key: str = setting.RABBITMQ_RESPONSE_QUEUE,
+            channel_pool_size: int = setting.PUBLISHER_CHANNEL_POOL_SIZE,
+            max_outstanding_confirms: int = setting.PUBLISHER_MAX_OUTSTANDING_CONFIRMS
             ):
         self.host = host
         self.exchange = exchange
         self.routing_key = routing_key
+        self.channel_pool_size = max(channel_pool_size, 1)
+        self.max_outstanding_confirms = max(max_outstanding_confirms, 1)
         self.connection = None
         self.channel = None
+        self._channels: List[aio_pika.abc.AbstractChannel] = []
+        self._channel_cycle = None
+        # 확인(confirm)을 기다리는 메시지 수가 창 크기를 넘으면 발행을 잠시 멈춘다
+        self._window = None
+        self._outstanding = set()
 
     async def setup(self):
         """RabbitMQ 연결 설정"""
@@ -26,7 +40,14 @@ class RabbitMQPublisher:
             if not self.connection:
                 logger.info("RabbitMQ connection setting...")
                 self.connection = await aio_pika.connect_robust(f"amqp://{self.host}/")
-                self.channel = await self.connection.channel()
+                # 발행 확인 모드 채널 풀 (채널마다 확인을 파이프라인으로 처리)
+                self._channels = [
+                    await self.connection.channel(publisher_confirms=True)
+                    for _ in range(self.channel_pool_size)
+                ]
+                self._channel_cycle = itertools.cycle(self._channels)
+                self.channel = self._channels[0]
+                self._window = asyncio.Semaphore(self.max_outstanding_confirms)
                 queue_arguments = {
                     'x-queue-type': 'classic'
                 }
@@ -36,44 +57,103 @@ class RabbitMQPublisher:
                     durable=True,
                     arguments=queue_arguments  # classic 큐 타입 설정 추가
                 )
-                logger.info("RabbitMQ connection setting complete.")
+                logger.info(f"RabbitMQ connection setting complete. (채널 {self.channel_pool_size}개)")
         except Exception as e:
             logger.error(f"RabbitMQ connection setting error: {e}")
             raise AppException("RabbitMQ connection setting error",status_code=503)
 
-    async def publish_message(self, message: Any):
-        """메시지 발행"""
+    async def publish_message(
+            self,
+            message: Any,
+            correlation_id: Optional[str] = None,
+            headers: Optional[Dict[str, Any]] = None,
+            wait_for_confirm: bool = True
+        ) -> Optional[asyncio.Task]:
+        """메시지 발행 (correlation_id 로 같은 요청의 스트리밍 메시지를 묶는다)
+
+        wait_for_confirm=False 이면 브로커 확인을 기다리지 않고 확인 태스크를 돌려준다.
+        여러 메시지의 확인은 wait_for_confirms 로 한꺼번에 기다린다.
+        """
         try:
             if not self.channel:
                 await self.setup()
 
-            # 메시지를 JSON 문자열로 변환 (한글 유지)
-            message_str = json.dumps(message, ensure_ascii=False)
-            
-            # UTF-8로 인코딩
-            message_body = message_str.encode('utf-8')
-            
-            await self.channel.default_exchange.publish(
+            # 중간 문자열 없이 UTF-8 JSON bytes 로 직렬화 (한글 유지), 큰 응답은 설정에 따라 압축
+            message_body, compression = compress(encode_response(message))
+
+            # 확인 대기 창이 가득 차면 여기서 대기 (backpressure)
+            await self._window.acquire()
+            confirm = asyncio.create_task(self._publish(
+                self._channel_for(correlation_id),
                 aio_pika.Message(
                     body=message_body,
                     delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
                     content_type='application/json',
-                    content_encoding='utf-8'
-                ),
-                routing_key=self.routing_key
-            )
-            logger.info(f"RabbitMQ published successfully")
+                    content_encoding=compression or 'utf-8',
+                    correlation_id=correlation_id,
+                    headers=headers
+                )
+            ))
+            self._outstanding.add(confirm)
+            confirm.add_done_callback(self._on_confirmed)
         except Exception as e:
             logger.error(f"RabbitMQ message publish error: {e}")
             raise AppException("RabbitMQ message publish error",status_code=500)
 
+        if not wait_for_confirm:
+            return confirm
+        await self.wait_for_confirms([confirm])
+        logger.info(f"RabbitMQ published successfully")
+        return None
+
+    def _channel_for(self, correlation_id: Optional[str]) -> aio_pika.abc.AbstractChannel:
+        """같은 요청(correlation_id)의 메시지는 항상 같은 채널로 보낸다
+
+        RabbitMQ 는 채널 사이의 순서를 보장하지 않으므로, 스트리밍 메시지가 다른 채널로 나뉘면
+        완료 표시가 마지막 레시피보다 먼저 도착할 수 있다. 채널 안에서는 발행한 순서대로 전달된다.
+        """
+        if correlation_id is None:
+            return next(self._channel_cycle)
+        return self._channels[zlib.crc32(correlation_id.encode()) % len(self._channels)]
+
+    async def _publish(self, channel: aio_pika.abc.AbstractChannel, message: aio_pika.Message):
+        # 발행 확인 모드에서는 브로커가 ack 할 때까지 대기하고, nack/반송 시 예외가 발생한다
+        with track_stage("publish"):
+            await channel.default_exchange.publish(
+                message,
+                routing_key=self.routing_key,
+                timeout=setting.PUBLISHER_CONFIRM_TIMEOUT
+            )
+
+    def _on_confirmed(self, confirm: asyncio.Task):
+        self._outstanding.discard(confirm)
+        self._window.release()
+        if not confirm.cancelled() and confirm.exception() is not None:
+            logger.error(f"RabbitMQ publish confirm failed: {confirm.exception()}")
+
+    async def wait_for_confirms(self, confirms: Iterable[asyncio.Task]):
+        """발행한 메시지들의 브로커 확인을 기다리고 하나라도 실패하면 예외 발생"""
+        results = await asyncio.gather(*confirms, return_exceptions=True)
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if failures:
+            logger.error(f"RabbitMQ publish confirm error ({len(failures)}건): {failures[0]}")
+            raise AppException("RabbitMQ message publish error",status_code=500)
+
+    async def flush(self):
+        """확인을 기다리는 모든 메시지 처리 대기"""
+        if self._outstanding:
+            await asyncio.gather(*list(self._outstanding), return_exceptions=True)
+
     async def cleanup(self):
         """리소스 정리"""
         if self.connection:
+            await self.flush()
             await self.connection.close()
             self.connection = None
             self.channel = None
+            self._channels = []
+            self._channel_cycle = None
             logger.info("RabbitMQ connection closed.")
 
-# 전역 발행자 인스턴스
-publisher = RabbitMQPublisher()
+# 전역 발행자 인스턴스 (처음 사용할 때 생성)
+publisher = container.lazy("publisher", RabbitMQPublisher)
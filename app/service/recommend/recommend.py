@@ -0,0 +1,120 @@
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Tuple, TypeVar
+from app.core import setting
+from app.core.exception import DeadlineExceededException
+from app.core.logger import setup_logger
+from app.core.metrics import DEADLINE_EXCEEDED, record_cache, track_stage
+from app.service.listen.deadline import Deadline
+from app.service.search.search import search_service
+from app.service.llm import agenerate_response, astream_response
+from app.service.llm.response_cache import response_cache
+from app.service.llm.models import RecipeResponse
+import asyncio
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+# 응답 dict 의 레시피 목록 키 ("레시피 목록")
+RECIPES_KEY = RecipeResponse.model_fields["recipes"].alias
+
+async def recommend(ingredients_data: List[Dict[str, str]], deadline: Optional[Deadline] = None) -> Optional[Dict]:
+    """캐시 조회 → 검색 → LLM 생성 → 캐시 저장 (검색 결과가 없으면 None)
+
+    큐 소비자와 HTTP API 가 함께 사용하며 응답 발행은 호출한 쪽에서 한다.
+    """
+    cached_response, cache_key, semantic_vector = await _lookup(ingredients_data)
+    if cached_response is not None:
+        return cached_response
+
+    search_results = await _search(ingredients_data, deadline)
+    if not search_results:
+        return None
+
+    if deadline is not None:
+        deadline.check("llm", setting.DEADLINE_MIN_LLM_BUDGET)
+    response = await _within(deadline, agenerate_response(ingredients_data, search_results))
+    logger.info(f"응답 생성 완료 (검색된 레시피: {len(search_results)}개)")
+
+    if cache_key is not None:
+        response_cache.put(cache_key, response, semantic_vector)
+    return response
+
+async def stream_recommendation(
+    ingredients_data: List[Dict[str, str]],
+    deadline: Optional[Deadline] = None
+) -> AsyncIterator[Tuple[str, Dict]]:
+    """레시피가 완성될 때마다 ("recipe", 레시피), 마지막에 ("complete", 전체 응답) 을 반환
+
+    캐시된 응답은 ("cached", 응답) 하나로 반환하고, 검색 결과가 없으면 아무것도 반환하지 않는다.
+    """
+    cached_response, cache_key, semantic_vector = await _lookup(ingredients_data)
+    if cached_response is not None:
+        yield "cached", cached_response
+        return
+
+    search_results = await _search(ingredients_data, deadline)
+    if not search_results:
+        return
+
+    if deadline is not None:
+        deadline.check("llm", setting.DEADLINE_MIN_LLM_BUDGET)
+    recipes = []
+    recipe_stream = astream_response(ingredients_data, search_results)
+    try:
+        while True:
+            try:
+                recipe = await _within(deadline, recipe_stream.__anext__())
+            except StopAsyncIteration:
+                break
+            recipes.append(recipe)
+            yield "recipe", recipe
+    finally:
+        await recipe_stream.aclose()
+    logger.info(f"응답 생성 완료 (검색된 레시피: {len(search_results)}개, 생성된 레시피: {len(recipes)}개)")
+
+    response = {RECIPES_KEY: recipes}
+    if cache_key is not None:
+        response_cache.put(cache_key, response, semantic_vector)
+    yield "complete", response
+
+async def _lookup(ingredients_data: List[Dict[str, str]]) -> Tuple[Optional[Dict], Optional[str], Optional[List[float]]]:
+    """같은 재료/수량 조합의 캐시 응답 조회 (캐시 응답, 캐시 키, semantic 모드에서 계산한 재료/수량 임베딩)"""
+    if not setting.RESPONSE_CACHE_ENABLED:
+        return None, None, None
+    cache_key = response_cache.make_key(ingredients_data)
+    semantic_vector = None
+    cached_response = response_cache.get(cache_key)
+    if cached_response is None and response_cache.semantic:
+        # 수량이 다른 요청이 같은 응답을 받지 않도록 재료명과 수량을 함께 임베딩 (검색용 임베딩과 별도)
+        semantic_vector = await search_service.embed_text(response_cache.semantic_text(ingredients_data))
+        cached_response = response_cache.find_similar(semantic_vector)
+    record_cache("response", cached_response is not None)
+    if cached_response is not None:
+        logger.info("캐시된 응답 사용")
+    return cached_response, cache_key, semantic_vector
+
+async def _search(ingredients_data: List[Dict[str, str]], deadline: Optional[Deadline]) -> List[Dict]:
+    # 검색/LLM 을 끝낼 시간이 남지 않았으면 비용을 쓰기 전에 중단
+    if deadline is not None:
+        deadline.check("search", setting.DEADLINE_MIN_SEARCH_BUDGET)
+    query = _query(ingredients_data)
+    logger.info(f"검색할 재료: {query}")
+    with track_stage("search"):
+        search_results = await search_service.search_recipes_by_text(query)
+    if not search_results:
+        logger.warning("검색 결과가 없습니다.")
+    logger.debug(f"ingredients_data: {ingredients_data}")
+    return search_results
+
+def _query(ingredients_data: List[Dict[str, str]]) -> str:
+    return ",".join(item["ingredients"] for item in ingredients_data)
+
+async def _within(deadline: Optional[Deadline], awaitable: Awaitable[T]) -> T:
+    """기한이 있으면 남은 시간이 지나는 즉시 LLM 호출을 중단"""
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        DEADLINE_EXCEEDED.labels("llm").inc()
+        raise DeadlineExceededException("LLM 응답 생성 중 처리 기한이 지났습니다", stage="llm")
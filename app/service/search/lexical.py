@@ -0,0 +1,93 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.core.logger import setup_logger
+from app.service.preprocess.ingredient import ingredient_normalizer
+import json
+
+logger = setup_logger(__name__)
+
+def recipe_ingredient_names(metadata: Dict) -> Set[str]:
+    """레시피 메타데이터에서 정규화된 재료명 집합 추출"""
+    if not metadata.get("ingredients"):
+        return set()
+    return set(ingredient_normalizer.normalize_many(metadata["ingredients"]))
+
+def ingredient_coverage(query_ingredients: Iterable[str], names: Set[str]) -> float:
+    """사용자 재료 중 레시피에 포함된 비율"""
+    query = set(query_ingredients)
+    if not query:
+        return 0.0
+    return len(query & names) / len(query)
+
+class IngredientIndex:
+    """재료명 → 레시피 id 역색인
+
+    사용자 재료를 많이 포함할수록(coverage), 같은 coverage 라면 추가로 필요한 재료가 적을수록
+    높은 순위를 준다.
+    """
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._sizes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def add(self, recipe_id: str, metadata: Dict):
+        names = recipe_ingredient_names(metadata)
+        if not names:
+            return
+        self._sizes[recipe_id] = len(names)
+        for name in names:
+            self._postings[name].add(recipe_id)
+
+    @classmethod
+    def build(cls, records: Iterable[Tuple[str, Dict]]) -> "IngredientIndex":
+        index = cls()
+        for recipe_id, metadata in records:
+            index.add(recipe_id, metadata)
+        logger.info(f"재료 역색인 생성 완료 (레시피 {len(index)}개, 재료 {len(index._postings)}개)")
+        return index
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "IngredientIndex":
+        """{"id": ..., "metadata": {...}} 형식의 JSONL 파일에서 역색인 생성"""
+        def records():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        yield str(record["id"]), record.get("metadata", {})
+        return cls.build(records())
+
+    def search(self, query_ingredients: List[str], limit: int) -> List[Tuple[str, float]]:
+        """(레시피 id, coverage) 를 순위 순으로 반환"""
+        counts: Dict[str, int] = defaultdict(int)
+        for name in set(query_ingredients):
+            for recipe_id in self._postings.get(name, ()):
+                counts[recipe_id] += 1
+        total = max(len(set(query_ingredients)), 1)
+        ranked = sorted(
+            counts.items(),
+            key=lambda item: (-item[1], self._sizes[item[0]] - item[1])
+        )[:limit]
+        return [(recipe_id, count / total) for recipe_id, count in ranked]
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    """여러 순위 목록을 RRF 점수로 결합"""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            scores[item_id] += 1.0 / (k + rank)
+    return scores
+
+def load_ingredient_index(store, path: Optional[str]) -> Optional[IngredientIndex]:
+    """메타데이터 JSONL 파일 또는 전체 조회가 가능한 저장소로 역색인 생성"""
+    try:
+        if path:
+            return IngredientIndex.from_jsonl(path)
+        if hasattr(store, "items"):
+            return IngredientIndex.build(store.items())
+    except Exception as e:
+        logger.error(f"재료 역색인 생성 실패: {e}")
+    logger.warning("재료 역색인이 없어 벡터 후보만으로 lexical 점수를 계산합니다")
+    return None
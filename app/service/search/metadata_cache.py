@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Iterable, Optional
+from app.core import setting
+from app.core.logger import setup_logger
+import json
+import sqlite3
+
+logger = setup_logger(__name__)
+
+class MetadataCache:
+    """레시피 id → 메타데이터 LRU 캐시
+
+    2단계 검색에서 최종 후보의 메타데이터를 저장소에 다시 묻지 않도록 보관한다.
+    disk_path 를 지정하면 sqlite 파일에도 저장해 재시작 후에도 재사용한다.
+    """
+    def __init__(
+        self,
+        max_entries: int = setting.METADATA_CACHE_MAX_ENTRIES,
+        disk_path: Optional[str] = setting.METADATA_CACHE_PATH
+    ):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_path = disk_path
+        self._db = self._open_disk(disk_path) if disk_path else None
+
+    def _open_disk(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("CREATE TABLE IF NOT EXISTS metadata (id TEXT PRIMARY KEY, value TEXT)")
+            db.commit()
+            logger.info(f"메타데이터 디스크 캐시 사용: {path}")
+            return db
+        except sqlite3.Error as e:
+            logger.error(f"메타데이터 디스크 캐시를 열 수 없습니다: {e}")
+            return None
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict]:
+        """캐시에 있는 id 의 메타데이터만 반환"""
+        ids = list(ids)
+        found = {}
+        with self._lock:
+            missing = []
+            for recipe_id in ids:
+                metadata = self._entries.get(recipe_id)
+                if metadata is not None:
+                    self._entries.move_to_end(recipe_id)
+                    found[recipe_id] = metadata
+                else:
+                    missing.append(recipe_id)
+
+            for recipe_id, metadata in self._read_disk(missing).items():
+                found[recipe_id] = metadata
+                self._insert(recipe_id, metadata)
+
+            self.hits += len(found)
+            self.misses += len(ids) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, Dict]):
+        with self._lock:
+            for recipe_id, metadata in items.items():
+                self._insert(recipe_id, metadata)
+            self._write_disk(items)
+
+    def _insert(self, recipe_id: str, metadata: Dict):
+        self._entries.pop(recipe_id, None)
+        self._entries[recipe_id] = metadata
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, ids) -> Dict[str, Dict]:
+        if self._db is None or not ids:
+            return {}
+        try:
+            placeholders = ",".join("?" * len(ids))
+            rows = self._db.execute(
+                f"SELECT id, value FROM metadata WHERE id IN ({placeholders})", list(ids)
+            ).fetchall()
+            return {recipe_id: json.loads(value) for recipe_id, value in rows}
+        except sqlite3.Error as e:
+            logger.error(f"메타데이터 디스크 캐시 조회 오류: {e}")
+            return {}
+
+    def _write_disk(self, items: Dict[str, Dict]):
+        if self._db is None or not items:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO metadata (id, value) VALUES (?, ?)",
+                [(recipe_id, json.dumps(metadata, ensure_ascii=False)) for recipe_id, metadata in items.items()]
+            )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"메타데이터 디스크 캐시 저장 오류: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def reopen(self):
+        """디스크 캐시 연결을 새로 연다 (sqlite 연결은 fork 된 프로세스에서 이어 쓸 수 없음)"""
+        with self._lock:
+            self._db = self._open_disk(self.disk_path) if self.disk_path else None
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,18 +1,56 @@
-from typing import List, Dict
-from app.repositorie.db_connection import DatabaseConnection
+from typing import List, Dict, Optional
+from app.core import setting
+from app.repositorie.vector_store import get_vector_store
 from app.service.preprocess.data_embedding import EmbeddingService
+from app.service.preprocess.embedding_cache import EmbeddingCache
+from app.service.preprocess.embedding_batcher import EmbeddingBatcher
+from app.service.preprocess.ingredient import ingredient_normalizer
+from app.service.search.metadata_cache import MetadataCache
+from app.service.search.lexical import (
+    IngredientIndex, ingredient_coverage, load_ingredient_index,
+    recipe_ingredient_names, reciprocal_rank_fusion
+)
+from app.core.container import container
 from app.core.logger import setup_logger
 from app.core.exception import AppException
-import gc
+from app.core.metrics import record_cache
+import asyncio
 
 logger = setup_logger(__name__)
 
 class RecipeSearchService:
-    def __init__(self, embedding_service: EmbeddingService = None):
+    def __init__(
+            self, 
+            embedding_service: EmbeddingService = None,
+            embedding_cache: Optional[EmbeddingCache] = None
+        ):
         self.embedding_service = embedding_service or EmbeddingService()
+        if embedding_cache is None and setting.EMBEDDING_CACHE_ENABLED:
+            embedding_cache = EmbeddingCache()
+        self.embedding_cache = embedding_cache
+        self.embedding_batcher = (
+            EmbeddingBatcher(self.embedding_service) if setting.EMBEDDING_BATCH_ENABLED else None
+        )
+        self.mode = setting.SEARCH_MODE
+        self.ingredient_index: Optional[IngredientIndex] = None
+        # 2단계 검색: id/점수만 넉넉히 가져와 순위를 정한 뒤 최종 후보의 메타데이터만 채운다
+        self.two_phase = setting.SEARCH_TWO_PHASE
+        self.metadata_cache = MetadataCache() if self.two_phase else None
 
-    async def search_recipes_by_text(self, query: str, top_k: int = 100) -> List[Dict]:
-        """텍스트 쿼리로 레시피 검색"""
+    def prepare(self):
+        """hybrid 모드에서 재료 역색인을 미리 생성 (서버 시작 시 호출)"""
+        if self.mode == "hybrid" and self.ingredient_index is None:
+            self.ingredient_index = load_ingredient_index(
+                get_vector_store(), setting.HYBRID_METADATA_PATH
+            )
+
+    async def search_recipes_by_text(
+            self, 
+            query: str, 
+            top_k: int = 100,
+            query_embedding: Optional[List[float]] = None
+        ) -> List[Dict]:
+        """텍스트 쿼리로 레시피 검색 (이미 계산한 임베딩이 있으면 재사용)"""
         try:
             # 쿼리 전처리
             query_ingredients = self._preprocess_query(query)
@@ -21,7 +59,8 @@ class RecipeSearchService:
             logger.debug(f"임베딩할 텍스트: {query_text}")
             
             # 쿼리 임베딩
-            query_embedding = self.embedding_service.embed_query(query_text)
+            if query_embedding is None:
+                query_embedding = await self._embed_query(query_ingredients, query_text)
             logger.debug(f"임베딩 벡터 길이: {len(query_embedding)}")
             
             return await self._search_recipes(query_embedding, query_ingredients, top_k)
@@ -30,37 +69,194 @@ class RecipeSearchService:
             logger.error(f"레시피 검색 중 오류 발생: {e}")
             raise AppException("Recipe search error", status_code=500)
 
+    async def embed_query(self, query: str) -> List[float]:
+        """텍스트 쿼리를 전처리 후 임베딩 (캐시 사용)"""
+        try:
+            query_ingredients = self._preprocess_query(query)
+            return await self._embed_query(query_ingredients, " ".join(query_ingredients))
+        except Exception as e:
+            logger.error(f"쿼리 임베딩 중 오류 발생: {e}")
+            raise AppException("Query embedding error", status_code=500)
+
+    async def embed_text(self, text: str) -> List[float]:
+        """전처리 없이 텍스트 그대로 임베딩 (재료명만 쓰는 쿼리 임베딩 캐시는 사용하지 않음)"""
+        try:
+            return await self._compute_embedding(text)
+        except Exception as e:
+            logger.error(f"텍스트 임베딩 중 오류 발생: {e}")
+            raise AppException("Query embedding error", status_code=500)
+
+    async def _embed_query(self, query_ingredients: List[str], query_text: str) -> List[float]:
+        """캐시를 먼저 확인하고 없으면 임베딩 후 캐시에 저장"""
+        if self.embedding_cache is None:
+            return await self._compute_embedding(query_text)
+
+        key = EmbeddingCache.make_key(query_ingredients)
+        cached = self.embedding_cache.get(key)
+        record_cache("embedding", cached is not None)
+        if cached is not None:
+            logger.debug(f"임베딩 캐시 적중: {key}")
+            return cached.tolist()
+
+        query_embedding = await self._compute_embedding(query_text)
+        self.embedding_cache.put(key, query_embedding)
+        return query_embedding
+
+    async def _compute_embedding(self, query_text: str) -> List[float]:
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed_query(query_text)
+        return await self.embedding_service.aembed_query(query_text)
+
     def _preprocess_query(self, query: str) -> List[str]:
-        """쿼리 전처리"""
-        if "," not in query:
-            return [query.strip()]
-        return [ingredient.strip() for ingredient in query.split(",")]
+        """쿼리 전처리 (수량/단위 제거, 별칭 통일, 중복 제거, 순서 정규화)"""
+        # 같은 재료 조합은 입력 순서/표기와 관계없이 같은 임베딩/캐시 키를 갖는다
+        return ingredient_normalizer.query_terms(query)
 
     async def _search_recipes(self, query_embedding: List[float], query_ingredients: List[str], top_k: int) -> List[Dict]:
         """임베딩 벡터로 레시피 검색"""
-        db = DatabaseConnection()
-        logger.info(f"=== 검색 시작 ===")
+        db = get_vector_store()
+        logger.info(f"=== 검색 시작 (모드: {self.mode}) ===")
 
         try:
-            # 먼저 500개 검색
-            results = db.query(
-                vector=query_embedding,
-                top_k=500  # 더 많은 결과를 가져옵니다
-            )
+            if self.mode == "hybrid":
+                matches = await self._hybrid_matches(db, query_embedding, query_ingredients, top_k)
+            else:
+                # 필터가 없으면 먼저 500개 검색, 필터를 저장소에 넘길 때는 좁은 후보만 조회
+                matches = await asyncio.to_thread(
+                    self._vector_matches, db, query_embedding, query_ingredients, top_k, setting.DEFAULT_TOP_K
+                )
+                if self.two_phase:
+                    matches = sorted(matches, key=lambda x: x['score'], reverse=True)[:top_k]
+                    metadata_by_id = await self._hydrate(db, [match["id"] for match in matches])
+                    matches = [
+                        {"id": match["id"], "score": match["score"], "metadata": metadata_by_id[match["id"]]}
+                        for match in matches if match["id"] in metadata_by_id
+                    ]
 
-            if not results["matches"]:
+            if not matches:
                 logger.warning("검색 결과가 없습니다.")
                 return []
 
-            logger.info(f"총 매치 수: {len(results['matches'])}")
-            # 상위 100개만 포맷팅하여 반환
-            return self._format_results(results["matches"], limit=100)
+            logger.info(f"총 매치 수: {len(matches)}")
+            # 상위 top_k개만 포맷팅하여 반환
+            return self._format_results(matches, limit=top_k)
 
         except Exception as e:
             logger.error(f"데이터베이스 검색 중 오류 발생: {e}")
             raise AppException("Database search error", status_code=503)
-        finally:
-            self._cleanup_db_connection(db)
+
+    def _metadata_filter(self, query_ingredients: List[str]) -> Optional[Dict]:
+        """사용자 재료를 하나 이상 포함한 레시피만 검색하도록 저장소에 필터 전달
+
+        대표 재료명은 적재 파이프라인이 쓰는 ingredient_names 필드에만 있다 (기존 인덱스의 ingredients 는 원문).
+        """
+        if not setting.SEARCH_METADATA_FILTER or not query_ingredients:
+            return None
+        return {"ingredient_names": {"$in": query_ingredients}}
+
+    def _vector_matches(
+            self,
+            db,
+            query_embedding: List[float],
+            query_ingredients: List[str],
+            top_k: int,
+            unfiltered_top_k: int
+        ) -> List[Dict]:
+        """벡터 후보 조회 (필터 결과가 top_k 보다 적으면 필터 없이 조회한 후보로 채운다)"""
+        include_metadata = not self.two_phase
+        metadata_filter = self._metadata_filter(query_ingredients)
+        if metadata_filter is None:
+            return db.query(
+                vector=query_embedding, top_k=unfiltered_top_k, include_metadata=include_metadata
+            )["matches"]
+
+        matches = db.query(
+            vector=query_embedding,
+            top_k=max(setting.HYBRID_VECTOR_TOP_K, top_k),
+            include_metadata=include_metadata,
+            filter=metadata_filter
+        )["matches"]
+        if len(matches) < top_k:
+            logger.warning(
+                f"메타데이터 필터 결과가 {len(matches)}개뿐이라 필터 없이 보충합니다 "
+                "(ingredient_names 필드가 없는 인덱스는 다시 적재해야 합니다)"
+            )
+            seen = {match["id"] for match in matches}
+            unfiltered = db.query(
+                vector=query_embedding, top_k=unfiltered_top_k, include_metadata=include_metadata
+            )["matches"]
+            matches = matches + [match for match in unfiltered if match["id"] not in seen]
+        return matches
+
+    async def _hybrid_matches(
+            self, 
+            db, 
+            query_embedding: List[float], 
+            query_ingredients: List[str], 
+            top_k: int
+        ) -> List[Dict]:
+        """벡터 유사도 순위와 재료 coverage 순위를 RRF 로 결합"""
+        vector_matches = await asyncio.to_thread(
+            self._vector_matches, db, query_embedding, query_ingredients, top_k, setting.HYBRID_VECTOR_TOP_K
+        )
+        vector_ranking = [match["id"] for match in vector_matches]
+        metadata_by_id = {} if self.two_phase else {
+            match["id"]: match["metadata"] for match in vector_matches
+        }
+
+        if self.ingredient_index is None and self.two_phase:
+            # 역색인이 없으면 재료 coverage 계산을 위해 벡터 후보의 메타데이터가 필요하다
+            metadata_by_id = await self._hydrate(db, vector_ranking)
+
+        if self.ingredient_index is not None:
+            lexical = self.ingredient_index.search(query_ingredients, setting.HYBRID_LEXICAL_TOP_K)
+        else:
+            # 역색인이 없으면 벡터 후보의 재료 coverage 로 순위를 매긴다
+            lexical = sorted(
+                (
+                    (recipe_id, ingredient_coverage(query_ingredients, recipe_ingredient_names(metadata)))
+                    for recipe_id, metadata in metadata_by_id.items()
+                ),
+                key=lambda item: item[1],
+                reverse=True
+            )
+        lexical_ranking = [recipe_id for recipe_id, coverage in lexical if coverage > 0]
+
+        fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking], k=setting.HYBRID_RRF_K)
+        selected = sorted(fused, key=fused.get, reverse=True)[:top_k]
+
+        # 메타데이터가 없는 최종 후보(역색인에서만 나온 후보, 2단계 검색의 후보)만 조회
+        missing = [recipe_id for recipe_id in selected if recipe_id not in metadata_by_id]
+        if missing:
+            metadata_by_id.update(await self._hydrate(db, missing))
+
+        logger.info(
+            f"hybrid 검색: 벡터 후보 {len(vector_ranking)}개, 재료 후보 {len(lexical_ranking)}개, "
+            f"추가 조회 {len(missing)}개"
+        )
+        return [
+            {"id": recipe_id, "score": fused[recipe_id], "metadata": metadata_by_id[recipe_id]}
+            for recipe_id in selected if recipe_id in metadata_by_id
+        ]
+
+    async def _hydrate(self, db, ids: List[str]) -> Dict[str, Dict]:
+        """메타데이터 캐시를 먼저 확인하고 없는 id 만 저장소에서 묶어서 조회"""
+        if not ids:
+            return {}
+        cache = self.metadata_cache
+        found = cache.get_many(ids) if cache is not None else {}
+        missing = [recipe_id for recipe_id in ids if recipe_id not in found]
+        if cache is not None:
+            record_cache("metadata", True, len(ids) - len(missing))
+            record_cache("metadata", False, len(missing))
+        batch_size = setting.METADATA_FETCH_BATCH_SIZE
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        for fetched in await asyncio.gather(*(asyncio.to_thread(db.fetch, batch) for batch in batches)):
+            found.update(fetched)
+            if cache is not None:
+                cache.put_many(fetched)
+        logger.info(f"메타데이터 조회: {len(ids)}개 중 캐시 {len(ids) - len(missing)}개, 저장소 {len(missing)}개")
+        return found
 
     def _format_results(self, matches: List[Dict], limit: int = 100) -> List[Dict]:
         """검색 결과 포맷팅"""
@@ -80,11 +276,5 @@ class RecipeSearchService:
         logger.info(f"검색 결과 수: {len(formatted_results)}")
         return formatted_results
 
-    def _cleanup_db_connection(self, db: DatabaseConnection):
-        """데이터베이스 연결 정리"""
-        db._unload_connection()
-        del db
-        gc.collect()
-
-# 전역 검색 서비스 인스턴스
-search_service = RecipeSearchService()
+# 전역 검색 서비스 인스턴스 (처음 사용할 때 생성)
+search_service = container.lazy("search_service", RecipeSearchService)
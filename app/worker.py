@@ -0,0 +1,391 @@
+"""멀티 프로세스 워커 모드
+
+부모 프로세스가 임베딩 모델을 한 번 로드한 뒤 워커 프로세스를 fork 한다. 가중치는 fork 이후 수정되지 않으므로
+모든 워커가 copy-on-write 로 같은 물리 메모리를 공유하고, RabbitMQ 연결/채널은 워커마다 따로 연다.
+부모 프로세스는 워커를 감시해(종료 코드, heartbeat) 백오프를 두고 재시작하며,
+SIGTERM/SIGINT 에는 처리 중인 메시지를 마무리한 뒤 종료하고 SIGHUP 에는 워커를 하나씩 교체한다.
+
+사용 예:
+    python -m app.worker --workers 4
+    curl localhost:8001/health   # 워커별 상태, 메모리(RSS/PSS)
+    kill -HUP <부모 pid>          # 워커 순차 재시작
+"""
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from multiprocessing.process import BaseProcess
+from typing import Dict, List, Optional
+from app.core import setting
+from app.core.container import container
+from app.core.logger import setup_logger
+from app.pipeline import start_pipeline, stop_pipeline
+from app.service.preprocess.data_embedding import EmbeddingService, ModelResidency
+from app.service.preprocess.embedding_backend import EmbeddingBackend, configure_threads
+from app.service.search.search import search_service
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+
+logger = setup_logger(__name__)
+
+def preload_model() -> bool:
+    """fork 전에 부모 프로세스에서 임베딩 모델을 로드 (공유할 수 없는 백엔드면 False)"""
+    service = EmbeddingService()
+    if service.backend not in (EmbeddingBackend.TORCH, EmbeddingBackend.TORCH_INT8):
+        # ONNX Runtime 세션의 스레드 풀은 fork 후 자식 프로세스에서 동작하지 않는다
+        logger.warning(f"{service.backend.value} 백엔드는 fork 후 공유할 수 없어 워커마다 모델을 로드합니다")
+        return False
+    if service.residency != ModelResidency.RESIDENT:
+        # 워커가 모델을 언로드했다가 다시 로드하면 공유가 깨지고 워커마다 사본이 생긴다
+        logger.warning(f"공유 모델은 언로드하지 않도록 상주 정책을 {service.residency.value} 에서 resident 로 바꿉니다")
+        service.residency = ModelResidency.RESIDENT
+
+    # 부모에서 OpenMP 스레드 풀이 만들어지면 fork 된 워커의 torch 연산이 멈출 수 있으므로 단일 스레드로 로드
+    service.num_threads = 1
+    configure_threads(1)
+    service.load()
+    # 이후 GC 가 부모에서 만든 객체 헤더를 건드려 공유 페이지가 복사되지 않도록 고정
+    gc.collect()
+    gc.freeze()
+    return True
+
+def memory_usage(pid: int) -> Dict[str, float]:
+    """프로세스 메모리(MB): rss 와 공유 페이지를 나눠 계산한 pss (Linux 가 아니면 빈 dict)"""
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty"):
+                    usage[name.lower()] = round(int(value.split()[0]) / 1024, 1)
+    except (OSError, ValueError):
+        return {}
+    return usage
+
+@dataclass
+class _Worker:
+    index: int
+    process: Optional[BaseProcess] = None
+    started_at: float = 0.0
+    restart_at: float = 0.0      # 다음 재시작 예정 시각
+    failures: int = 0            # 연속 비정상 종료 횟수
+    restarts: int = 0
+    kill_at: float = 0.0         # 종료 요청 후 강제 종료할 시각 (0이면 종료 요청 없음)
+    retiring: bool = False       # 순차 재시작으로 종료 중
+
+class WorkerSupervisor:
+    """워커 프로세스 실행, 상태 감시, 재시작"""
+    TICK = 1.0  # 감시 주기(초)
+    UNHEALTHY_GRACE = 10.0  # 응답 없는 워커에 SIGTERM 후 SIGKILL 까지 기다리는 시간(초)
+
+    def __init__(self, processes: int, num_threads: int, health_port: int = 0, shared_model: bool = False):
+        self.num_threads = num_threads
+        self.health_port = health_port
+        self.shared_model = shared_model
+        self._context = multiprocessing.get_context("fork")
+        # 워커가 마지막으로 heartbeat 를 보낸 시각 (time.monotonic, 0이면 아직 준비 전)
+        self._heartbeats = self._context.Array("d", processes, lock=False)
+        self._workers = [_Worker(index) for index in range(processes)]
+        self._stopping = False
+        self._reload = False
+        self._rolling: List[int] = []
+        self._reload_started = 0.0
+        self._server: Optional[HTTPServer] = None
+
+    # 워커 프로세스
+
+    def _run_worker(self, index: int):
+        """fork 된 워커 프로세스의 진입점"""
+        # 부모의 시그널 핸들러를 물려받으므로 기본값으로 되돌린다 (루프 시작 후 정상 종료 핸들러로 교체)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        if self._server is not None:
+            self._server.socket.close()
+
+        configure_threads(self.num_threads)
+        EmbeddingService().num_threads = self.num_threads
+        # 부모에서 만든 sqlite 연결은 fork 된 프로세스에서 이어 쓸 수 없으므로 다시 연다
+        if container.is_initialized("search_service"):
+            if search_service.embedding_cache is not None:
+                search_service.embedding_cache.reopen()
+            if search_service.metadata_cache is not None:
+                search_service.metadata_cache.reopen()
+
+        try:
+            code = asyncio.run(self._serve(index))
+        except Exception as e:
+            logger.error(f"워커 {index} 오류로 종료: {e}")
+            code = 1
+        sys.exit(code)
+
+    async def _serve(self, index: int) -> int:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+        listener_task = None
+        try:
+            listener_task = await start_pipeline()
+            logger.info(f"워커 {index} 시작 (pid {os.getpid()}, 추론 스레드 {self.num_threads})")
+            while not stop.is_set():
+                if listener_task.done():
+                    logger.error(f"워커 {index} 의 리스너가 중단되었습니다")
+                    return 1
+                # 이벤트 루프가 막히면 heartbeat 가 끊겨 부모가 재시작한다
+                self._heartbeats[index] = time.monotonic()
+                try:
+                    await asyncio.wait_for(stop.wait(), setting.WORKER_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            logger.info(f"워커 {index} 종료 요청 수신, 처리 중인 메시지를 마무리합니다")
+            return 0
+        finally:
+            await stop_pipeline(listener_task)
+
+    # 감시
+
+    def _spawn(self, worker: _Worker):
+        self._heartbeats[worker.index] = 0.0
+        process = self._context.Process(
+            target=self._run_worker, args=(worker.index,), name=f"worker-{worker.index}"
+        )
+        process.start()
+        if worker.started_at:
+            worker.restarts += 1
+        worker.process = process
+        worker.started_at = time.monotonic()
+        worker.restart_at = 0.0
+        worker.kill_at = 0.0
+        logger.info(f"워커 {worker.index} 실행 (pid {process.pid})")
+
+    def _terminate(self, worker: _Worker, reason: str, grace: float, retiring: bool = False):
+        """SIGTERM 으로 정상 종료를 요청하고 grace 초 뒤에도 살아 있으면 강제 종료"""
+        if worker.process is None or worker.kill_at:
+            return
+        log = logger.info if retiring or self._stopping else logger.warning
+        log(f"워커 {worker.index} (pid {worker.process.pid}) 종료 요청: {reason}")
+        worker.process.terminate()
+        worker.kill_at = time.monotonic() + grace
+        worker.retiring = retiring
+
+    def _reap(self, worker: _Worker, now: float):
+        process = worker.process
+        process.join()
+        _mark_process_dead(process.pid)
+        worker.process = None
+        worker.kill_at = 0.0
+        if self._stopping:
+            return
+        if worker.retiring:
+            worker.retiring = False
+            worker.failures = 0
+            worker.restart_at = now
+            return
+
+        # 충분히 오래 동작했던 워커면 연속 실패 횟수를 초기화
+        if now - worker.started_at >= setting.WORKER_HEARTBEAT_TIMEOUT:
+            worker.failures = 0
+        worker.failures += 1
+        delay = min(2 ** (worker.failures - 1), setting.WORKER_RESTART_MAX_DELAY)
+        worker.restart_at = now + delay
+        logger.warning(
+            f"워커 {worker.index} (pid {process.pid}) 종료 (exit code {process.exitcode}), {delay:.0f}초 후 재시작"
+        )
+
+    def _check(self, worker: _Worker, now: float):
+        process = worker.process
+        if process is not None and not process.is_alive():
+            self._reap(worker, now)
+        elif process is not None:
+            heartbeat = self._heartbeats[worker.index]
+            if worker.kill_at:
+                if now >= worker.kill_at:
+                    logger.error(f"워커 {worker.index} (pid {process.pid}) 가 종료되지 않아 강제 종료합니다")
+                    process.kill()
+            elif not heartbeat and now - worker.started_at > setting.WORKER_STARTUP_TIMEOUT:
+                self._terminate(worker, "시작 시간 초과", self.UNHEALTHY_GRACE)
+            elif heartbeat and now - heartbeat > setting.WORKER_HEARTBEAT_TIMEOUT:
+                self._terminate(worker, f"{now - heartbeat:.0f}초 동안 heartbeat 없음", self.UNHEALTHY_GRACE)
+
+        if worker.process is None and not self._stopping and now >= worker.restart_at:
+            self._spawn(worker)
+
+    def _advance_rolling_restart(self):
+        """순차 재시작: 한 워커를 정상 종료시키고 새 워커가 준비되면 다음 워커로 넘어간다"""
+        if not self._rolling:
+            return
+        worker = self._workers[self._rolling[0]]
+        if worker.process is None or worker.kill_at:
+            return
+        if worker.started_at < self._reload_started:
+            self._terminate(
+                worker, "순차 재시작", setting.LISTENER_DRAIN_TIMEOUT + self.UNHEALTHY_GRACE, retiring=True
+            )
+        elif self._heartbeats[worker.index]:
+            self._rolling.pop(0)
+            if not self._rolling:
+                logger.info("워커 순차 재시작 완료")
+
+    def _is_ready(self, worker: _Worker) -> bool:
+        return worker.process is not None and not worker.kill_at and self._heartbeats[worker.index] > 0
+
+    def status(self) -> Dict:
+        """워커별 상태와 메모리 사용량"""
+        now = time.monotonic()
+        workers = []
+        for worker in self._workers:
+            heartbeat = self._heartbeats[worker.index]
+            pid = worker.process.pid if worker.process is not None else None
+            workers.append({
+                "index": worker.index,
+                "pid": pid,
+                "ready": self._is_ready(worker),
+                "heartbeat_age": round(now - heartbeat, 1) if heartbeat else None,
+                "uptime": round(now - worker.started_at, 1) if pid else None,
+                "restarts": worker.restarts,
+                "memory_mb": memory_usage(pid) if pid else {},
+            })
+        return {
+            "healthy": all(worker["ready"] for worker in workers),
+            "shared_model": self.shared_model,
+            "parent_memory_mb": memory_usage(os.getpid()),
+            "workers": workers,
+        }
+
+    # 부모 프로세스
+
+    def _on_stop(self, signum, frame):
+        self._stopping = True
+
+    def _on_reload(self, signum, frame):
+        self._reload = True
+
+    def _start_health_server(self) -> Optional[HTTPServer]:
+        if not self.health_port:
+            return None
+        supervisor = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            timeout = 5  # 느린 클라이언트가 감시 루프를 오래 막지 않도록
+
+            def do_GET(self):
+                if self.path == "/health":
+                    status = supervisor.status()
+                    self._send(200 if status["healthy"] else 503, "application/json",
+                               json.dumps(status, ensure_ascii=False).encode())
+                elif self.path == "/metrics":
+                    body, content_type = _collect_metrics()
+                    if body is None:
+                        self._send(404, "text/plain", b"PROMETHEUS_MULTIPROC_DIR is not set")
+                    else:
+                        self._send(200, content_type, body)
+                else:
+                    self._send(404, "text/plain", b"not found")
+
+            def _send(self, code: int, content_type: str, body: bytes):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = HTTPServer(("0.0.0.0", self.health_port), HealthHandler)
+        # 감시 루프가 스레드 없이 요청 처리와 대기를 함께 하도록 (스레드가 있는 프로세스의 fork 는 안전하지 않음)
+        server.timeout = self.TICK
+        logger.info(f"워커 상태 확인: http://0.0.0.0:{self.health_port}/health")
+        return server
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        self._server = self._start_health_server()
+        logger.info(f"워커 {len(self._workers)}개 시작 (모델 공유: {self.shared_model})")
+        try:
+            for worker in self._workers:
+                self._spawn(worker)
+            while not self._stopping:
+                if self._server is not None:
+                    self._server.handle_request()
+                else:
+                    time.sleep(self.TICK)
+                if self._reload:
+                    self._reload = False
+                    if not self._rolling:
+                        logger.info("워커 순차 재시작 시작")
+                        self._reload_started = time.monotonic()
+                        self._rolling = [worker.index for worker in self._workers]
+                now = time.monotonic()
+                for worker in self._workers:
+                    self._check(worker, now)
+                self._advance_rolling_restart()
+        finally:
+            self._shutdown()
+            if self._server is not None:
+                self._server.server_close()
+        return 0
+
+    def _shutdown(self):
+        """모든 워커에 정상 종료를 요청하고 처리 중인 메시지가 끝나기를 기다린다"""
+        self._stopping = True
+        logger.info("워커 종료 중...")
+        for worker in self._workers:
+            self._terminate(worker, "서버 종료", setting.LISTENER_DRAIN_TIMEOUT + self.UNHEALTHY_GRACE)
+        while any(worker.process is not None for worker in self._workers):
+            now = time.monotonic()
+            for worker in self._workers:
+                if worker.process is not None:
+                    self._check(worker, now)
+            time.sleep(0.1)
+        logger.info("모든 워커 종료 완료")
+
+def _mark_process_dead(pid: int):
+    """prometheus 멀티 프로세스 모드에서 종료된 워커의 gauge 파일 정리"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(pid)
+
+def _collect_metrics():
+    """모든 워커의 메트릭을 합친 Prometheus 응답 (PROMETHEUS_MULTIPROC_DIR 이 없으면 (None, None))"""
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return None, None
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="임베딩 모델을 공유하는 여러 워커 프로세스로 메시지를 처리합니다.")
+    parser.add_argument("--workers", type=int, default=setting.WORKER_PROCESSES, help="워커 수 (0이면 CPU 코어 수)")
+    parser.add_argument("--threads", type=int, default=setting.EMBEDDING_NUM_THREADS,
+                        help="워커당 추론 스레드 수 (0이면 코어 수를 워커 수로 나눈 값)")
+    parser.add_argument("--no-preload", action="store_true", help="부모에서 모델을 로드하지 않고 워커마다 로드")
+    parser.add_argument("--health-port", type=int, default=setting.WORKER_HEALTH_PORT)
+    args = parser.parse_args(argv)
+
+    cpus = os.cpu_count() or 1
+    processes = args.workers if args.workers > 0 else cpus
+    # 워커들이 코어를 나눠 쓰도록 해 스레드 과다 경쟁을 막는다
+    threads = args.threads if args.threads > 0 else max(1, cpus // processes)
+
+    shared_model = False
+    if setting.WORKER_PRELOAD_MODEL and not args.no_preload:
+        shared_model = preload_model()
+        # 서비스 모듈은 처음 사용할 때 불러오므로 라이브러리 코드도 워커들이 공유하도록 fork 전에 불러온다
+        import langchain_openai  # noqa: F401
+    return WorkerSupervisor(processes, threads, args.health_port, shared_model).run()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
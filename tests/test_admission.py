@@ -0,0 +1,109 @@
+import asyncio
+import json
+import time
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import recommend as api
+from app.api.recommend import AdmissionControl
+from app.core.exception import AppException, DeadlineExceededException, InvalidMessageException, OverloadedException
+from app.service.listen.deadline import Deadline
+
+def _deadline(seconds: float = 5.0) -> Deadline:
+    return Deadline(time.time() + seconds)
+
+def test_release_is_idempotent():
+    async def main():
+        admission = AdmissionControl(max_concurrency=1, max_waiting=0)
+        release = await admission.acquire(_deadline())
+        release()
+        release()
+        # 두 번 반납해도 슬롯은 하나뿐이다
+        await admission.acquire(_deadline())
+        return admission
+
+    admission = asyncio.run(main())
+
+    assert admission._slots.locked()
+
+def test_rejects_when_waiting_queue_is_full():
+    async def main():
+        admission = AdmissionControl(max_concurrency=1, max_waiting=1)
+        release = await admission.acquire(_deadline())
+        waiter = asyncio.create_task(admission.acquire(_deadline()))
+        await asyncio.sleep(0)
+        assert admission.waiting == 1
+        with pytest.raises(OverloadedException):
+            await admission.acquire(_deadline())
+        release()
+        (await waiter)()
+        return admission
+
+    admission = asyncio.run(main())
+
+    assert admission.waiting == 0
+    assert not admission._slots.locked()
+
+def test_waiting_request_expires_with_deadline():
+    async def main():
+        admission = AdmissionControl(max_concurrency=1, max_waiting=4)
+        await admission.acquire(_deadline())
+        with pytest.raises(DeadlineExceededException) as error:
+            await admission.acquire(_deadline(0.05))
+        return admission, error.value
+
+    admission, error = asyncio.run(main())
+
+    assert error.stage == "admission"
+    assert admission.waiting == 0
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, "admission", AdmissionControl(max_concurrency=1, max_waiting=0))
+    app = FastAPI()
+    app.include_router(api.router)
+    return TestClient(app)
+
+def _events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+BODY = json.dumps([{"ingredients": "양파", "quantities": "1개"}])
+
+def test_stream_sends_recipes_then_complete_and_releases_slot(client, monkeypatch):
+    async def fake_stream(ingredients_data, deadline):
+        yield "recipe", {"이름": "양파볶음"}
+        yield "complete", {api.RECIPES_KEY: [{"이름": "양파볶음"}]}
+
+    monkeypatch.setattr(api, "stream_recommendation", fake_stream)
+
+    response = client.post("/recommend/stream", content=BODY)
+
+    assert response.status_code == 200
+    assert [event for event, _ in _events(response.text)] == ["recipe", "complete"]
+    assert not api.admission._slots.locked()
+
+def test_stream_error_is_sent_as_event(client, monkeypatch):
+    async def failing_stream(ingredients_data, deadline):
+        yield "recipe", {"이름": "양파볶음"}
+        raise AppException("LLM Generate Error", status_code=503)
+
+    monkeypatch.setattr(api, "stream_recommendation", failing_stream)
+
+    response = client.post("/recommend/stream", content=BODY)
+
+    assert [event for event, _ in _events(response.text)] == ["recipe", "error"]
+    assert not api.admission._slots.locked()
+
+def test_invalid_request_is_rejected_before_admission(client):
+    # 상태 코드 변환은 app.main 의 예외 처리기가 맡는다
+    with pytest.raises(InvalidMessageException):
+        client.post("/recommend", content=b"[]")
+
+    assert not api.admission._slots.locked()
@@ -0,0 +1,69 @@
+import gzip
+import json
+import zlib
+import pytest
+from app.core.exception import InvalidMessageException
+from app.service.llm.codec import compress, decode_request, encode_response
+
+INGREDIENTS = [{"ingredients": "양파", "quantities": "1개"}, {"ingredients": "달걀", "quantities": "2개"}]
+BODY = json.dumps(INGREDIENTS, ensure_ascii=False).encode()
+
+@pytest.mark.parametrize("content_encoding", [None, "", "utf-8", "identity"])
+def test_decode_plain_body(content_encoding):
+    assert decode_request(BODY, content_encoding) == INGREDIENTS
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_compress_round_trip(encoding):
+    body, content_encoding = compress(BODY, encoding, min_bytes=1)
+
+    assert content_encoding == encoding
+    assert decode_request(body, content_encoding) == INGREDIENTS
+
+def test_small_body_is_not_compressed():
+    assert compress(BODY, "gzip", min_bytes=len(BODY) + 1) == (BODY, None)
+    assert compress(BODY, "none", min_bytes=1) == (BODY, None)
+
+def test_unknown_compression_setting_is_rejected():
+    with pytest.raises(ValueError):
+        compress(BODY, "brotli", min_bytes=1)
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"[]",
+    b'{"ingredients": "\xec\x96\x91\xed\x8c\x8c"}',
+    b'[{"ingredients": "\xec\x96\x91\xed\x8c\x8c"}]',
+])
+def test_invalid_body_is_rejected(body):
+    with pytest.raises(InvalidMessageException) as error:
+        decode_request(body)
+
+    assert error.value.status_code == 400
+
+def test_plain_body_over_limit_is_rejected():
+    with pytest.raises(InvalidMessageException):
+        decode_request(BODY, max_bytes=len(BODY) - 1)
+
+def test_decompression_bomb_is_rejected():
+    # 1KB 남짓한 gzip 본문이 풀면 1MB 가 된다
+    bomb = gzip.compress(b"[" + b" " * (1024 * 1024) + b"]")
+    assert len(bomb) < 2048
+
+    with pytest.raises(InvalidMessageException):
+        decode_request(bomb, "gzip", max_bytes=64 * 1024)
+
+def test_decompressed_size_limit_is_inclusive():
+    body = gzip.compress(BODY)
+
+    assert decode_request(body, "gzip", max_bytes=len(BODY)) == INGREDIENTS
+
+def test_corrupt_or_unknown_encoding_is_rejected():
+    with pytest.raises(InvalidMessageException):
+        decode_request(b"not deflate", "deflate")
+    with pytest.raises(InvalidMessageException):
+        decode_request(zlib.compress(BODY), "br")
+
+def test_encode_response_keeps_korean_unescaped():
+    encoded = encode_response({"레시피 목록": [{"이름": "양파볶음"}]})
+
+    assert "양파볶음".encode() in encoded
+    assert json.loads(encoded) == {"레시피 목록": [{"이름": "양파볶음"}]}
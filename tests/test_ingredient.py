@@ -0,0 +1,75 @@
+import pytest
+from app.service.preprocess.ingredient import IngredientNormalizer
+
+@pytest.fixture(scope="module")
+def normalizer():
+    return IngredientNormalizer()
+
+@pytest.mark.parametrize("text, name, quantity, unit", [
+    ("달걀 2개", "달걀", 2.0, "개"),
+    ("두부 1/2모", "두부", 0.5, "모"),
+    ("대파 1~2대", "대파", 1.0, "대"),
+    ("양파 반 개", "양파", 0.5, "개"),
+    ("한 줌 시금치", "시금치", 1.0, "줌"),
+    ("두부 반모", "두부", 0.5, "모"),
+    ("간장 2T", "간장", 2.0, "큰술"),
+    ("1 tsp 소금", "소금", 1.0, "작은술"),
+    ("2 tbsp 진간장", "간장", 2.0, "큰술"),
+    ("1 cup 우유", "우유", 1.0, "컵"),
+    ("우유 200 ml", "우유", 200.0, "ml"),
+    ("다진 마늘(국산) 1큰술", "마늘", 1.0, "큰술"),
+])
+def test_parse_quantity_and_unit(normalizer, text, name, quantity, unit):
+    parsed = normalizer.parse(text)
+
+    assert (parsed.name, parsed.quantity, parsed.unit) == (name, quantity, unit)
+
+@pytest.mark.parametrize("text, name", [
+    ("네모 어묵", "네모어묵"),
+    ("세모 김밥", "세모김밥"),
+    ("두부", "두부"),
+])
+def test_number_words_inside_names_are_not_quantities(normalizer, text, name):
+    parsed = normalizer.parse(text)
+
+    assert parsed.name == name
+    assert parsed.quantity is None
+
+@pytest.mark.parametrize("text, name, amount", [
+    ("소금 약간", "소금", "약간"),
+    ("소량의 물", "물", "소량"),
+    ("약간의 후춧가루", "후추", "약간"),
+])
+def test_vague_amounts(normalizer, text, name, amount):
+    parsed = normalizer.parse(text)
+
+    assert (parsed.name, parsed.amount) == (name, amount)
+
+@pytest.mark.parametrize("text, name", [
+    ("계란", "달걀"),
+    ("쇠고기", "소고기"),
+    ("국산 쇠고기", "소고기"),
+    ("굵은 고추가루", "고춧가루"),
+    ("파", "대파"),
+    ("양파", "양파"),
+    ("흑설탕", "흑설탕"),
+    ("열무김치", "열무김치"),
+])
+def test_canonical_names(normalizer, text, name):
+    assert normalizer.normalize(text) == name
+
+def test_normalize_amount(normalizer):
+    assert normalizer.normalize_amount("1/2 개") == "0.5개"
+    assert normalizer.normalize_amount("2T") == "2큰술"
+    assert normalizer.normalize_amount("적당히") == "적당히"
+
+def test_keys_ignore_order_and_spelling(normalizer):
+    assert normalizer.cache_key(["계란", "대파", "달걀"]) == normalizer.cache_key(["파", "날달걀"])
+    assert normalizer.query_terms("양파, 계란 2개 / 쇠고기") == ["달걀", "소고기", "양파"]
+
+def test_pair_key_includes_quantities(normalizer):
+    small = [{"ingredients": "계란", "quantities": "1개"}]
+    large = [{"ingredients": "달걀", "quantities": "3개"}]
+
+    assert normalizer.pair_key(small) == "달걀:1개"
+    assert normalizer.pair_key(small) != normalizer.pair_key(large)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from app.repositorie.local_store import LocalVectorStore
+from app.repositorie.vector_compression import VectorCompressor
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(LocalVectorStore, "_instance", None)
+    store = LocalVectorStore()
+    store.path = str(tmp_path)
+    store.dimension = 64
+    store.ann = "none"
+    store.compressor = VectorCompressor("pca", 16, "int8")
+    return store
+
+def _vectors(rows: int) -> np.ndarray:
+    return np.random.default_rng(0).normal(size=(rows, 64)).astype(np.float32)
+
+def test_connect_with_compression_on_empty_store(store):
+    store.connect()
+
+    assert store._codes is None
+    assert store.query(_vectors(1)[0].tolist(), top_k=3) == {"matches": []}
+
+def test_codes_are_built_after_first_vectors_arrive(store):
+    store.connect()
+    vectors = _vectors(3)
+    store.upsert([(f"r{i}", vector.tolist(), {"title": f"r{i}"}) for i, vector in enumerate(vectors)])
+
+    matches = store.query(vectors[1].tolist(), top_k=2)["matches"]
+
+    assert matches[0]["id"] == "r1"
+    assert store._codes.shape == (3, 3)  # pca 주성분 수는 행 수로 제한
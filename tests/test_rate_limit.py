@@ -0,0 +1,137 @@
+import asyncio
+import pytest
+from app.service.llm.rate_limit import SingleFlight, TokenBucketLimiter
+
+def test_disabled_limiter_does_not_wait():
+    limiter = TokenBucketLimiter()
+
+    assert not limiter.enabled
+    assert asyncio.run(limiter.acquire(10_000)) == 0.0
+
+def test_token_bucket_waits_for_refill():
+    async def main():
+        # 초당 100 토큰: 버킷을 비운 뒤 10 토큰은 약 0.1초 뒤에 확보된다
+        limiter = TokenBucketLimiter(tokens_per_minute=6000)
+        assert await limiter.acquire(6000) < 0.05
+        return await limiter.acquire(10)
+
+    waited = asyncio.run(main())
+
+    assert 0.05 < waited < 1.0
+
+def test_request_larger_than_bucket_is_capped():
+    limiter = TokenBucketLimiter(tokens_per_minute=100)
+
+    assert asyncio.run(limiter.acquire(1_000_000)) < 0.05
+
+def test_pause_delays_next_request():
+    async def main():
+        limiter = TokenBucketLimiter(requests_per_minute=1000)
+        limiter.pause(0.1)
+        return await limiter.acquire()
+
+    assert asyncio.run(main()) >= 0.09
+
+def test_single_flight_shares_one_call():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do("key", work), flight.do("key", work), flight.do("other", work))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+
+    assert results == [("result", False), ("result", True), ("result", False)]
+    assert calls == 2
+    assert len(flight) == 0
+
+def test_single_flight_shares_exception():
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(flight.do("key", work), flight.do("key", work), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_shared_call_continues_while_another_caller_waits():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await started.wait()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == ("done", True)
+
+def test_call_is_cancelled_when_last_caller_leaves():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+        slots = asyncio.Semaphore(1)
+
+        async def work():
+            # LLM 호출처럼 처리 슬롯을 잡고 오래 기다린다
+            async with slots:
+                started.set()
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+
+        callers = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await started.wait()
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        await asyncio.sleep(0)
+        return flight, slots
+
+    flight, slots = asyncio.run(main())
+
+    assert len(flight) == 0
+    assert not slots.locked()
+
+def test_new_caller_after_cancellation_starts_fresh_call():
+    async def main():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "fresh"
+
+        caller = asyncio.create_task(flight.do("key", slow))
+        await started.wait()
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        return await flight.do("key", fast)
+
+    assert asyncio.run(main()) == ("fresh", False)
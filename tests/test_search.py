@@ -0,0 +1,74 @@
+import pytest
+
+# app.service.search 패키지가 지표 모듈을 함께 불러온다
+pytest.importorskip("prometheus_client")
+
+from app.service.search import search as search_module
+from app.service.search.lexical import IngredientIndex, ingredient_coverage, reciprocal_rank_fusion
+
+def test_ingredient_index_ranks_by_coverage_then_missing_ingredients():
+    index = IngredientIndex.build([
+        ("omelet", {"ingredients": ["계란 2개", "양파 반 개", "소금 약간"]}),
+        ("fried_egg", {"ingredients": ["달걀 1개", "식용유"]}),
+        ("stir_fry", {"ingredients": ["양파", "쇠고기", "간장", "설탕", "마늘"]}),
+        ("empty", {}),
+    ])
+
+    results = index.search(["달걀", "양파"], limit=10)
+
+    assert len(index) == 3
+    assert results[0] == ("omelet", 1.0)
+    assert [recipe_id for recipe_id, _ in results[1:]] == ["fried_egg", "stir_fry"]
+
+def test_ingredient_coverage():
+    assert ingredient_coverage(["달걀", "양파"], {"달걀"}) == 0.5
+    assert ingredient_coverage([], {"달걀"}) == 0.0
+
+def test_reciprocal_rank_fusion_prefers_items_ranked_in_both_lists():
+    scores = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+    assert max(scores, key=scores.get) == "b"
+    assert scores["a"] == pytest.approx(1 / 61)
+
+class _FakeStore:
+    """ingredient_names 필드가 일부 레시피에만 있는 (다시 적재하기 전) 저장소"""
+    def __init__(self):
+        self.queries = []
+
+    def query(self, vector, top_k, include_metadata=True, filter=None):
+        self.queries.append((top_k, filter))
+        matches = [
+            {"id": "new", "score": 0.9, "metadata": {"ingredient_names": ["양파"]}},
+            {"id": "old", "score": 0.8, "metadata": {"ingredients": ["양파 1개"]}},
+        ]
+        if filter is not None:
+            wanted = set(filter["ingredient_names"]["$in"])
+            matches = [m for m in matches if wanted & set(m["metadata"].get("ingredient_names", []))]
+        return {"matches": matches[:top_k]}
+
+def _service(monkeypatch, metadata_filter: bool):
+    monkeypatch.setattr(
+        search_module, "setting",
+        search_module.setting.model_copy(update={"SEARCH_METADATA_FILTER": metadata_filter})
+    )
+    service = object.__new__(search_module.RecipeSearchService)
+    service.two_phase = False
+    return service
+
+def test_metadata_filter_uses_smaller_top_k_and_fills_short_results(monkeypatch):
+    service = _service(monkeypatch, metadata_filter=True)
+    store = _FakeStore()
+
+    matches = service._vector_matches(store, [0.0], ["양파"], top_k=2, unfiltered_top_k=500)
+
+    hybrid_top_k = search_module.setting.HYBRID_VECTOR_TOP_K
+    assert store.queries == [(hybrid_top_k, {"ingredient_names": {"$in": ["양파"]}}), (500, None)]
+    assert [match["id"] for match in matches] == ["new", "old"]
+
+def test_without_metadata_filter_queries_once(monkeypatch):
+    service = _service(monkeypatch, metadata_filter=False)
+    store = _FakeStore()
+
+    service._vector_matches(store, [0.0], ["양파"], top_k=2, unfiltered_top_k=500)
+
+    assert store.queries == [(500, None)]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from app.repositorie.vector_compression import VectorCompressor
+
+def _vectors(rows: int, dimension: int = 64, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(rows, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+@pytest.mark.parametrize("reduction, quantization", [("pca", "none"), ("none", "int8"), ("pca", "int8")])
+def test_fit_on_empty_input_leaves_compressor_unfitted(reduction, quantization):
+    compressor = VectorCompressor(reduction, 16, quantization).fit(np.empty((0, 64), dtype=np.float32))
+
+    assert not compressor.fitted
+    with pytest.raises(ValueError):
+        compressor.encode(_vectors(2))
+
+@pytest.mark.parametrize("reduction, quantization", [("none", "none"), ("truncate", "binary")])
+def test_settings_without_training_are_fitted(reduction, quantization):
+    assert VectorCompressor(reduction, 16, quantization).fitted
+
+def test_pca_with_fewer_rows_than_dimension_clamps_components():
+    vectors = _vectors(10)
+    compressor = VectorCompressor("pca", 256, "int8").fit(vectors)
+    codes = compressor.encode(vectors)
+
+    assert compressor.output_dimension(64) == 10
+    assert codes.shape == (10, 10)
+    assert compressor.bytes_per_vector(64) == 10.0
+    assert compressor.params["dimension"] == 256  # 저장된 코드와 비교하는 설정 값은 그대로
+
+def test_truncate_is_clamped_to_source_dimension():
+    compressor = VectorCompressor("truncate", 256, "binary")
+
+    assert compressor.output_dimension(64) == 64
+    assert compressor.bytes_per_vector(64) == 8.0
+
+@pytest.mark.parametrize("reduction, quantization", [("pca", "int8"), ("truncate", "binary"), ("none", "int8")])
+def test_search_with_rerank_finds_query_vector(reduction, quantization):
+    vectors = _vectors(200)
+    compressor = VectorCompressor(reduction, 32, quantization).fit(vectors)
+    codes = compressor.encode(vectors)
+
+    rows, scores = compressor.search(codes, vectors, vectors[7], top_k=3, rerank_factor=4)
+
+    assert rows[0] == 7
+    assert scores[0] == pytest.approx(1.0, abs=1e-5)
+    assert list(scores) == sorted(scores, reverse=True)
+
+def test_search_on_empty_codes_returns_nothing():
+    compressor = VectorCompressor("none", 16, "binary")
+    codes = compressor.encode(np.empty((0, 64), dtype=np.float32))
+
+    rows, scores = compressor.search(codes, None, _vectors(1)[0], top_k=5)
+
+    assert len(rows) == 0 and len(scores) == 0
+
+def test_state_round_trip_requires_same_settings():
+    vectors = _vectors(50)
+    compressor = VectorCompressor("pca", 16, "int8").fit(vectors)
+    state = compressor.state()
+
+    restored = VectorCompressor("pca", 16, "int8")
+    assert restored.load_state(state)
+    np.testing.assert_array_equal(restored.encode(vectors), compressor.encode(vectors))
+    assert not VectorCompressor("pca", 32, "int8").load_state(state)